@@ -4,14 +4,30 @@ Bridges the Flutter UI with the existing Python Selenium bot.
 Run this before launching the Flutter app.
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
+import json
 import os
-import csv
 import threading
 import time
+from collections import Counter
 from datetime import datetime
 
+import chrome_profile
+import contacts
+import media
+import metrics
+import pacing
+import phone
+from browsers import BrowserSessions
+from events import EventBus
+from jobs import JobQueue, Scheduler, parse_window
+from journal import CampaignJournal
+from log_index import MAX_PAGE_SIZE, PAGE_SIZE, LogIndex
+from session_pool import SessionPool
+from templates import TemplateError, compile_template
+from uploads import UploadError, UploadStore
+
 app = Flask(__name__)
 CORS(app)
 
@@ -19,20 +35,35 @@ CORS(app)
 #  Global bot state (shared across threads)
 # ─────────────────────────────────────────────
 bot_state = {
-    "status": "idle",        # idle | running | completed | error
+    "status": "idle",        # idle | running | paused | completed | error
     "progress": 0,
     "total": 0,
     "current_number": "",
     "message": "",
     "start_time": None,
     "with_media": False,
+    "open_mode": "search",   # search | url
+    "session_count": 1,
+    "campaign_id": None,
 }
 
-bot_thread = None
-current_bot = None
 lock = threading.Lock()
 stop_event = threading.Event()   # set when user requests stop
 
+
+def _status_snapshot():
+    with lock:
+        return _merged_state()
+
+
+# Pushes state changes and per-contact outcomes to /api/events listeners
+events = EventBus(_status_snapshot)
+# Logged-in browsers kept open between campaigns
+browsers = BrowserSessions()
+pool = SessionPool(lock, stop_event, events, browsers)
+
+MAX_SESSIONS = 8
+
 DATA_DIR = "data"
 LOGS_DIR = "logs"
 
@@ -42,6 +73,38 @@ def ensure_dirs():
     os.makedirs(LOGS_DIR, exist_ok=True)
 
 
+journal = CampaignJournal(os.path.join(LOGS_DIR, "journal.db"))
+# Contact files stored by content, data/<filename> being an alias
+uploads = UploadStore(DATA_DIR)
+log_index = LogIndex(LOGS_DIR)
+jobs = JobQueue(os.path.join(LOGS_DIR, "journal.db"))
+
+# Numbers WhatsApp reported as not on WhatsApp in past campaigns, one index per region
+known_invalid = {}
+known_invalid_lock = threading.Lock()
+
+
+def refresh_known_invalid(region):
+    """
+    Returns the up-to-date phone.KnownInvalidIndex of a region.
+    """
+    with known_invalid_lock:
+        index = known_invalid.get(region)
+        if index is None:
+            index = known_invalid[region] = phone.KnownInvalidIndex(LOGS_DIR, region=region)
+        return index.refresh()
+
+
+def skip_summary(index):
+    return {
+        "rows": index["rows"],
+        "sendable": index["sendable"],
+        "skipped": index["skipped"],
+        "error_count": index["error_count"],
+        "errors": index["errors"][:10],
+    }
+
+
 # ─────────────────────────────────────────────
 #  Routes
 # ─────────────────────────────────────────────
@@ -70,52 +133,332 @@ def upload_file():
     if file.filename == "":
         return jsonify({"error": "No file selected"}), 400
 
-    if file and (file.filename.endswith(".csv") or file.filename.endswith(".xlsx")):
+    try:
+        region = phone.check_region(request.form.get("region"))
         ensure_dirs()
-        filepath = os.path.join(DATA_DIR, file.filename)
-        file.save(filepath)
-        return jsonify({
-            "message": f"File '{file.filename}' uploaded successfully",
-            "filename": file.filename,
-        })
+        path, digest, known = uploads.save(file.stream, file.filename)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except UploadError as exc:
+        return jsonify({"error": str(exc)}), exc.status
+    return ingest_upload(path, digest, known, region, request.form.get("template") or None)
+
+
+@app.route("/api/uploads", methods=["POST"])
+def create_upload():
+    """
+    Starts a chunked upload: {"filename", "size", "sha256" (optional),
+    "region", "template"}. Chunks are then PUT to /api/uploads/<upload_id>.
+    If "sha256" names content uploaded before, the file is ready at once.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        region = phone.check_region(data.get("region"))
+        ensure_dirs()
+        state = uploads.create(data.get("filename"), data.get("size"), data.get("sha256"),
+                               {"region": region, "template": data.get("template") or None})
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except UploadError as exc:
+        return jsonify({"error": str(exc)}), exc.status
+    if "path" in state:
+        return ingest_upload(state["path"], state["sha256"], True, region, state["options"]["template"])
+    return jsonify(state)
+
+
+@app.route("/api/uploads/<upload_id>", methods=["GET"])
+def get_upload(upload_id):
+    """
+    Where a dropped upload resumes: its "offset".
+    """
+    try:
+        return jsonify(uploads.status(upload_id))
+    except UploadError as exc:
+        return jsonify({"error": str(exc)}), exc.status
+
+
+@app.route("/api/uploads/<upload_id>", methods=["PUT"])
+def put_upload_chunk(upload_id):
+    """
+    Appends the raw request body at the `offset` query parameter (or the
+    Upload-Offset header). The chunk that completes the file returns the same
+    result as /api/upload; the others return the next offset.
+    """
+    try:
+        offset = int(request.args.get("offset", request.headers.get("Upload-Offset", "")))
+    except ValueError:
+        return jsonify({"error": "offset must be the byte offset of the chunk"}), 400
+    try:
+        state = uploads.append(upload_id, offset, request.stream)
+    except UploadError as exc:
+        return jsonify({"error": str(exc)}), exc.status
+    if "path" in state:
+        options = state["options"]
+        return ingest_upload(state["path"], state["sha256"], state["known"], options["region"], options["template"])
+    return jsonify(state)
 
-    return jsonify({"error": "Invalid file type. Only CSV and XLSX are allowed"}), 400
+
+@app.route("/api/uploads/<upload_id>", methods=["DELETE"])
+def delete_upload(upload_id):
+    try:
+        uploads.status(upload_id)
+    except UploadError as exc:
+        return jsonify({"error": str(exc)}), exc.status
+    uploads.abort(upload_id)
+    return jsonify({"message": "Upload cancelled"})
+
+
+def ingest_upload(path, digest, known, region, template):
+    """
+    Indexes a stored contact file once, so starting a campaign only reads the
+    cached index. Content uploaded before comes with its index, which is
+    reused unless the region, template or known invalid numbers differ.
+    """
+    filename = os.path.basename(path)
+    try:
+        index = contacts.load_index(path, region, refresh_known_invalid(region), template)
+    except contacts.ContactFileError as exc:
+        uploads.forget(path, digest)
+        return jsonify({"error": str(exc)}), 400
+    except TemplateError as exc:
+        # The file itself is fine, only the template doesn't fit it
+        return jsonify({"error": str(exc), "filename": filename}), 400
+    uploads.remember_index(path, digest)
+    return jsonify(dict(
+        skip_summary(index),
+        message=f"File '{filename}' uploaded successfully",
+        filename=filename,
+        columns=index["header"],
+        sha256=digest,
+        known=known,
+    ))
+
+
+@app.route("/api/media", methods=["GET"])
+def list_media():
+    return jsonify({"files": media.list_files()})
+
+
+@app.route("/api/media", methods=["POST"])
+def upload_media():
+    """
+    Stores a file in data/media/ to be attached by campaigns, either to every
+    message (the `media` parameter of /api/start) or per row (media column).
+    """
+    if "file" not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    file = request.files["file"]
+    filename = os.path.basename(file.filename or "")
+    if not filename:
+        return jsonify({"error": "No file selected"}), 400
+
+    os.makedirs(media.MEDIA_DIR, exist_ok=True)
+    filepath = os.path.join(media.MEDIA_DIR, filename)
+    file.save(filepath)
+    error = media.check(filename)
+    if error:
+        os.remove(filepath)
+        return jsonify({"error": error}), 400
+    return jsonify({"message": f"Media '{filename}' uploaded successfully", "filename": filename})
+
+
+@app.route("/api/known_invalid", methods=["GET"])
+def list_known_invalid():
+    """
+    Numbers of a region (?region=) that campaigns skip because WhatsApp
+    reported them as not on WhatsApp.
+    """
+    try:
+        region = phone.check_region(request.args.get("region"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    index = refresh_known_invalid(region)
+    with known_invalid_lock:
+        numbers = sorted(index.numbers)
+    return jsonify({"region": region, "count": len(numbers), "numbers": numbers})
+
+
+@app.route("/api/known_invalid", methods=["DELETE"])
+def forget_known_invalid():
+    """
+    Sends to numbers again: drops {numbers} of {region} from the known
+    invalid numbers, or all of them when no numbers are given.
+    """
+    data = request.get_json(silent=True) or {}
+    numbers = data.get("numbers")
+    if numbers is not None and not (isinstance(numbers, list) and all(isinstance(n, str) for n in numbers)):
+        return jsonify({"error": "numbers must be a list of phone numbers"}), 400
+    try:
+        region = phone.check_region(data.get("region"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    index = refresh_known_invalid(region)
+    with known_invalid_lock:
+        dropped = index.forget(numbers)
+    return jsonify({"region": region, "dropped": dropped, "count": len(index)})
 
 
 @app.route("/api/status", methods=["GET"])
 def get_status():
-    with lock:
-        return jsonify(dict(bot_state))
+    # Snapshot fallback for clients without the event stream; only rebuilt after a change
+    return jsonify(events.state())
+
+
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Send stage latency histograms and send counts of every campaign since the
+    server started, in the Prometheus text format.
+    """
+    return Response(metrics.REGISTRY.prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/events", methods=["GET"])
+def stream_events():
+    """
+    Server-sent events: a "status" event with the same payload as /api/status
+    whenever it changes, an "outcome" event per contact, and a "missed" event
+    if the client was too slow to receive some outcomes.
+    """
+    def stream():
+        for name, data in events.subscribe():
+            if name == "heartbeat":
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+def _merged_state():
+    """
+    Combines the campaign state with the per-session progress.
+    The caller must hold the lock.
+    """
+    state = dict(bot_state)
+    sessions = pool.snapshot()
+    if sessions:
+        state["sessions"] = sessions
+        state["progress"] = sum(s["progress"] for s in sessions)
+        state["delivery"] = dict(sum((Counter(s["delivery"]) for s in sessions), Counter()))
+        if bot_state["status"] == "running":
+            latest = max(sessions, key=lambda s: s["updated"])
+            state["current_number"] = latest["current_number"]
+            state["message"] = latest["message"] if len(sessions) == 1 else (
+                f"{sum(s['status'] == 'running' for s in sessions)} of "
+                f"{len(sessions)} sessions sending… last: {latest['current_number']}"
+            )
+    return state
 
 
 @app.route("/api/start", methods=["POST"])
 def start_bot():
-    global bot_thread, current_bot
+    body, code = start_campaign(request.get_json(force=True) or {})
+    return jsonify(body), code
+
+
+def start_campaign(data):
+    """
+    Validates the /api/start parameters and starts the campaign.
+    Returns the response body and status code.
+    """
+    campaign_id = data.get("campaign_id")
+    resumed = None
+    if campaign_id:
+        resumed = journal.campaign(campaign_id)
+        if resumed is None:
+            return {"error": f"Campaign '{campaign_id}' not found"}, 404
+        if resumed["status"] == "completed":
+            return {"error": f"Campaign '{campaign_id}' is already completed"}, 400
+        # Resume with the original file, options and sharding so every shard's cursor still applies
+        data = dict(
+            resumed["options"],
+            filename=os.path.basename(resumed["filepath"]),
+            sessions=resumed["session_count"],
+        )
 
-    data = request.get_json(force=True) or {}
     filename = data.get("filename")
-    with_media = bool(data.get("with_media", False))
+    template = data.get("template") or None
+    media_name = data.get("media") or None
+    with_media = bool(data.get("with_media", media_name is not None))
+    open_mode = data.get("open_mode", "search")
+    jitter = data.get("jitter", "human")
+    try:
+        region = phone.check_region(data.get("region"))
+        # Per-session limits on top of rate_limit, see pacing.DEFAULTS
+        pacing_limits = pacing.check_limits(data.get("pacing"))
+    except (TypeError, ValueError) as exc:
+        return {"error": str(exc)}, 400
+    try:
+        sessions = int(data.get("sessions", 1))
+        # Messages per minute, either one value for all sessions or one per session
+        rate_limit = data.get("rate_limit")
+        if isinstance(rate_limit, list):
+            rate_limit = [float(r) if r is not None else None for r in rate_limit]
+        elif rate_limit is not None:
+            rate_limit = float(rate_limit)
+    except (TypeError, ValueError):
+        return {"error": "sessions and rate_limit must be numbers"}, 400
+    # Checked before the campaign is journaled; a session's pacer would fail on it
+    if any(r is not None and r <= 0 for r in (rate_limit if isinstance(rate_limit, list) else [rate_limit])):
+        return {"error": "rate_limit must be positive"}, 400
 
     if not filename:
-        return jsonify({"error": "No filename provided"}), 400
+        return {"error": "No filename provided"}, 400
+
+    if open_mode not in ("search", "url"):
+        return {"error": f"Invalid open_mode '{open_mode}'. Use 'search' or 'url'"}, 400
+
+    if jitter not in ("human", "none"):
+        return {"error": f"Invalid jitter '{jitter}'. Use 'human' or 'none'"}, 400
+
+    if not 1 <= sessions <= MAX_SESSIONS:
+        return {"error": f"sessions must be between 1 and {MAX_SESSIONS}"}, 400
+
+    if isinstance(rate_limit, list) and len(rate_limit) != sessions:
+        return {"error": "rate_limit list must have one entry per session"}, 400
 
     filepath = os.path.join(DATA_DIR, filename)
     if not os.path.exists(filepath):
-        return jsonify({"error": f"File '{filename}' not found in data/"}), 404
+        return {"error": f"File '{filename}' not found in data/"}, 404
+
+    if media_name and media.check(media_name):
+        return {"error": media.check(media_name)}, 404 if media.valid_name(media_name) else 400
 
     with lock:
-        if bot_state["status"] == "running":
-            return jsonify({"error": "Bot is already running"}), 400
+        if bot_state["status"] == "running" or pool.is_running():
+            return {"error": "Bot is already running"}, 400
 
-    # Count contacts (skip header row if present)
-    total = 0
+    # Count sendable contacts from the cached index; it is only rebuilt if numbers
+    # failed since the upload. Invalid, repeated and known dead numbers are skipped.
+    known = refresh_known_invalid(region)
     try:
-        with open(filepath, mode="r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            rows = [r for r in reader if any(r)]
-            total = max(0, len(rows) - 1)
-    except Exception:
-        total = 0
+        index = contacts.load_index(filepath, region, known, template)
+    except (contacts.ContactFileError, TemplateError) as exc:
+        return {"error": str(exc)}, 400
+    if with_media and not media_name and media.media_column(index["header"]) is None:
+        return {"error": "with_media needs a media file or a media column in the contact file"}, 400
+    total = index["sendable"]
+
+    if resumed:
+        total = max(0, total - journal.done_count(campaign_id))
+        journal.set_status(campaign_id, "running")
+    else:
+        campaign_id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.path.splitext(filename)[0]}"
+        journal.create(campaign_id, filepath, sessions, {
+            "with_media": with_media,
+            "open_mode": open_mode,
+            "jitter": jitter,
+            "rate_limit": rate_limit,
+            "region": region,
+            "pacing": data.get("pacing"),
+            "template": template,
+            "media": media_name,
+        })
 
     with lock:
         bot_state.update({
@@ -126,88 +469,242 @@ def start_bot():
             "message": "Starting bot…",
             "start_time": datetime.now().isoformat(),
             "with_media": with_media,
+            "open_mode": open_mode,
+            "session_count": sessions,
+            "campaign_id": campaign_id,
         })
-
-    bot_thread = threading.Thread(
-        target=_run_bot_thread,
-        args=(filepath, with_media),
-        daemon=True,
+    events.touch()
+
+    pool.start(
+        filepath, sessions, total,
+        campaign_id=campaign_id,
+        journal=journal,
+        with_media=with_media,
+        open_mode=open_mode,
+        rate_limit=rate_limit,
+        jitter=jitter,
+        region=region,
+        known_invalid=known,
+        pacing=pacing_limits,
+        template=template,
+        media=media_name,
+        on_finish=_on_campaign_finished,
     )
-    bot_thread.start()
-    return jsonify({"message": "Bot started successfully"})
+    return dict(
+        skip_summary(index),
+        message="Campaign resumed" if resumed else "Bot started successfully",
+        campaign_id=campaign_id,
+    ), 200
 
 
-def _run_bot_thread(filepath, with_media):
-    global current_bot
+def _on_campaign_finished(errors):
+    with lock:
+        campaign_id = bot_state["campaign_id"]
+        journal.set_status(campaign_id, "failed" if errors else "completed")
+        _finish_job(campaign_id, "failed" if errors else "completed", str(errors[0]) if errors else None)
+        if not errors:
+            bot_state["status"] = "completed"
+            bot_state["message"] = "✅ All messages sent successfully!"
+        elif len(errors) == bot_state["session_count"]:
+            bot_state["status"] = "error"
+            bot_state["message"] = f"❌ Error: {errors[0]}"
+        else:
+            bot_state["status"] = "completed"
+            bot_state["message"] = (
+                f"⚠️ Finished, but {len(errors)} of {bot_state['session_count']} "
+                f"sessions failed: {errors[0]}"
+            )
+    events.touch()
+
+
+@app.route("/api/pause", methods=["POST"])
+def pause_bot():
+    """
+    Holds the running campaign within a fraction of a second, browsers open
+    and logged in, until /api/resume. Returns the row each session resumes after.
+    """
+    with lock:
+        if bot_state["status"] != "running" or not pool.is_running():
+            return jsonify({"error": "No campaign is running"}), 400
+        bot_state["status"] = "paused"
+        bot_state["message"] = "Paused."
+        journal.set_status(bot_state["campaign_id"], "paused")
+    pool.pause()
+    events.touch()
+    with lock:
+        resume_after = [s["resume_after"] for s in pool.snapshot()]
+    return jsonify({"message": "Bot paused", "resume_after": resume_after})
 
-    stop_event.clear()
-    try:
-        import sys
-        sys.path.insert(0, os.getcwd())
-        from driver import Bot  # noqa: F401 – imported at runtime
-
-        current_bot = Bot()
-        current_bot.csv_numbers = filepath
-        if with_media:
-            current_bot._options = True
-
-        with lock:
-            bot_state["message"] = "Opening WhatsApp Web… please scan the QR code."
-
-        # Monkey-patch send_message_to_contact to track progress
-        original_send = current_bot.send_message_to_contact
-
-        def _tracked_send(number, message):
-            if stop_event.is_set():
-                return True   # abort silently
-            with lock:
-                bot_state["current_number"] = number
-                bot_state["message"] = f"Sending to {number}…"
-            result = original_send(number, message)
-            with lock:
-                bot_state["progress"] += 1
-            return result
-
-        current_bot.send_message_to_contact = _tracked_send
-        current_bot.login()
-
-        # Only mark completed if stop was NOT requested
-        if not stop_event.is_set():
-            with lock:
-                bot_state["status"] = "completed"
-                bot_state["message"] = "✅ All messages sent successfully!"
 
-    except Exception as exc:
-        # Only update state if the exception wasn't caused by a user stop
-        if not stop_event.is_set():
-            with lock:
-                bot_state["status"] = "error"
-                bot_state["message"] = f"❌ Error: {exc}"
-    finally:
-        current_bot = None
+@app.route("/api/resume", methods=["POST"])
+def resume_bot():
+    with lock:
+        if bot_state["status"] != "paused":
+            return jsonify({"error": "No campaign is paused"}), 400
+        bot_state["status"] = "running"
+        bot_state["message"] = "Resuming…"
+        journal.set_status(bot_state["campaign_id"], "running")
+    pool.resume()
+    events.touch()
+    return jsonify({"message": "Bot resumed"})
 
 
 @app.route("/api/stop", methods=["POST"])
 def stop_bot():
-    global current_bot
-    # Signal the background thread first so it won't override our status
-    stop_event.set()
-    if current_bot:
-        try:
-            current_bot.quit_driver()
-        except Exception:
-            pass
-        current_bot = None
+    """
+    Cancels the campaign within a fraction of a second. The browsers stay
+    open and logged in, unless `{"close_browsers": true}` is sent.
+    """
+    data = request.get_json(silent=True) or {}
+    # Signals the session threads first so they won't override our status
+    pool.stop(close_browsers=bool(data.get("close_browsers")))
 
     with lock:
+        if bot_state["campaign_id"] and bot_state["status"] in ("running", "paused"):
+            journal.set_status(bot_state["campaign_id"], "stopped")
+            _finish_job(bot_state["campaign_id"], "cancelled", "Stopped by user")
         bot_state["status"] = "idle"
         bot_state["message"] = "Bot stopped by user."
+    events.touch()
 
     return jsonify({"message": "Bot stopped"})
 
 
+def _finish_job(campaign_id, status, error=None):
+    """
+    Ends the queued job running `campaign_id`, if the campaign came from the queue.
+    """
+    job = jobs.running()
+    if job and job["campaign_id"] in (None, campaign_id):
+        jobs.set_status(job["id"], status, error=error)
+        scheduler.wake()
+
+
+def _start_job(job):
+    if pool.is_running():
+        return None
+    # A job that was paused outside its send window continues its campaign
+    data = {"campaign_id": job["campaign_id"]} if job["campaign_id"] else job["options"]
+    body, code = start_campaign(data)
+    if code != 200:
+        raise ValueError(body["error"])
+    return body["campaign_id"]
+
+
+def _pause_campaign():
+    """
+    Stops the running campaign after the current contact, keeping the browsers
+    logged in; it resumes from its journal cursor when started again.
+    """
+    pool.stop(close_browsers=False)
+    with lock:
+        if bot_state["campaign_id"]:
+            journal.set_status(bot_state["campaign_id"], "stopped")
+        bot_state["status"] = "idle"
+        bot_state["message"] = "Paused until the send window opens again."
+    events.touch()
+
+
+scheduler = Scheduler(jobs, _start_job, pool.is_running, _pause_campaign)
+
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    return jsonify({"jobs": jobs.jobs()})
+
+
+@app.route("/api/jobs", methods=["POST"])
+def add_job():
+    """
+    Queues a campaign: the /api/start parameters plus `priority` (higher runs
+    first), an optional daily `window_start`/`window_end` ("HH:MM") and an
+    optional `not_before` (ISO date and time).
+    """
+    data = request.get_json(force=True) or {}
+    options = {k: v for k, v in data.items()
+               if k not in ("priority", "window_start", "window_end", "not_before", "campaign_id")}
+    try:
+        priority = int(data.get("priority", 0))
+        window_start, window_end = parse_window(data.get("window_start"), data.get("window_end"))
+        not_before = data.get("not_before")
+        if not_before:
+            not_before = datetime.fromisoformat(not_before).timestamp()
+    except (TypeError, ValueError) as exc:
+        return jsonify({"error": f"Invalid job: {exc}"}), 400
+
+    filename = options.get("filename")
+    if not filename:
+        return jsonify({"error": "No filename provided"}), 400
+    filepath = os.path.join(DATA_DIR, filename)
+    if not os.path.exists(filepath):
+        return jsonify({"error": f"File '{filename}' not found in data/"}), 404
+    try:
+        compile_template(options.get("template"), contacts.read_header(filepath))
+    except TemplateError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:
+        return jsonify({"error": f"Could not read '{filename}': {exc}"}), 400
+
+    job_id = jobs.add(options, priority, window_start, window_end, not_before or None)
+    scheduler.wake()
+    return jsonify({"message": "Campaign queued", "job": jobs.job(job_id)})
+
+
+@app.route("/api/jobs/<int:job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    job = jobs.job(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    if job["status"] not in ("queued", "running"):
+        return jsonify({"error": f"Job {job_id} is already {job['status']}"}), 400
+    if job["status"] == "running":
+        _pause_campaign()
+    jobs.set_status(job_id, "cancelled")
+    scheduler.wake()
+    return jsonify({"message": f"Job {job_id} cancelled"})
+
+
+@app.route("/api/sessions", methods=["GET"])
+def list_sessions():
+    """
+    State of the kept browsers: ready, logged_out, warming or busy, with
+    the memory and CPU each one uses and their total, for sizing hosts.
+    """
+    sessions = browsers.snapshot()
+    usage = browsers.usage()
+    for session in sessions:
+        session["usage"] = usage.get(session["index"])
+    return jsonify({
+        "sessions": sessions,
+        "mode": chrome_profile.run_mode(),
+        "usage": {
+            "memory_mb": round(sum(u["memory_mb"] for u in usage.values()), 1),
+            "cpu_percent": round(sum(u["cpu_percent"] or 0 for u in usage.values()), 1),
+            "processes": sum(u["processes"] for u in usage.values()),
+        } if usage else None,
+    })
+
+
+@app.route("/api/sessions/warm", methods=["POST"])
+def warm_sessions():
+    """
+    Opens and logs in the browsers of the first `count` profiles ahead of a
+    campaign, so it starts sending right away.
+    """
+    data = request.get_json(force=True) or {}
+    try:
+        count = int(data.get("count", 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "count must be a number"}), 400
+    if not 1 <= count <= MAX_SESSIONS:
+        return jsonify({"error": f"count must be between 1 and {MAX_SESSIONS}"}), 400
+    started = browsers.warm_up(count)
+    return jsonify({"warming": started, "sessions": browsers.snapshot()})
+
+
 @app.route("/api/reset", methods=["POST"])
 def reset_status():
+    pool.clear()
     with lock:
         bot_state.update({
             "status": "idle",
@@ -217,31 +714,59 @@ def reset_status():
             "message": "",
             "start_time": None,
             "with_media": False,
+            "open_mode": "search",
+            "session_count": 1,
+            "campaign_id": None,
         })
+    events.touch()
     return jsonify({"message": "Status reset"})
 
 
+@app.route("/api/campaigns", methods=["GET"])
+def list_campaigns():
+    """
+    Recent campaigns from the journal; any that is not completed can be
+    resumed by passing its id as campaign_id to /api/start.
+    """
+    return jsonify({"campaigns": journal.campaigns()})
+
+
 @app.route("/api/logs", methods=["GET"])
 def get_logs():
+    """
+    Entry counts of the newest logs and per run; the numbers of a log are
+    paged through /api/logs/<filename>.
+    """
     ensure_dirs()
-    logs = []
     try:
-        for fname in sorted(os.listdir(LOGS_DIR), reverse=True)[:20]:
-            if not fname.endswith(".txt"):
-                continue
-            fpath = os.path.join(LOGS_DIR, fname)
-            with open(fpath, "r", encoding="utf-8") as lf:
-                numbers = [n.strip() for n in lf.readlines() if n.strip()]
-            logs.append({
-                "filename": fname,
-                "type": "sent" if fname.endswith("_sent.txt") else "not_sent",
-                "count": len(numbers),
-                "numbers": numbers,
-            })
+        limit = int(request.args.get("limit", 20))
+        log_index.refresh()
+    except ValueError:
+        return jsonify({"error": "limit must be a number", "logs": []}), 400
     except Exception as exc:
         return jsonify({"error": str(exc), "logs": []}), 500
 
-    return jsonify({"logs": logs})
+    return jsonify({"logs": log_index.logs(limit), "runs": log_index.runs()})
+
+
+@app.route("/api/logs/<filename>", methods=["GET"])
+def get_log_numbers(filename):
+    """
+    One page of the numbers of a log: ?cursor=<next of the previous page>&limit=&q=<search>
+    """
+    try:
+        cursor = int(request.args.get("cursor", 0))
+        limit = min(int(request.args.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "cursor and limit must be numbers"}), 400
+    query = request.args.get("q", "").strip()
+
+    ensure_dirs()
+    log_index.refresh()
+    try:
+        return jsonify(log_index.page(filename, max(0, cursor), max(1, limit), query or None))
+    except KeyError:
+        return jsonify({"error": f"Log '{filename}' not found"}), 404
 
 
 # ─────────────────────────────────────────────
@@ -249,9 +774,13 @@ def get_logs():
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
     ensure_dirs()
+    scheduler.start()
+    browsers.start_health_checks()
     print("=" * 55)
     print("  WhatsApp Automator – API Server")
     print("  Listening on  http://0.0.0.0:5000")
     print("  Flutter app connects to http://localhost:5000")
+    # Fails here rather than at the first browser if WHATSAPP_BROWSER_MODE is wrong
+    print(f"  Browser mode:  {chrome_profile.run_mode()}")
     print("=" * 55)
     app.run(host="0.0.0.0", port=5000, debug=False, threaded=True)
@@ -0,0 +1,131 @@
+"""
+WhatsApp Automator - Offline WhatsApp Web stand-in
+Serves a small page on localhost that behaves like the parts of WhatsApp Web
+the bot drives: the chat list, the new chat search with its results (or none
+for numbers that are not on WhatsApp), the send URL with its invalid number
+popup, the message box, the send button, attachments, and outgoing bubbles
+whose clock turns into one and then two ticks. Its elements are built from
+selector_registry.SELECTORS, so the bot finds them exactly as it would on the
+real site.
+
+Every step takes a configurable time and numbers, drops and stuck messages
+occur at configurable rates, so runs are repeatable without a phone:
+
+    python -m bench.fake_whatsapp --port 8765 --not-found-rate 0.1
+    WHATSAPP_URL=http://127.0.0.1:8765 python api_server.py
+"""
+
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium.webdriver.common.by import By
+
+from selector_registry import SELECTORS
+
+PAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_whatsapp.html")
+
+# Milliseconds per step and rates in [0, 1]
+DEFAULTS = {
+    "login_ms": 300,          # until the chat list shows after a page load
+    "search_ms": 150,         # until search results show
+    "open_ms": 100,           # until a chat opens
+    "send_ms": 30,            # until the bubble of a sent message shows
+    "ack_ms": 300,            # clock to single tick
+    "delivered_ms": 1000,     # single to double tick
+    "jitter": 0.2,            # every delay varies by up to this fraction
+    "not_found_rate": 0.05,   # numbers not on WhatsApp, the same ones every run
+    "fail_rate": 0.0,         # sends whose bubble never shows
+    "pending_rate": 0.0,      # messages stuck on the clock
+}
+
+# Shown by the bot's waits instead of being part of the page
+DERIVED = ("pending_message",)
+
+
+def page_selectors():
+    """
+    First CSS candidate of every element the page has to contain.
+    """
+    selectors = {}
+    for name, candidates in SELECTORS.items():
+        css = [value for by, value in candidates if by == By.CSS_SELECTOR]
+        if css and name not in DERIVED:
+            selectors[name] = css[0]
+    return selectors
+
+
+class FakeWhatsApp:
+    """
+    The stand-in server, running in a background thread.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, **config):
+        unknown = set(config) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown options: {', '.join(sorted(unknown))}")
+        self.config = dict(DEFAULTS, **config)
+        with open(PAGE_PATH, "r", encoding="utf-8") as file:
+            page = file.read()
+        settings = dict(self.config, selectors=page_selectors())
+        self._page = page.replace("/*CONFIG*/{}", json.dumps(settings)).encode("utf-8")
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        page = self._page
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/favicon"):
+                    self.send_error(404)
+                    return
+                # Every path, including /send?phone=…, loads the app
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    for name, default in DEFAULTS.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=type(default), default=default)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+
+    server = FakeWhatsApp(host, port, **args)
+    print(f"Fake WhatsApp Web on {server.url}")
+    print(f"Start the bot with WHATSAPP_URL={server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+WhatsApp Automator - Throughput benchmark
+Sends a generated contact file against the offline stand-in (fake_whatsapp.py)
+and reports messages per minute, p50/p95 per-contact latency and the memory
+and CPU of the browsers. Two flows can be measured:
+
+- "bot": one Bot running send_messages_to_all_contacts, as main.py does
+- "api": a campaign started through /api/start and followed through
+  /api/status, as the app does, with one or more sessions
+
+Pacing and jitter are turned off so the numbers show what the pipeline itself
+costs. Run from the repository root; Chrome must be installed:
+
+    python -m bench.run_bench --contacts 200 --flow bot --open-mode search
+    python -m bench.run_bench --contacts 500 --flow api --sessions 4 --json result.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from bench.fake_whatsapp import DEFAULTS as FAKE_DEFAULTS
+from bench.fake_whatsapp import FakeWhatsApp
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pacing that never makes a session wait
+NO_PACING = {
+    "per_minute": 1e6,
+    "per_hour": 1e6,
+    "per_day": 1e6,
+    "burst": 1e6,
+    "min_gap": [0, 0],
+}
+
+# Seconds between two memory and CPU samples of the browsers
+SAMPLE_INTERVAL = 1.0
+
+
+def write_contacts(path, count, seed):
+    """
+    Writes `count` contacts with distinct Egyptian mobile numbers.
+    """
+    rng = random.Random(seed)
+    numbers = rng.sample(range(10 ** 8), count)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write("phone,message,name\n")
+        for index, number in enumerate(numbers):
+            file.write(f"010{number:08d},\"Hello {index}!\nThis is a benchmark message.\",Contact {index}\n")
+
+
+class UsageSampler(threading.Thread):
+    """
+    Samples the memory and CPU of the browsers while a flow runs.
+    :param measure: callable returning {key: usage dict} as Bot.resource_usage gives.
+    """
+
+    def __init__(self, measure):
+        super().__init__(daemon=True)
+        self._measure = measure
+        self._done = threading.Event()
+        self.peak_memory_mb = 0.0
+        self.cpu_percent = []
+
+    def run(self):
+        while not self._done.wait(SAMPLE_INTERVAL):
+            try:
+                usage = [u for u in self._measure().values() if u]
+            except Exception:
+                continue
+            if usage:
+                self.peak_memory_mb = max(self.peak_memory_mb, sum(u["memory_mb"] for u in usage))
+                cpu = [u["cpu_percent"] for u in usage if u["cpu_percent"] is not None]
+                if cpu:
+                    self.cpu_percent.append(sum(cpu))
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def result(self):
+        return {
+            "peak_memory_mb": round(self.peak_memory_mb, 1) if self.peak_memory_mb else None,
+            "avg_cpu_percent": round(sum(self.cpu_percent) / len(self.cpu_percent), 1) if self.cpu_percent else None,
+        }
+
+
+def run_bot(csv_path, args):
+    from driver import Bot
+    from waits import JitterPolicy
+
+    bot = Bot(profile_dir=os.path.join(os.getcwd(), "profile"))
+    bot.csv_numbers = csv_path
+    bot.open_mode = args.open_mode
+    bot.jitter = JitterPolicy.named("none")
+    bot.pacing.reset_limits(**NO_PACING)
+    bot.fast_input = args.input != "keys"
+    bot.batch_send = args.input == "script"
+    bot.keep_alive = True
+
+    sampler = UsageSampler(lambda: {0: bot.resource_usage()})
+    bot.open_whatsapp()
+    sampler.start()
+    started = time.monotonic()
+    try:
+        bot.login()
+    finally:
+        elapsed = time.monotonic() - started
+        sampler.stop()
+        bot.quit_driver_quietly()
+    return elapsed, sampler.result()
+
+
+def run_api(csv_path, args):
+    import api_server
+
+    client = api_server.app.test_client()
+    # Open the browsers first, as /api/sessions/warm does, so start-up isn't measured
+    api_server.browsers.warm_up(args.sessions)
+    while any(s["state"] == "warming" for s in api_server.browsers.snapshot()):
+        time.sleep(0.2)
+
+    sampler = UsageSampler(api_server.browsers.usage)
+    sampler.start()
+    started = time.monotonic()
+    response = client.post("/api/start", json={
+        "filename": os.path.basename(csv_path),
+        "sessions": args.sessions,
+        "open_mode": args.open_mode,
+        "jitter": "none",
+        "rate_limit": NO_PACING["per_minute"],
+        "pacing": NO_PACING,
+    })
+    if response.status_code != 200:
+        sampler.stop()
+        raise RuntimeError(f"/api/start failed: {response.get_json()}")
+    try:
+        while client.get("/api/status").get_json()["status"] == "running":
+            time.sleep(0.2)
+    finally:
+        elapsed = time.monotonic() - started
+        sampler.stop()
+        client.post("/api/stop")
+    return elapsed, sampler.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput benchmark against the offline WhatsApp Web stand-in")
+    parser.add_argument("--contacts", type=int, default=100)
+    parser.add_argument("--flow", choices=("bot", "api"), default="bot")
+    parser.add_argument("--sessions", type=int, default=1, help="sessions of the api flow")
+    parser.add_argument("--open-mode", choices=("search", "url"), default="search")
+    parser.add_argument("--input", choices=("script", "paste", "keys"), default="script",
+                        help="how the bot flow sends: one in-page script, or step by step pasting or typing")
+    parser.add_argument("--browser-mode", choices=("headed", "lite", "headless"), default="headless")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the result to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the working directory")
+    for name, default in FAKE_DEFAULTS.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=type(default), default=default)
+    args = parser.parse_args(argv)
+
+    fake = FakeWhatsApp(**{name: getattr(args, name) for name in FAKE_DEFAULTS}).start()
+    # Read by driver.py and chrome_profile.py, so set before they are imported
+    os.environ["WHATSAPP_URL"] = fake.url
+    os.environ["WHATSAPP_BROWSER_MODE"] = args.browser_mode
+
+    workdir = tempfile.mkdtemp(prefix="whatsapp-bench-")
+    cwd = os.getcwd()
+    sys.path.insert(0, REPO)
+    os.chdir(workdir)
+    try:
+        os.makedirs("data")
+        os.makedirs("logs")
+        csv_path = os.path.join(workdir, "data", "bench.csv")
+        write_contacts(csv_path, args.contacts, args.seed)
+
+        import metrics
+        # Only this run's samples
+        metrics.REGISTRY = metrics.Metrics()
+        flow = run_bot if args.flow == "bot" else run_api
+        elapsed, usage = flow(csv_path, args)
+
+        summary = metrics.REGISTRY.summary()
+        outcomes = {dict(labels)["outcome"]: value
+                    for (name, labels), value in metrics.REGISTRY.counters().items() if name == "messages"}
+        message = summary.get("message", {})
+        result = {
+            "flow": args.flow,
+            "contacts": args.contacts,
+            "sessions": args.sessions if args.flow == "api" else 1,
+            "open_mode": args.open_mode,
+            "input": args.input if args.flow == "bot" else "script",
+            "browser_mode": args.browser_mode,
+            "elapsed_s": round(elapsed, 1),
+            "outcomes": outcomes,
+            "messages_per_minute": round(outcomes.get("sent", 0) / elapsed * 60, 1) if elapsed else None,
+            "p50_ms": message.get("p50_ms"),
+            "p95_ms": message.get("p95_ms"),
+            "stages": summary,
+            **usage,
+        }
+    finally:
+        os.chdir(cwd)
+        fake.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+        else:
+            print(f"Working directory kept: {workdir}")
+
+    print(f"{result['flow']} flow, {result['contacts']} contacts, {result['sessions']} session(s), "
+          f"{result['open_mode']} mode, {result['browser_mode']} browser")
+    print(f"  {result['messages_per_minute']} messages/min over {result['elapsed_s']} s {result['outcomes']}")
+    print(f"  per contact: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms")
+    print(f"  browsers: peak {result['peak_memory_mb']} MB, avg CPU {result['avg_cpu_percent']} %")
+    print("  stage              count    avg_ms    p50_ms    p95_ms    max_ms")
+    for stage, entry in summary.items():
+        print(f"  {stage:<16} {entry['count']:>7} {entry['avg_ms']:>9} {entry['p50_ms']:>9} "
+              f"{entry['p95_ms']:>9} {entry['max_ms']:>9}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    main()
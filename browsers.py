@@ -0,0 +1,222 @@
+"""
+WhatsApp Automator - Browser sessions
+Keeps one logged-in Chrome per profile open for the lifetime of the server, so
+a campaign gets a browser that already shows the chat list instead of
+launching Chrome and loading WhatsApp Web first. Idle browsers are
+health-checked in the background and only recreated once they died.
+"""
+
+import os
+import threading
+import time
+
+from driver import Bot
+
+DEFAULT_PROFILE = "Whatsapp-Automator-main"
+
+# Seconds between two health checks of the idle browsers
+HEALTH_INTERVAL = 30
+
+# Chrome start-up and the driver download are not safe to run concurrently
+_launch_lock = threading.Lock()
+
+
+def profile_dir(index):
+    """
+    Returns the Chrome profile directory of the session with the given index.
+    The first session keeps the original profile so existing logins keep working.
+    """
+    name = DEFAULT_PROFILE if index == 0 else f"{DEFAULT_PROFILE}-{index + 1}"
+    return os.path.join(os.getcwd(), name)
+
+
+class BrowserSessions:
+    """
+    The open bots, one per profile index. A bot is either idle (kept here),
+    in use by a campaign, or being warmed up or checked, in which case a
+    campaign asking for it waits until that is done.
+    """
+
+    def __init__(self, health_interval=HEALTH_INTERVAL):
+        self._lock = threading.Lock()
+        self._idle = {}            # index -> Bot, open and not used by a campaign
+        self._busy = set()         # indexes used by a campaign
+        self._leased = {}          # index -> Bot used by a campaign
+        self._warming = {}         # index -> (Event set when done, Bot or None)
+        self._health_interval = health_interval
+        self._health_thread = None
+
+    def acquire(self, index, stop_event=None):
+        """
+        Returns an open bot for profile `index`: the idle one if it is still
+        alive, a new one otherwise. Returns None if `stop_event` is set meanwhile.
+        """
+        while True:
+            with self._lock:
+                warming = self._warming.get(index)
+                if warming is None:
+                    bot = self._idle.pop(index, None)
+                    self._busy.add(index)
+                    break
+            warming[0].wait(0.2)
+            if stop_event is not None and stop_event.is_set():
+                return None
+
+        try:
+            if bot is not None and not bot.check_session():
+                bot.quit_driver_quietly()
+                bot = None
+            if bot is None and not (stop_event is not None and stop_event.is_set()):
+                bot = self._new_bot(index)
+        except Exception:
+            with self._lock:
+                self._busy.discard(index)
+            raise
+        with self._lock:
+            if bot is None:
+                self._busy.discard(index)
+            else:
+                self._leased[index] = bot
+        return bot
+
+    def release(self, index, bot):
+        """
+        Takes back the bot of a finished campaign, keeping it if it is still open.
+        """
+        alive = bot is not None and bot.is_alive()
+        with self._lock:
+            self._busy.discard(index)
+            self._leased.pop(index, None)
+            if alive:
+                self._idle[index] = bot
+        if bot is not None and not alive:
+            bot.quit_driver_quietly()
+
+    def warm_up(self, count):
+        """
+        Opens and logs in the browsers of the first `count` profiles in the
+        background. Returns the indexes that are being warmed up.
+        """
+        return [index for index in range(count) if self._start_warming(index)]
+
+    def _start_warming(self, index):
+        with self._lock:
+            idle = self._idle.get(index)
+            if index in self._busy or index in self._warming or (idle is not None and idle.logged_in):
+                return False
+            self._warming[index] = (threading.Event(), None)
+        threading.Thread(target=self._warm, args=(index,), daemon=True).start()
+        return True
+
+    def _warm(self, index):
+        with self._lock:
+            bot = self._idle.pop(index, None)
+            done = self._warming[index][0]
+            self._warming[index] = (done, bot)
+        try:
+            if bot is not None and not bot.check_session():
+                bot.quit_driver_quietly()
+                bot = None
+            if bot is None:
+                bot = self._new_bot(index)
+                with self._lock:
+                    self._warming[index] = (done, bot)
+            if not bot.logged_in:
+                bot.open_whatsapp()
+        except Exception as exc:
+            print(f"Could not open the browser of profile {index + 1}: {exc}")
+            if bot is not None:
+                bot.quit_driver_quietly()
+            bot = None
+        finally:
+            with self._lock:
+                if bot is not None:
+                    self._idle[index] = bot
+                del self._warming[index]
+            done.set()
+
+    def check(self):
+        """
+        Health-checks the idle browsers: one that died is recreated and one
+        whose WhatsApp Web session ended is logged in again, in the background.
+        A campaign asking for a browser under check waits for it.
+        """
+        with self._lock:
+            indexes = list(self._idle)
+        for index in indexes:
+            with self._lock:
+                bot = self._idle.get(index)
+                if bot is None or index in self._warming:
+                    continue
+                done = threading.Event()
+                self._warming[index] = (done, bot)
+            try:
+                healthy = bot.check_session() and bot.logged_in
+            except Exception:
+                healthy = False
+            if healthy:
+                with self._lock:
+                    del self._warming[index]
+                done.set()
+            else:
+                threading.Thread(target=self._warm, args=(index,), daemon=True).start()
+
+    def start_health_checks(self):
+        if self._health_thread is None:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+    def _health_loop(self):
+        while True:
+            time.sleep(self._health_interval)
+            try:
+                self.check()
+            except Exception as exc:
+                print(f"Browser health check failed: {exc}")
+
+    def close_all(self):
+        """
+        Quits every browser that is not in use by a campaign.
+        """
+        with self._lock:
+            bots = list(self._idle.values()) + [bot for _, bot in self._warming.values() if bot]
+            self._idle = {}
+        for bot in bots:
+            bot.quit_driver_quietly()
+
+    def snapshot(self):
+        """
+        State of every known profile: ready, logged_out, warming or busy.
+        """
+        with self._lock:
+            states = {index: "busy" for index in self._busy}
+            states.update({index: "warming" for index in self._warming})
+            for index, bot in self._idle.items():
+                states.setdefault(index, "ready" if bot.logged_in else "logged_out")
+        return [
+            {"index": index, "profile": os.path.basename(profile_dir(index)), "state": state}
+            for index, state in sorted(states.items())
+        ]
+
+    def usage(self):
+        """
+        Memory and CPU of every open browser by profile index, in use or not,
+        see Bot.resource_usage. Empty if psutil is not installed.
+        """
+        with self._lock:
+            bots = dict(self._idle)
+            bots.update(self._leased)
+        usage = {}
+        for index, bot in bots.items():
+            try:
+                measured = bot.resource_usage()
+            except Exception:
+                measured = None
+            if measured is not None:
+                usage[index] = measured
+        return usage
+
+    @staticmethod
+    def _new_bot(index):
+        with _launch_lock:
+            return Bot(profile_dir=profile_dir(index))
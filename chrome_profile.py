@@ -0,0 +1,195 @@
+"""
+WhatsApp Automator - Chrome profiles and run modes
+How the Chrome of a bot is started, set by the WHATSAPP_BROWSER_MODE
+environment variable:
+
+- "headed" (default): a normal window with only the profile, as before
+- "lite": a normal window with the resource-saving flags below, meant for a
+  virtual display (Xvfb) on a server
+- "headless": the same flags without any display
+
+New session profiles are overlays of a base profile that Chrome never opens:
+it holds the preferences all sessions share, and a session profile starts as
+a hard-linked copy of it. The base only contains files Chrome replaces instead
+of editing in place, so no session can change it. Profiles that already
+exist, with their WhatsApp login, are used as they are.
+
+Link the WhatsApp accounts in headed mode first; a headless browser can't show
+the QR code.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+
+MODE_ENV = "WHATSAPP_BROWSER_MODE"
+MODES = ("headed", "lite", "headless")
+
+# Created next to the session profiles
+BASE_PROFILE = "Whatsapp-Automator-base"
+
+# Disk and media cache caps of the lite and headless modes, in bytes
+CACHE_SIZE = 32 * 1024 * 1024
+
+LEAN_FLAGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--force-prefers-reduced-motion",
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--renderer-process-limit=2",
+    f"--disk-cache-size={CACHE_SIZE}",
+    f"--media-cache-size={CACHE_SIZE}",
+    # WhatsApp Web needs a desktop-sized layout to show the chat list next to the chat
+    "--window-size=1280,900",
+]
+
+HEADLESS_FLAGS = [
+    "--headless=new",
+    "--disable-gpu",
+]
+
+# Preferences of the base profile, and so of every new session profile
+BASE_PREFERENCES = {
+    "profile": {
+        "default_content_setting_values": {"notifications": 2, "geolocation": 2},
+        "password_manager_enabled": False,
+        "exit_type": "Normal",
+    },
+    "credentials_enable_service": False,
+    "browser": {"check_default_browser": False},
+    "translate": {"enabled": False},
+    "download": {"prompt_for_download": False},
+}
+
+
+def run_mode():
+    """
+    The configured run mode.
+    :raises ValueError: if WHATSAPP_BROWSER_MODE is not one of MODES.
+    """
+    mode = os.environ.get(MODE_ENV, "headed").strip().lower() or "headed"
+    if mode not in MODES:
+        raise ValueError(f"Unknown {MODE_ENV} '{mode}', expected one of {MODES}")
+    return mode
+
+
+def add_arguments(options, mode):
+    """
+    Adds the command line flags of `mode` to Chrome options.
+    """
+    if mode == "headed":
+        return options
+    for flag in LEAN_FLAGS:
+        options.add_argument(flag)
+    if mode == "headless":
+        for flag in HEADLESS_FLAGS:
+            options.add_argument(flag)
+    return options
+
+
+def ensure_base(base):
+    """
+    Creates the base profile at `base` if it doesn't exist yet.
+    """
+    preferences = os.path.join(base, "Default", "Preferences")
+    if os.path.isfile(preferences):
+        return base
+    os.makedirs(os.path.dirname(preferences), exist_ok=True)
+    # Written aside and renamed, so a half-written base is never copied
+    partial = preferences + ".tmp"
+    with open(partial, "w", encoding="utf-8") as file:
+        json.dump(BASE_PREFERENCES, file)
+    open(os.path.join(base, "First Run"), "a").close()
+    os.replace(partial, preferences)
+    return base
+
+
+def _link_or_copy(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        # Other filesystem or no hard link support
+        shutil.copy2(source, target)
+
+
+def prepare_profile(path, base=None):
+    """
+    Creates the profile at `path` as an overlay of the base profile, unless
+    it exists already. Returns `path`.
+    """
+    if not os.path.exists(path):
+        base = base or os.path.join(os.path.dirname(os.path.abspath(path)), BASE_PROFILE)
+        shutil.copytree(ensure_base(base), path, copy_function=_link_or_copy)
+    return path
+
+
+def headless_user_agent(driver):
+    """
+    Makes a headless Chrome present itself as a regular one; WhatsApp Web
+    refuses browsers whose user agent says HeadlessChrome.
+    """
+    agent = driver.execute_script("return navigator.userAgent")
+    if "HeadlessChrome" in agent:
+        driver.execute_cdp_cmd(
+            "Network.setUserAgentOverride", {"userAgent": agent.replace("HeadlessChrome", "Chrome")}
+        )
+
+
+def resource_usage(driver, previous=None):
+    """
+    Memory and CPU used by the Chrome of a driver: chromedriver, the browser
+    and all of its child processes. Memory is the proportional set size where
+    the platform reports it (shared pages split between the processes sharing
+    them, so the sessions of a host add up), the resident set size otherwise.
+    :param previous: the sample returned last time for the same driver, to
+        compute the CPU use since then.
+    :return: dict with processes, memory_mb, cpu_seconds, cpu_percent and a
+        private "_sample"; None if psutil is not installed or Chrome is gone.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+
+    memory, cpu, counted = 0, 0.0, 0
+    for process in processes:
+        try:
+            if sys.platform.startswith("linux"):
+                memory += process.memory_full_info().pss
+            else:
+                memory += process.memory_info().rss
+            times = process.cpu_times()
+            cpu += times.user + times.system
+            counted += 1
+        except psutil.Error:
+            # Renderers come and go while the page runs
+            continue
+
+    now = time.monotonic()
+    cpu_percent = None
+    if previous and now > previous["_sample"][0]:
+        elapsed = now - previous["_sample"][0]
+        cpu_percent = round(max(0.0, cpu - previous["_sample"][1]) / elapsed * 100, 1)
+    return {
+        "processes": counted,
+        "memory_mb": round(memory / 2 ** 20, 1),
+        "cpu_seconds": round(cpu, 1),
+        "cpu_percent": cpu_percent,
+        "_sample": (now, cpu),
+    }
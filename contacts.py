@@ -0,0 +1,292 @@
+"""
+WhatsApp Automator - Contact ingestion
+Streams rows from CSV and XLSX contact files in constant memory and normalizes
+them into Contact records. A pre-parsed index (row count, columns, seek offsets,
+validation errors and the rows to skip) is cached next to each upload, so
+starting a campaign never has to parse the file up front.
+"""
+
+import csv
+import json
+import os
+from collections import Counter, namedtuple
+
+import media
+from phone import DEFAULT_REGION, normalize
+from templates import TemplateError, compile_template
+
+# position: row number, the header is row 0
+# offset: byte offset right after the row in a CSV file, where a resume starts
+# fields: every column of the row by header name, for message templates
+Contact = namedtuple("Contact", "position offset number message fields")
+
+# Resume point before the header row, same as journal.START
+START = (-1, 0)
+
+PHONE_COLUMNS = ("phone", "number", "phone_number", "mobile")
+MESSAGE_COLUMNS = ("message", "msg", "text")
+
+# A seek offset is stored every CHECKPOINT_EVERY contacts
+CHECKPOINT_EVERY = 1024
+# Validation errors kept in the index; the total count is always exact
+MAX_ERRORS = 100
+INDEX_VERSION = 5
+
+# Why a row is not sent
+INVALID = "invalid"                # missing or malformed number, no message or template value, missing media file
+DUPLICATE = "duplicate"            # same number as an earlier row
+KNOWN_INVALID = "known_invalid"    # could not be messaged in a past campaign
+
+
+class ContactFileError(Exception):
+    """
+    Raised when a contact file cannot be read at all.
+    """
+
+
+def iter_rows(path, start=START):
+    """
+    Yields (position, offset, cells) for every row after the `start` resume point.
+    """
+    if path.lower().endswith(".xlsx"):
+        return _iter_xlsx_rows(path, start[0])
+    return _iter_csv_rows(path, start)
+
+
+def _iter_csv_rows(path, start):
+    position, offset = start
+    with open(path, mode="rb") as file:
+        file.seek(offset)
+        # Lines are pulled one at a time, so tell() is always the end of the current row
+        lines = (line.decode("utf-8") for line in iter(file.readline, b""))
+        for position, cells in enumerate(csv.reader(lines), start=position + 1):
+            if position == 0 and cells:
+                # Excel saves CSV files with a byte order mark
+                cells[0] = cells[0].lstrip("\ufeff")
+            yield position, file.tell(), cells
+
+
+def _iter_xlsx_rows(path, after):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ContactFileError("Reading .xlsx files requires openpyxl (pip install openpyxl)")
+
+    # Read-only mode streams the sheet instead of loading it into memory
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for position, cells in enumerate(sheet.iter_rows(min_row=after + 2, values_only=True), start=after + 1):
+            yield position, 0, [_cell_text(cell) for cell in cells]
+    finally:
+        workbook.close()
+
+
+def _cell_text(cell):
+    if cell is None:
+        return ""
+    if isinstance(cell, float) and cell.is_integer():
+        # Phone numbers typed into Excel come back as floats
+        return str(int(cell))
+    return str(cell)
+
+
+def read_header(path):
+    for position, _, cells in iter_rows(path):
+        return [cell.strip() for cell in cells]
+    return []
+
+
+def column_positions(header):
+    """
+    Returns the (phone, message) column indexes for a header row, falling back
+    to the first two columns when the header doesn't name them.
+    """
+    names = [name.strip().lower() for name in header]
+    phone = next((i for i, name in enumerate(names) if name in PHONE_COLUMNS), 0)
+    message = next((i for i, name in enumerate(names) if name in MESSAGE_COLUMNS), 1)
+    return phone, message
+
+
+def to_contact(position, offset, cells, header):
+    """
+    Builds a Contact from the cells of one row.
+    """
+    if len(cells) == 1 and "," in cells[0]:
+        # Legacy format: the whole "phone,message" row quoted as a single field
+        cells = cells[0].split(",", 1)
+    elif len(header) <= 1 and len(cells) > 2:
+        # Legacy format without quotes: commas after the number belong to the message
+        cells = [cells[0], ",".join(cells[1:])]
+    cells = [cell.strip() for cell in cells]
+    phone, message = column_positions(header)
+    fields = dict(zip(header, cells)) if len(header) > 1 else {}
+    return Contact(
+        position,
+        offset,
+        cells[phone] if phone < len(cells) else "",
+        cells[message] if message < len(cells) else "",
+        fields,
+    )
+
+
+def validate(contact, region=DEFAULT_REGION, template=None):
+    """
+    Returns why a contact cannot be sent, or None if it looks valid.
+    :param template: bound templates.Template filling the message, if any.
+    """
+    if not contact.number:
+        return "missing phone number"
+    if normalize(contact.number, region) is None:
+        return f"malformed phone number '{contact.number}'"
+    if template is not None:
+        missing = template.missing(contact.fields)
+        if missing:
+            return f"missing {', '.join(missing)} for the template"
+    elif not contact.message and not media.row_media(contact.fields):
+        # A row with its own media file may leave the caption empty
+        return "missing message"
+    return None
+
+
+def iter_contacts(path, start=START, header=None):
+    """
+    Lazily yields a Contact for every non-empty row after `start`.
+    :param header: header row, read from the file when not given.
+    """
+    if header is None:
+        header = read_header(path)
+    for position, offset, cells in iter_rows(path, start):
+        if position == 0 or not any(cell.strip() for cell in cells):
+            continue
+        yield to_contact(position, offset, cells, header)
+
+
+def index_path(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, f".{filename}.idx.json")
+
+
+def build_index(path, region=DEFAULT_REGION, known_invalid=None, template=None):
+    """
+    Parses the whole file once and caches its index next to it.
+    Besides invalid rows, repeated numbers and numbers in `known_invalid`
+    (a phone.KnownInvalidIndex) are marked to be skipped. With a message
+    `template` (its text), rows are checked for the values it needs instead
+    of a message.
+    :raises ContactFileError: if the file cannot be parsed.
+    :raises TemplateError: if the template uses a column the file doesn't have.
+    """
+    header, rows, errors, error_count, offsets = [], 0, [], 0, []
+    seen, skip, skipped = set(), [], Counter()
+    compiled = compile_template(template)
+    media_errors = {}
+    try:
+        for position, offset, cells in iter_rows(path):
+            if position == 0:
+                header = [cell.strip() for cell in cells]
+                if compiled is not None:
+                    compiled.bind(header)
+                continue
+            if not any(cell.strip() for cell in cells):
+                continue
+            rows += 1
+            if rows % CHECKPOINT_EVERY == 0:
+                offsets.append([position, offset])
+            contact = to_contact(position, offset, cells, header)
+            error = validate(contact, region, compiled)
+            attachment = media.row_media(contact.fields)
+            if error is None and attachment:
+                # Rows usually share a few files, each is looked up once
+                if attachment not in media_errors:
+                    media_errors[attachment] = media.check(attachment)
+                error = media_errors[attachment]
+            if error:
+                error_count += 1
+                if len(errors) < MAX_ERRORS:
+                    errors.append([position, error])
+                reason = INVALID
+            else:
+                number = normalize(contact.number, region)
+                if number in seen:
+                    reason = DUPLICATE
+                elif known_invalid is not None and number in known_invalid:
+                    reason = KNOWN_INVALID
+                else:
+                    seen.add(number)
+                    continue
+            skip.append([position, reason])
+            skipped[reason] += 1
+    except (ContactFileError, TemplateError):
+        raise
+    except Exception as exc:
+        # Decoding, csv and the various openpyxl errors for corrupt workbooks alike
+        raise ContactFileError(f"Could not read '{os.path.basename(path)}': {exc}")
+
+    stat = os.stat(path)
+    index = {
+        "version": INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "region": region,
+        "known_invalid": known_invalid.generation if known_invalid is not None else None,
+        "template": template or None,
+        "media": _media_stamp(header),
+        "header": header,
+        "rows": rows,
+        "sendable": rows - len(skip),
+        "offsets": offsets,
+        "error_count": error_count,
+        "errors": errors,
+        "skipped": {reason: skipped[reason] for reason in (INVALID, DUPLICATE, KNOWN_INVALID)},
+        "skip": skip,
+    }
+    with open(index_path(path), "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    return index
+
+
+def _media_stamp(header):
+    """
+    Modification time of the media directory if the file names media per
+    row, so adding or removing media files invalidates the index.
+    """
+    if media.media_column(header) is None:
+        return None
+    try:
+        return os.stat(media.MEDIA_DIR).st_mtime
+    except OSError:
+        return 0
+
+
+def load_index(path, region=DEFAULT_REGION, known_invalid=None, template=None):
+    """
+    Returns the cached index of a contact file, rebuilding it if the file,
+    the region, the known invalid numbers or the template changed.
+    """
+    generation = known_invalid.generation if known_invalid is not None else None
+    try:
+        with open(index_path(path), "r", encoding="utf-8") as file:
+            index = json.load(file)
+        stat = os.stat(path)
+        if (index.get("version") == INDEX_VERSION and index["size"] == stat.st_size
+                and index["mtime"] == stat.st_mtime and index["region"] == region
+                and index["known_invalid"] == generation and index["template"] == (template or None)
+                and index["media"] == _media_stamp(index["header"])):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    return build_index(path, region, known_invalid, template)
+
+
+def seek_point(index, position):
+    """
+    Closest resume point at or before `position` from the index offsets,
+    for jumping into a CSV file by row number without reading what precedes it.
+    """
+    start = START
+    for checkpoint in index["offsets"]:
+        if checkpoint[0] > position:
+            break
+        start = tuple(checkpoint)
+    return start
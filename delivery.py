@@ -0,0 +1,98 @@
+"""
+WhatsApp Automator - Delivery tracking
+Keeps track of the status icon (clock, single tick, double tick) of every sent
+message. The bot refreshes all open messages with a single in-page script
+during the pause between two sends, so tracking never blocks the send loop.
+"""
+
+from collections import Counter
+
+PENDING = "pending"        # clock icon, not yet accepted by the server
+SENT = "sent"              # single tick
+DELIVERED = "delivered"    # double tick
+UNKNOWN = "unknown"        # no bubble was seen after clicking send
+
+ICON_STATES = {
+    "msg-time": PENDING,
+    "msg-check": SENT,
+    "msg-dblcheck": DELIVERED,
+}
+FINAL_STATES = (DELIVERED,)
+
+# Returns the status icon of each tracked message, or null once it left the page
+STATUS_SCRIPT = """
+return arguments[0].map(function (id) {
+    var bubble = document.querySelector('[data-id="' + CSS.escape(id) + '"]');
+    if (!bubble) { return null; }
+    var icon = bubble.querySelector("span[data-icon^='msg-']");
+    return icon ? icon.getAttribute('data-icon') : null;
+});
+"""
+
+
+class DeliveryTracker:
+    """
+    Follows sent messages by their WhatsApp message id until they reach a final
+    state or can no longer be observed, then reports them to `on_final`.
+    Only messages still being followed are kept in memory.
+    """
+
+    def __init__(self, on_final=None):
+        self._open = {}            # message id -> [number, state]
+        self._finished = Counter()
+        self._on_final = on_final
+
+    def register(self, number, message_id, icon):
+        """
+        Starts following a message just sent to `number`.
+        """
+        state = ICON_STATES.get(icon, UNKNOWN)
+        if not message_id or state in FINAL_STATES:
+            self._finish(number, state)
+        else:
+            self._open[message_id] = [number, state]
+
+    def message_ids(self):
+        return list(self._open)
+
+    def update(self, icons):
+        """
+        Applies the icons read from the page, keyed by message id.
+        A missing icon means the chat was closed: the last seen state is final.
+        """
+        for message_id, icon in icons.items():
+            entry = self._open.get(message_id)
+            if entry is None:
+                continue
+            if icon is not None:
+                entry[1] = ICON_STATES.get(icon, entry[1])
+            if icon is None or entry[1] in FINAL_STATES:
+                del self._open[message_id]
+                self._finish(*entry)
+
+    def finish_all(self):
+        """
+        Reports every message still followed with its last seen state.
+        """
+        for number, state in self._open.values():
+            self._finish(number, state)
+        self._open.clear()
+
+    def open_count(self, state):
+        """
+        Number of messages still followed that are in `state`.
+        """
+        return sum(1 for _, current in self._open.values() if current == state)
+
+    def counts(self):
+        """
+        Number of messages per state, finished and still followed.
+        """
+        counts = Counter(self._finished)
+        counts.update(state for _, state in self._open.values())
+        return dict(counts)
+
+    def _finish(self, number, state):
+        self._finished[state] += 1
+        if self._on_final:
+            self._on_final(number, state)
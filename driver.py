@@ -1,109 +1,323 @@
 
-import csv
 import os.path
-import random
 import time
-from time import sleep
+from urllib.parse import quote
 from colorama import Fore, Style
 from selenium import webdriver
-from selenium.common import TimeoutException
+from selenium.common import (
+    NoSuchElementException, SessionNotCreatedException, StaleElementReferenceException, TimeoutException, WebDriverException,
+)
 from selenium.webdriver import Keys
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+import chrome_profile
+import contacts
+import driver_cache
+import media
+import metrics
+import pacing
+import phone
+import retries
+import send_script
+from delivery import PENDING, STATUS_SCRIPT, DeliveryTracker
+from journal import START, CampaignJournal
+from selector_registry import SelectorRegistry
+from templates import compile_template
+from waits import Cancelled, JitterPolicy, RunControl, Waiter
 # Define a timeout for waiting for elements to load\
 
 timeout = 30
+# How long the search results may take to render before a number counts as not found
+search_timeout = 2
+# How long to wait for a sent message to show its clock or tick icon
+bubble_timeout = 5
+# Pause after an unexpected error while loading WhatsApp Web, before reloading
+login_retry_delay = 2
+# How often the ticks of sent messages are refreshed during the pause between sends
+delivery_check_interval = 0.5
+
+# Overridable to point the bot at a stand-in such as bench/fake_whatsapp.py
+WHATSAPP_URL = os.environ.get("WHATSAPP_URL", "https://web.whatsapp.com").rstrip("/")
+# How a chat is opened for each contact: through the search box or the send URL
+OPEN_MODES = ("search", "url")
+# Messages still showing the clock icon at once that count as a sign of throttling
+throttle_pending = 3
+# Chrome profile holding the linked WhatsApp session
+DEFAULT_PROFILE = "Whatsapp-Automator-main"
+# Failed pastes in a row after which a bot types its messages key by key
+paste_max_failures = 3
+# Failed in-page sends in a row after which a bot sends step by step
+script_max_failures = 3
+# Element timeout of a retried contact: a page that is merely slow rendered by then
+retry_timeout = 10
+
+# Pastes a whole message into the message box in one call, the way the
+# clipboard would, and reports whether the editor shows it afterwards. The
+# editor renders each line as its own paragraph, the first one being the
+# message box itself, so the whole editor is read and whitespace is not compared.
+PASTE_SCRIPT = """
+var box = arguments[0], text = arguments[1], done = arguments[arguments.length - 1];
+var strip = function (s) { return (s || '').replace(/\\s+/g, ''); };
+var editor = box.closest('[contenteditable="true"]') || box;
+editor.focus();
+var data = new DataTransfer();
+data.setData('text/plain', text);
+box.dispatchEvent(new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true}));
+// The editor updates the page after the event handler returned
+setTimeout(function () { done(strip(editor.innerText) === strip(text)); }, 0);
+"""
 
 class Bot:
     """
     Bot class that automates WhatsApp Web interactions using a Chrome driver.
     """
 
-    def __init__(self):
+    def __init__(self, profile_dir=None, mode=None):
+        """
+        :param profile_dir: Chrome profile directory, one per linked WhatsApp account.
+        :param mode: "headed", "lite" or "headless", see chrome_profile.py;
+            WHATSAPP_BROWSER_MODE if not given.
+        """
         # Configure Chrome options
         options = Options()
 
-        user_data_dir = os.path.join(os.getcwd(), "Whatsapp-Automator-main")
+        user_data_dir = chrome_profile.prepare_profile(profile_dir or os.path.join(os.getcwd(), DEFAULT_PROFILE))
         options.add_argument(f"--user-data-dir={user_data_dir}")
+        self.mode = mode or chrome_profile.run_mode()
+        chrome_profile.add_arguments(options, self.mode)
 
-        # Initialize the undetected Chrome driver
-        self.driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()), 
-            options=options
-        )
+        # Initialize the Chrome driver with a locally resolved chromedriver
+        try:
+            self.driver = webdriver.Chrome(service=ChromeService(driver_cache.resolve()), options=options)
+        except SessionNotCreatedException:
+            # Usually a Chrome update made the remembered driver outdated
+            driver_cache.invalidate()
+            self.driver = webdriver.Chrome(service=ChromeService(driver_cache.resolve()), options=options)
+        if self.mode == "headless":
+            chrome_profile.headless_user_agent(self.driver)
+        # The in-page send script gives up on its own before this
+        self.driver.set_script_timeout(send_script.script_timeout(timeout, bubble_timeout) + timeout)
+        # Last resource sample, to report the CPU use between two reports
+        self._usage = None
         self._csv_numbers = None
         self._start_time = None
-        self._loaction = -1
-        self._start = None
+        self._position = 0
+        # Byte offset in the CSV file right after the current row
+        self._offset = 0
+        self._log_files = {}
+        # Campaign journal and id; a new campaign is journaled if none is set
+        self.journal = None
+        self.campaign_id = None
+        self._open_mode = "search"
+        # Region of the numbers written without a country code, see phone.py
+        self.region = phone.DEFAULT_REGION
+        # phone.KnownInvalidIndex of numbers to skip, read from the logs if not set
+        self.known_invalid = None
+        # Message template filled from the columns of each row, see templates.py;
+        # without one the message column is sent as is
+        self.template = None
+        # Send media with the messages (with_media)
+        self._options = False
+        # Media file attached to every message when media is on, unless the
+        # row names its own; a file name in data/media/, see media.py
+        self.media = None
+        # Media file name -> absolute path handed to the file input
+        self._staged = {}
+        # (index, count): only every count-th contact starting at index is sent by this bot
+        self._shard = (0, 1)
+        # Decides the wait before each message, see pacing.Pacer
+        self.pacing = pacing.Pacer()
+        # pacing outcome of the last send_message_to_contact call
+        self.last_outcome = None
+        # retries.PERMANENT, TRANSIENT or UNCONFIRMED if the last send failed
+        self.last_failure = None
+        # Contacts to send again after a transient failure, see retries.py
+        self.retries = retries.RetryQueue()
+        # True while the retry queue is being worked off
+        self.retrying = False
+        # Element timeout of the send steps, shorter on retries
+        self._timeout = timeout
+        # Paste messages in one script call instead of typing them, see type_message
+        self.fast_input = True
+        self._paste_failures = 0
+        # Send text messages with one in-page script per contact, see send_script.py
+        self.batch_send = True
+        self._script_failures = 0
+        # How the last message was entered: "paste" or "keys"
+        self.last_input = None
+        # Stage timings of the current campaign, also counted process-wide for /api/metrics
+        self.metrics = metrics.Metrics(parent=metrics.REGISTRY)
+        # Pause, resume and cancel of the campaign, checked by every wait and sleep
+        self._control = RunControl()
+        self.waits = Waiter(self.driver, control=self._control)
+        self.selectors = SelectorRegistry(self.driver, self.waits)
+        self.jitter = JitterPolicy()
+        self.delivery = DeliveryTracker(on_final=self.log_delivery)
+        self.logged_in = False
+        # Keep the browser open after a campaign so the next one can reuse it
+        self.keep_alive = False
 
     def click_button(self, css_selector):
         """
         Clicks the specified button by its CSS selector.
         """
-        button = WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, css_selector))
+        button = self.waits.until(
+            "click_button", EC.element_to_be_clickable((By.CSS_SELECTOR, css_selector)), timeout
         )
-        sleep(0.2)
         button.click()
 
     def login(self):
+        """
+        Logs in to WhatsApp Web, unless this bot already is, and sends the campaign.
+        """
+        if not self.logged_in:
+            self.open_whatsapp()
+        # Record the start time for logs once the login is successful
+        self._start_time = time.strftime("%d-%m-%Y_%H%M%S", time.localtime())
+        self.send_messages_to_all_contacts()
+
+    def open_whatsapp(self):
         """
         Logs in to WhatsApp Web by navigating to the login page.
         Waits indefinitely until the QR code is scanned and/or clickable element appears.
         """
         logged_in = False  # Track login status
+        self.driver.get(WHATSAPP_URL)
+        print("Attempting to load WhatsApp Web...")
 
         while not logged_in:  # Loop only until login is successful
             try:
-                self.driver.get('https://web.whatsapp.com')
-                print("Attempting to load WhatsApp Web...")
-
-                # Wait for the clickable element, success_message and error_message are shown only once
-                logged_in = self.wait_for_element_to_be_clickable(
-                "//div[@contenteditable='true' and @data-tab='3']",
-                success_message="Logged in successfully!",
-                error_message="Waiting for QR code to be scanned..."
-                )
+                # Keep polling the same page so the QR code is not reloaded while the user scans it
+                self.selectors.find("login_search", timeout)
+                print(Fore.GREEN + "Logged in successfully!" + Style.RESET_ALL)
+                logged_in = True
 
-                if logged_in:
-                    break  # Exit the loop on successful login
+            except TimeoutException:
+                print(Fore.RED + "Waiting for QR code to be scanned..." + Style.RESET_ALL)
+
+            except Cancelled:
+                raise
 
             except Exception as e:
                 print(f"Error during login: {e}")
                 print("Retrying login...")
+                # Back off briefly so a broken page doesn't turn into a reload loop
+                self._control.sleep(login_retry_delay)
+                self.driver.get(WHATSAPP_URL)
 
-            # Wait before retrying to prevent an infinite loop from flooding the system
-            time.sleep(25)
+        # Wait for whatsapp to render the chat list, then resolve the main screen selectors once
+        self.selectors.find("chat_list", timeout, EC.presence_of_element_located)
+        self.selectors.resolve_all()
+        self.logged_in = True
 
-        # Wait for whatsapp to load messages
-        time.sleep(5)
-        # Record the start time for logs once the login is successful
-        self._start_time = time.strftime("%d-%m-%Y_%H%M%S", time.localtime())
-        self.send_messages_to_all_contacts()
-    
-    def log_result(self, number, error):
+    def is_alive(self):
         """
-        Logs the result of each message send attempt.
+        True if the browser still responds and shows WhatsApp Web.
         """
-        assert self._start_time is not None
-        log_path = "logs/" + self._start_time + ("_notsent.txt" if error else "_sent.txt")
+        try:
+            return self.driver.current_url.startswith(WHATSAPP_URL)
+        except WebDriverException:
+            return False
 
-        with open(log_path, "a") as logfile:
-            logfile.write(number.strip() + "\n")
+    def log_result(self, number, error, position=None):
+        """
+        Logs the result of each message send attempt in the campaign journal,
+        which also moves the resume cursor past this row, and in the text logs.
+        :param position: row of a retried contact; the cursor is past it already.
+        """
+        assert self._start_time is not None
+        if error and self.last_failure == retries.UNCONFIRMED:
+            outcome, suffix = "unconfirmed", "_unconfirmed.txt"
+        elif error:
+            outcome, suffix = "not_sent", "_notsent.txt"
+        else:
+            outcome, suffix = "sent", "_sent.txt"
+        if position is None:
+            self.journal.record(
+                self.campaign_id, self._shard[0], number.strip(), self._position, self._offset, outcome,
+            )
+        else:
+            self.journal.resolve(self.campaign_id, number.strip(), position, outcome)
+        self.write_log(suffix, number.strip())
+        if error and self.last_outcome == pacing.NOT_FOUND:
+            # Only numbers WhatsApp itself rejected feed phone.KnownInvalidIndex
+            self.write_log("_notfound.txt", number.strip())
 
-    def paste_media(self):
+    def log_deferred(self, number):
         """
-        Pastes selected media using CTRL+V.
+        Journals a contact as waiting for a retry and moves the resume cursor
+        past it; a resumed campaign picks it up again, see load_deferred.
         """
-        message_box_selector = "#main > footer > div.x1n2onr6.xhtitgo.x9f619.x78zum5.x1q0g3np.xuk3077.x193iq5w.x122xwht.x1bmpntp.xs9asl8.x1swvt13.x1pi30zi.xnpuxes.copyable-area > div > span > div > div._ak1r > div.x9f619.x12lumcd.x1qrby5j.xeuugli.xisnujt.x6prxxf.x1fcty0u.x1fc57z9.xe7vic5.x1716072.xgde2yp.x89wmna.xbjl0o0.x13fuv20.xu3j5b3.x1q0q8m5.x26u7qi.x178xt8z.xm81vs4.xso031l.xy80clv.x1lq5wgf.xgqcy7u.x30kzoy.x9jhf4c.x1a2a7pz.x13w7htt.x78zum5.x96k8nx.xdvlbce.x1ye3gou.xn6708d.x1ok221b.xu06os2.x1i64zmx.x1emribx > div > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x6prxxf > p"
-        message_box = WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, message_box_selector))
+        self.journal.record(
+            self.campaign_id, self._shard[0], number.strip(), self._position, self._offset, "retry",
         )
-        message_box.send_keys(Keys.CONTROL, 'v')
+
+    def log_skipped(self, contact, reason):
+        """
+        Logs a row that is not sent at all and moves the resume cursor past it.
+        Skipped rows are kept out of the sent/not sent logs and journal results.
+        """
+        self.journal.advance(self.campaign_id, self._shard[0], self._position, self._offset)
+        self.write_log("_skipped.csv", f"{contact.number or ''},{reason}")
+
+    def log_delivery(self, number, state):
+        """
+        Logs the last known delivery state of a sent message.
+        """
+        self.write_log("_delivery.csv", f"{number.strip()},{state}")
+
+    def write_log(self, suffix, line):
+        """
+        Appends a line to logs/<start_time><suffix>. The files stay open for the
+        whole campaign and are line buffered, so each result costs one write.
+        """
+        assert self._start_time is not None
+        logfile = self._log_files.get(suffix)
+        if logfile is None:
+            logfile = open("logs/" + self._start_time + suffix, "a", buffering=1)
+            self._log_files[suffix] = logfile
+        logfile.write(line + "\n")
+
+    def close_logs(self):
+        for logfile in self._log_files.values():
+            logfile.close()
+        self._log_files = {}
+
+    def attach_media(self, path, caption=""):
+        """
+        Sends a file to the open chat through the file input of the attach menu,
+        with `caption` as its text. Photos and videos go out with a preview,
+        other files as documents.
+        """
+        self.selectors.find("attach_button", self._timeout).click()
+        name = "media_input" if media.is_preview(path) else "document_input"
+        file_input = self.selectors.find(name, self._timeout, EC.presence_of_element_located)
+        file_input.send_keys(path)
+
+        if caption:
+            caption_box = self.selectors.find("media_caption", self._timeout)
+            caption_box.click()
+            self.type_message(caption_box, caption)
+        self.selectors.find("media_send_button", self._timeout).click()
+
+    def media_for(self, contact):
+        """
+        Absolute path of the file to attach to a contact's message, None for a text message.
+        """
+        if not self._options:
+            return None
+        name = media.row_media(contact.fields) or self.media
+        if not name:
+            return None
+        path = self._staged.get(name)
+        if path is None:
+            # Resolved once, every contact sharing the file reuses the path
+            path = self._staged[name] = media.resolve(name) or os.path.abspath(
+                os.path.join(media.MEDIA_DIR, os.path.basename(name))
+            )
+        return path
 
     def quit_driver(self):
         """
@@ -113,145 +327,629 @@ class Bot:
             self.driver.quit()
             print(Fore.YELLOW, "Driver closed successfully.", Style.RESET_ALL)
 
+    def resource_usage(self):
+        """
+        Memory and CPU used by this bot's Chrome, None if it can't be measured.
+        """
+        usage = chrome_profile.resource_usage(self.driver, self._usage)
+        if usage is None:
+            return None
+        self._usage = usage
+        return {key: value for key, value in usage.items() if not key.startswith("_")}
+
+    def check_session(self):
+        """
+        Health check of an idle bot: False if the browser is gone. A bot whose
+        WhatsApp Web session ended (e.g. unlinked from the phone) is marked
+        as logged out so its next campaign logs in again.
+        """
+        if not self.is_alive():
+            return False
+        try:
+            if self.logged_in and not self.selectors.find_now("chat_list"):
+                self.logged_in = False
+        except WebDriverException:
+            return False
+        return True
+
+    def quit_driver_quietly(self):
+        """
+        Quits the browser, ignoring a driver that is already gone.
+        """
+        try:
+            self.quit_driver()
+        except Exception:
+            pass
+
     def open_chat_with_contact(self, contact_number):
         """
         Opens the chat with the given contact name using the search function.
+        :return: True if the chat was opened, False if the number is not on WhatsApp.
         """
+        # Message box of the chat still open, to tell when the new one replaced it
+        previous = self.chat_box()
         # Click on the search box to start searching for the contact
-        add_contact_selector = "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div._aigw._as6h.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x12xzxwr.x1plvlek.xryxfnj.x570efc.x18dvir5.xxljpkc.xwfak60.x18pi947 > header > header > div > span > div > div:nth-child(1) > span > button > div > div > div:nth-child(1) > span"
-        add_sign = WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, add_contact_selector))
-        )
-        sleep(0.1)
+        add_sign = self.selectors.find("new_chat_button", self._timeout)
         add_sign.click()
-        search_box_selector = "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x11uqc5h.x9f619.x78zum5.x1okw0bk.xl2dz39.xexx8yu.x18d9i69.x73uwhe.x1qhh985.x1sy0etr.xa3a66u.x1gnnqk1.x1phvje8.xcldk2z.x7a106z.x4tpdpg > div.x1n2onr6.x9f619.x98rzlu.x6ikm8r.x10wlt62 > div > div > div > p"
-        search_box = WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, search_box_selector))
-        )
-        sleep(0.1)
+        search_box = self.selectors.find("search_box", self._timeout)
         search_box.click()
         # Type the contact number into the search box
-        search_box.send_keys("+2" + contact_number)
-        sleep(0.3)  # Wait for search results to appear
+        search_box.send_keys("+" + self.dial_number(contact_number))
 
-        # Click on the contact from the search results
+        # Wait for the search results: a saved contact or an unsaved number on WhatsApp
         try:
-            # In the contacts
-            contact_chat_selector = "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x6ikm8r.x1odjw0f.x1hc1fzr.x1anedsm.x1280gxy > div:nth-child(2) > div > div > div:nth-child(2) > div > div"
-            contact = WebDriverWait(self.driver, 0.5).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR,contact_chat_selector))
-        )
-            sleep(0.2)  # Wait for the chat to open
-            contact.click()
+            _, contact = self.selectors.find_any(("contact_result", "unsaved_result"), search_timeout)
+        # number not found on whatsapp
         except TimeoutException:
-            try:
-                #Not in the contacts
-                contact_chat_selector = "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x6ikm8r.x1odjw0f.x1hc1fzr.x1anedsm.x1280gxy > div._ak72.false.false.false._ak73._asiw._ap1-._ap1_"
-                contact = WebDriverWait(self.driver, 0.5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,contact_chat_selector))
-                )
-                sleep(0.2)  # Wait for the chat to open
-                contact.click()
-            # number not found on whatsapp
-            except TimeoutException:
-                self.log_result(contact_number, True)
-                clean_selector = "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x11uqc5h.x9f619.x78zum5.x1okw0bk.xl2dz39.xexx8yu.x18d9i69.x73uwhe.x1qhh985.x1sy0etr.xa3a66u.x1gnnqk1.x1phvje8.xcldk2z.x7a106z.x4tpdpg > div.x1n2onr6.x9f619.x98rzlu.x6ikm8r.x10wlt62 > span > button > span"
-                clean_button = WebDriverWait(self.driver, timeout).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, clean_selector))
-                    )
-                sleep(0.1)
-                clean_button.click()
-                return_selector = "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > header > div > div.x1okw0bk > div > span > button > div > div > div:nth-child(1) > span"
-                return_button = WebDriverWait(self.driver, timeout).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, return_selector))
-                    )
-                sleep(0.1)
-                return_button.click()
-                self._loaction = self._start
-                self.send_messages_to_all_contacts()
-        
-
-    def send_message_to_contact(self, number, message):
+            self.clear_search()
+            return False
+        contact.click()
+        self.wait_for_chat(previous)
+        return True
+
+    def chat_box(self):
+        """
+        Message box of the open chat, None if no chat is open.
+        """
+        boxes = self.selectors.find_now("message_box")
+        return boxes[0] if boxes else None
+
+    def wait_for_chat(self, previous):
+        """
+        Waits until the chat just opened replaced the one whose message box was
+        `previous`: that box went stale or another one shows. Until then the
+        old chat's composer and footer are still on the page and would take the
+        message or the attachment.
+        :return: the message box of the new chat.
+        """
+        swapped = previous is None
+
+        def swapped_in(locator):
+            def check(driver):
+                nonlocal swapped
+                if not swapped:
+                    try:
+                        previous.is_enabled()
+                    except StaleElementReferenceException:
+                        swapped = True
+                box = EC.element_to_be_clickable(locator)(driver)
+                return box if box and (swapped or box != previous) else False
+            return check
+
+        return self.selectors.find("message_box", self._timeout, swapped_in)
+
+    def open_chat_via_url(self, contact_number, message):
+        """
+        Opens the chat directly through WhatsApp Web's send URL with the message prefilled,
+        skipping the new chat button and the search box.
+        :return: True if the chat was opened, False if WhatsApp rejected the number.
+        """
+        self.driver.get(self.send_url(contact_number, message))
+
+        # Either the composer shows up or WhatsApp reports the number as invalid
+        found, element = self.selectors.find_any(
+            ("message_box", "invalid_number_popup"), self._timeout, EC.presence_of_element_located
+        )
+        if found == "invalid_number_popup":
+            element.click()
+            return False
+        return True
+
+    def send_url(self, contact_number, message):
+        """
+        WhatsApp Web's send URL opening the chat with the message prefilled.
+        """
+        return f"{WHATSAPP_URL}/send?phone={self.dial_number(contact_number)}&text={quote(message)}"
+
+    def dial_number(self, contact_number):
+        """
+        Returns the number in E.164 format without the leading "+".
+        :raises ValueError: if it is not a valid phone number.
+        """
+        number = phone.normalize(contact_number, self.region)
+        if number is None:
+            raise ValueError(f"Invalid phone number '{contact_number}'")
+        return number[1:]
+
+    def clear_search(self):
+        """
+        Clears the search box and returns to the chat list after a failed lookup.
+        """
+        clean_button = self.selectors.find("clean_button", self._timeout)
+        clean_button.click()
+        return_button = self.selectors.find("return_button", self._timeout)
+        return_button.click()
+
+    def send_message_to_contact(self, number, message, attachment=None):
+        self.last_failure = None
+        # Attachments go through the file input, which only WebDriver can fill
+        if self.batch_send and self.fast_input and not attachment:
+            error = self.send_in_page(number, message)
+            if error is not None:
+                return error
+
+        started = time.perf_counter()
         try:
             # Open the chat with the contact
-            
-            self.open_chat_with_contact(number)
-    
-            sleep(random.uniform(0.4, 0.5))  # Random delay to simulate human behavior
-
-            # Locate the message box
-            message_box_selector = "#main > footer > div.x1n2onr6.xhtitgo.x9f619.x78zum5.x1q0g3np.xuk3077.xjbqb8w.x1wiwyrm.xvc5jky.x11t971q.xquzyny.xnpuxes.copyable-area > div > span > div > div._ak1r > div > div.x1n2onr6.xh8yej3.xjdcl3y.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x6prxxf > p"
-            message_box = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, message_box_selector))
-            )
-            print("Message box located successfully.")
+            if self._open_mode == "url":
+                # An attachment carries the message as its caption instead
+                opened = self.open_chat_via_url(number, "" if attachment else message)
+            else:
+                opened = self.open_chat_with_contact(number)
+            started = self.lap("open_chat", started)
+            if not opened:
+                print(Fore.RED, "Number not found on WhatsApp.", Style.RESET_ALL)
+                self.last_outcome = pacing.NOT_FOUND
+                self.last_failure = retries.PERMANENT
+                return True  # Not on WhatsApp, nothing was sent
 
-            # Click the message box to ensure focus
-            message_box.click()
-            sleep(0.1)  # Short sleep to ensure the box is in focus
+            if self._open_mode == "search":
+                self.jitter.pause("after_open", self._control.sleep)  # Random delay to simulate human behavior
+                started = self.lap("jitter", started)
 
-            # Clear the message box before typing the message
-            message_box.clear()
+            if attachment:
+                # The new bubble is told apart from the chat's earlier messages by its data-id
+                previous_bubble = self.last_bubble_id()
+                self.attach_media(attachment, message)
+                started = self.lap("attach", started)
+                print("Media attached successfully.")
+            else:
+                # The send URL already prefilled the message box
+                if self._open_mode == "search":
+                    # Locate the message box of the chat open_chat_with_contact waited for
+                    message_box = self.selectors.find("message_box", self._timeout)
+                    print("Message box located successfully.")
 
-            # Type the message into the message box
-            self.type_message(message_box, message)
+                    # Click the message box to ensure focus
+                    message_box.click()
 
-            # Locate and click the send button
-            send_button_selector = "#main > footer > div.x1n2onr6.xhtitgo.x9f619.x78zum5.x1q0g3np.xuk3077.xjbqb8w.x1wiwyrm.xquzyny.xvc5jky.x11t971q.xnpuxes.copyable-area > div > span > div > div._ak1r > div > div.x9f619.x78zum5.x6s0dn4.xl56j7k.xpvyfi4.x2lah0s.x1c4vz4f.x1fns5xo.x1ba4aug.x1c9tyrk.xeusxvb.x1pahc9y.x1ertn4p.x1pse0pq.xpcyujq.xfn3atn.x1ypdohk.x1m2oepg > div > span > button > div > div > div:nth-child(1) > span"
-            send_button = WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, send_button_selector))
-            )
+                    # Clear the message box before typing the message
+                    message_box.clear()
+                    started = self.lap("locate_box", started)
+
+                    # Type the message into the message box
+                    self.type_message(message_box, message)
+                    started = self.lap("type", started, input=self.last_input)
+
+                # Locate and click the send button
+                send_button = self.selectors.find("send_button", self._timeout)
+                previous_bubble = self.last_bubble_id()
+
+                print("Send button located successfully.")
+                send_button.click()
+                started = self.lap("click_send", started)
 
-            print("Send button located successfully.")
-            send_button.click()
+            # Move on as soon as the new bubble shows its clock or tick
+            try:
+                status_icon = self.selectors.find("last_bubble_status", bubble_timeout, self.new_bubble(previous_bubble))
+            except (TimeoutException, Cancelled):
+                # Already sent, so a cancel takes effect before the next contact instead
+                print(Fore.YELLOW, "Sent message bubble not seen yet.", Style.RESET_ALL)
+                status_icon = None
+            self.lap("confirm", started)
+            self.track_delivery(number, status_icon)
 
-            # Introduce a random sleep to avoid detection as a bot
-            sleep(random.uniform(0.4, 0.6))
+            # Messages piling up unacknowledged mean WhatsApp is holding them back
+            try:
+                self.check_deliveries()
+            except WebDriverException:
+                pass
+            if status_icon is None or self.delivery.open_count(PENDING) >= throttle_pending:
+                self.last_outcome = pacing.THROTTLED
+            else:
+                self.last_outcome = pacing.SENT
 
             print(Fore.GREEN, "Message sent successfully.", Style.RESET_ALL)
             return False  # No error
 
+        except Cancelled:
+            # Nothing was sent: no log entry, the contact is sent again on resume
+            raise
         except Exception as e:
             print(e)
             print(Fore.RED, "Error sending message.", Style.RESET_ALL)
+            self.last_outcome = pacing.ERROR
+            self.last_failure = retries.classify(e)
             return True  # Error occurred
 
+    def send_in_page(self, number, message):
+        """
+        Sends a text message with one in-page script call (see send_script.py)
+        instead of a WebDriver command per step.
+        Returns the error flag as send_message_to_contact does, or None if the
+        script gave up before clicking send, so the steps can take over.
+        """
+        started = time.perf_counter()
+        try:
+            if self._open_mode == "url":
+                self.driver.get(self.send_url(number, message))
+                opened = time.perf_counter() - started
+                arguments = send_script.arguments(self.selectors, None, "", self._timeout, search_timeout, bubble_timeout)
+            else:
+                opened = 0
+                arguments = send_script.arguments(
+                    self.selectors, self.dial_number(number), message, self._timeout, search_timeout, bubble_timeout
+                )
+        except Exception as e:
+            # Nothing ran in the page yet, so this fails like any step would
+            print(e)
+            print(Fore.RED, "Error sending message.", Style.RESET_ALL)
+            self.last_outcome = pacing.ERROR
+            self.last_failure = retries.classify(e)
+            return True
+        try:
+            result = self.run_send_script(arguments)
+        except Cancelled:
+            # Stopped before the script clicked send: it emptied what it typed
+            raise
+        except Exception as e:
+            # The script may have clicked send before it broke: don't send again,
+            # and don't log a message that may be out as not sent either
+            print(e)
+            print(Fore.YELLOW, "In-page send broke, the message may have been sent.", Style.RESET_ALL)
+            self.script_failed()
+            self.last_outcome = pacing.ERROR
+            self.last_failure = retries.UNCONFIRMED
+            return True
+
+        timings = dict(result.get("timings") or {})
+        if opened:
+            timings["open_chat"] = timings.get("open_chat", 0) + opened * 1000
+        for stage, elapsed in timings.items():
+            self.metrics.observe(stage, elapsed / 1000, open_mode=self._open_mode, path="script")
+
+        status = result.get("status")
+        if status == "failed":
+            print(Fore.YELLOW, f"In-page send stopped at {result.get('stage')}: {result.get('reason')}, "
+                               f"sending step by step.", Style.RESET_ALL)
+            self.script_failed()
+            return None
+        self._script_failures = 0
+        if status == "not_found":
+            print(Fore.RED, "Number not found on WhatsApp.", Style.RESET_ALL)
+            self.last_outcome = pacing.NOT_FOUND
+            self.last_failure = retries.PERMANENT
+            return True
+
+        self.last_input = "script"
+        if status == "sent":
+            self.delivery.register(number, result.get("message_id"), result.get("icon"))
+        else:
+            print(Fore.YELLOW, "Sent message bubble not seen yet.", Style.RESET_ALL)
+            self.delivery.register(number, None, None)
+        try:
+            self.check_deliveries()
+        except WebDriverException:
+            pass
+        if status != "sent" or self.delivery.open_count(PENDING) >= throttle_pending:
+            self.last_outcome = pacing.THROTTLED
+        else:
+            self.last_outcome = pacing.SENT
+        print(Fore.GREEN, "Message sent successfully.", Style.RESET_ALL)
+        return False
+
+    def run_send_script(self, arguments):
+        """
+        Runs send_script.SEND_SCRIPT to its result in slices of
+        send_script.SLICE_MS, checking the run control between two of them: a
+        pause holds the script's waits and a stop cancels the script.
+        :raises Cancelled: if stopped before the script clicked send; once it
+            clicked, its result is returned and the stop takes effect after.
+        """
+        result = self.driver.execute_async_script(send_script.SEND_SCRIPT, arguments)
+        cancelled = False
+        while result.get("status") == "running":
+            paused = None
+            if not cancelled and (self._control.paused or self._control.cancelled):
+                # The script's waits hold for as long as the bot is held
+                self.driver.execute_async_script(send_script.WAIT_SCRIPT, send_script.control(paused=True, slice_ms=0))
+                try:
+                    self._control.checkpoint()
+                    paused = False
+                except Cancelled:
+                    cancelled = True
+            result = self.driver.execute_async_script(send_script.WAIT_SCRIPT, send_script.control(paused, cancelled))
+        status = result.get("status")
+        if status == "lost":
+            raise WebDriverException("The page lost the in-page send, it was probably reloaded")
+        if status == "failed" and result.get("reason") == "cancelled":
+            raise Cancelled()
+        return result
+
+    def script_failed(self):
+        self._script_failures += 1
+        if self._script_failures >= script_max_failures:
+            print(Fore.YELLOW, "In-page sends keep failing, sending step by step instead.", Style.RESET_ALL)
+            self.batch_send = False
+
+    def lap(self, stage, started, **labels):
+        """
+        Records the time since `started` (a perf_counter value) as one sample of
+        `stage`, see metrics.py, and returns the current time to start the next stage.
+        """
+        now = time.perf_counter()
+        self.metrics.observe(stage, now - started, open_mode=self._open_mode, **labels)
+        return now
+
+    def last_bubble_id(self):
+        """
+        data-id of the last outgoing bubble of the open chat, None if it has none.
+        """
+        icons = self.selectors.find_now("last_bubble_status")
+        try:
+            return self.bubble_id(icons[0]) if icons else None
+        except (NoSuchElementException, StaleElementReferenceException):
+            return None
+
+    @staticmethod
+    def bubble_id(status_icon):
+        """
+        data-id of the bubble a status icon belongs to.
+        """
+        return status_icon.find_element(By.XPATH, "./ancestor::div[@data-id][1]").get_attribute("data-id")
+
+    def new_bubble(self, previous_id):
+        """
+        Condition on the last bubble's status icon that only matches once the
+        last bubble is no longer the one with `previous_id`, i.e. the message
+        just sent showed up instead of an earlier one.
+        """
+        def condition(locator):
+            def check(driver):
+                status_icon = EC.presence_of_element_located(locator)(driver)
+                return status_icon if self.bubble_id(status_icon) != previous_id else False
+            return check
+        return condition
+
+    def track_delivery(self, number, status_icon):
+        """
+        Registers a sent message with the delivery tracker, identified by the
+        data-id of its bubble so its ticks can be refreshed later.
+        """
+        message_id = icon = None
+        if status_icon is not None:
+            try:
+                icon = status_icon.get_attribute("data-icon")
+                message_id = self.bubble_id(status_icon)
+            except WebDriverException:
+                pass
+        self.delivery.register(number, message_id, icon)
+
+    def check_deliveries(self):
+        """
+        Refreshes the ticks of all tracked messages with one script call.
+        """
+        message_ids = self.delivery.message_ids()
+        if message_ids:
+            icons = self.driver.execute_script(STATUS_SCRIPT, message_ids)
+            self.delivery.update(dict(zip(message_ids, icons)))
+
+    def pause_between_messages(self, seconds):
+        """
+        Waits out the pause between two messages, using it to refresh the
+        delivery state of the messages already sent.
+        """
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                self.check_deliveries()
+            except WebDriverException:
+                pass
+            deadline += self._control.sleep(min(delivery_check_interval, max(0, deadline - time.monotonic())))
+
+    def iter_contacts(self, start=START):
+        """
+        Lazily yields a contacts.Contact for every row of the contact file (CSV or XLSX).
+        The file is read once from top to bottom, so memory use does not depend on its size.
+        When the bot is one shard of a session pool, only its own rows are yielded.
+        :param start: (position, offset) resume point, reading starts right after that row.
+        """
+        index, count = self._shard
+        for contact in contacts.iter_contacts(self._csv_numbers, start):
+            self._position, self._offset = contact.position, contact.offset
+            if (contact.position - 1) % count == index:
+                yield contact
+
     def send_messages_to_all_contacts(self):
         """
-        Sends messages to all contacts listed in the provided CSV file.
-        Closes the driver after execution.
+        Sends messages to all contacts listed in the provided CSV or XLSX file.
+        Each contact is visited once; numbers that are not on WhatsApp are
+        logged as not sent and the loop moves on to the next row. Contacts that
+        failed for a transient reason are sent again later, see send_contact.
+        Closes the driver after execution, unless `keep_alive` is set.
         """
         if not os.path.isfile(self._csv_numbers):
             print(Fore.RED, "CSV file not found!", Style.RESET_ALL)
             return
+        if self._options and self.media and media.resolve(self.media) is None:
+            print(Fore.RED, f"Media file '{self.media}' not found!", Style.RESET_ALL)
+            return
+
+        self._position, self._offset = 0, 0
+        self.delivery = DeliveryTracker(on_final=self.log_delivery)
+        self.metrics = metrics.Metrics(parent=metrics.REGISTRY)
+        if self.journal is None:
+            self.journal = CampaignJournal()
+        if self.campaign_id is None:
+            self.campaign_id = self._start_time
+            self.journal.create(self.campaign_id, self._csv_numbers)
+        start = self.journal.cursor(self.campaign_id, self._shard[0])
+        if start != START:
+            print(Fore.YELLOW, f"Resuming campaign {self.campaign_id} after row {start[0]}.", Style.RESET_ALL)
+
+        if self.known_invalid is None:
+            self.known_invalid = phone.KnownInvalidIndex(region=self.region).refresh()
+        index = contacts.load_index(self._csv_numbers, self.region, self.known_invalid, self.template)
+        # Compiled once, then rendered only for the contacts actually sent
+        template = compile_template(self.template, index["header"])
+        skip = dict(index["skip"])
+        if skip:
+            print(Fore.YELLOW, f"Skipping {len(skip)} of {index['rows']} contacts: {index['skipped']}", Style.RESET_ALL)
+
+        self.retries = retries.RetryQueue()
+        self.load_deferred(index)
 
         try:
-            with open(self._csv_numbers, mode="r", encoding="utf-8") as file:
-                csv_reader = csv.reader(file)
-
-                self._start = 0
-                for row in csv_reader:
-                    
-                    if((self._start > 0) & (self._start>self._loaction)):
-                        split_message = row[0].split(",")
-                        number = split_message[0]
-                        msg = split_message[1]
-                        print(f"Sending message to: | {number}")
-                        error = self.send_message_to_contact(number, msg)
-                        self.log_result(number, error)
-                        #Random sleep between sending messages to avoid being detected
-                        sleep(random.uniform(3, 4))
-                    self._start += 1
+            for contact in self.iter_contacts(start):
+                # Holds here while paused, between two contacts
+                self._control.checkpoint()
+                if contact.position in skip:
+                    # Invalid, repeated and known dead numbers don't get a UI round-trip or a pause
+                    self.log_skipped(contact, skip[contact.position])
+                    continue
+                self.send_contact(contact, template)
+                # Contacts whose retry delay is over go out in batches between the others
+                if self.retries.due() >= retries.BATCH_SIZE:
+                    self.send_retries(template)
+
+            # Then the rest of the retries, waiting for their delay if need be
+            self.send_retries(template, drain=True)
 
+        except Cancelled:
+            resume = self.journal.cursor(self.campaign_id, self._shard[0])
+            print(Fore.YELLOW, f"Campaign cancelled, it resumes after row {resume[0]}.", Style.RESET_ALL)
         finally:
-            sleep(3.5)
-            self.quit_driver()
+            self.wait_for_pending_messages()
+            try:
+                self.check_deliveries()
+            except WebDriverException:
+                pass
+            self.delivery.finish_all()
+            for line in self.metrics.report():
+                self.write_log("_metrics.csv", line)
+            self.close_logs()
+            if not self.keep_alive:
+                self.quit_driver()
             
 
+    def send_contact(self, contact, template, attempts=0):
+        """
+        Sends one contact after the pacing wait and logs the result. A
+        transient failure defers the contact to the retry queue instead,
+        until it had retries.MAX_ATTEMPTS attempts.
+        :param attempts: sends of this contact so far.
+        """
+        number = contact.number
+        # Wait as long as the pacing requires, refreshing the ticks meanwhile
+        started = time.perf_counter()
+        self.pause_between_messages(self.pacing.delay())
+        started = self.lap("pacing_wait", started)
+        print(f"Sending message to: | {number}" + (f" (attempt {attempts + 1})" if attempts else ""))
+        self.last_outcome = None
+        try:
+            message = template.render(contact.fields) if template else contact.message
+        except (TypeError, ValueError) as e:
+            # Only this row's cells don't fit the template: skip it, not the campaign
+            print(Fore.RED, f"Could not fill the template: {e}", Style.RESET_ALL)
+            self.last_failure = retries.PERMANENT
+            self.log_result(number, True, contact.position if attempts else None)
+            return
+        error = self.send_message_to_contact(number, message, self.media_for(contact))
+        if error and self.last_failure == retries.TRANSIENT and self.retries.defer(contact, attempts + 1):
+            print(Fore.YELLOW, "Will try this contact again later.", Style.RESET_ALL)
+            self.metrics.count("deferred")
+            if not attempts:
+                self.log_deferred(number)
+        else:
+            self.log_result(number, error, contact.position if attempts else None)
+        if self.last_outcome:
+            self.lap("message", started)
+            self.metrics.count("messages", outcome=self.last_outcome)
+            self.pacing.record(self.last_outcome)
+
+    def send_retries(self, template, drain=False):
+        """
+        Sends the deferred contacts that are due, in batches of
+        retries.BATCH_SIZE, with the shorter retry_timeout. With `drain` it
+        also waits for the others until the queue is empty.
+        """
+        self.retrying = True
+        self._timeout = retry_timeout
+        try:
+            while True:
+                batch = self.retries.take(retries.BATCH_SIZE)
+                if not batch:
+                    if not drain or not self.retries:
+                        break
+                    print(Fore.YELLOW, f"Waiting to retry {len(self.retries)} contacts.", Style.RESET_ALL)
+                    self._control.sleep(self.retries.wait())
+                    continue
+                for entry in batch:
+                    self._control.checkpoint()
+                    self.send_contact(entry.contact, template, entry.attempts)
+        finally:
+            self.retrying = False
+            self._timeout = timeout
+
+    def load_deferred(self, index):
+        """
+        Queues the contacts of this shard that a previous run of the campaign
+        deferred, reading each row again from its closest seek offset.
+        """
+        shard, count = self._shard
+        for position in self.journal.deferred(self.campaign_id):
+            if (position - 1) % count != shard:
+                continue
+            start = contacts.seek_point(index, position - 1)
+            for contact in contacts.iter_contacts(self._csv_numbers, start, index["header"]):
+                if contact.position >= position:
+                    if contact.position == position:
+                        self.retries.defer(contact, 1, delay=0)
+                    break
+        if self.retries:
+            print(Fore.YELLOW, f"{len(self.retries)} contacts are waiting for a retry.", Style.RESET_ALL)
+
+    def wait_for_pending_messages(self):
+        """
+        Waits until no message in the open chat is still showing the clock icon,
+        so closing the browser doesn't drop the last message.
+        """
+        try:
+            locator = self.selectors.candidates("pending_message")[0]
+            self.waits.until("pending_messages", EC.invisibility_of_element_located(locator), timeout)
+        except Exception:
+            pass
+
     def type_message(self, text_element, message):
         """
         Types the message into the appropriate text element.
-        Handles multiline messages.
+        The whole message is pasted at once when possible, which also works for
+        emoji outside the BMP; otherwise it is typed key by key.
+        """
+        if self.fast_input and self.paste_message(text_element, message):
+            self.last_input = "paste"
+            return
+        self.send_keys_message(text_element, message)
+        self.last_input = "keys"
+
+    def paste_message(self, text_element, message):
+        """
+        Inserts the message with a single script call.
+        Returns False, leaving the text element empty, if the editor didn't take it.
+        """
+        try:
+            pasted = self.driver.execute_async_script(PASTE_SCRIPT, text_element, message)
+        except WebDriverException:
+            pasted = False
+        if pasted:
+            self._paste_failures = 0
+            return True
+
+        self._paste_failures += 1
+        if self._paste_failures >= paste_max_failures:
+            print(Fore.YELLOW, "Pasting messages keeps failing, typing them instead.", Style.RESET_ALL)
+            self.fast_input = False
+        # Drop whatever part of the message made it into the box
+        text_element.send_keys(Keys.CONTROL, "a")
+        text_element.send_keys(Keys.DELETE)
+        return False
+
+    def send_keys_message(self, text_element, message):
+        """
+        Types the message key by key, one line at a time.
         """
         multiline = "\n" in message
         if multiline:
@@ -272,9 +970,7 @@ class Bot:
         """
         try:
             # Wait for the element to become clickable
-            WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((By.XPATH, xpath))
-            )
+            self.waits.until("login", EC.element_to_be_clickable((By.XPATH, xpath)), timeout)
             if success_message:
                 print(Fore.GREEN + success_message + Style.RESET_ALL)
             return True  # Element is clickable, return True
@@ -284,6 +980,18 @@ class Bot:
                 print(Fore.RED + error_message + Style.RESET_ALL)
             return False  # Timeout occurred, return False
 
+    @property
+    def control(self):
+        return self._control
+
+    @control.setter
+    def control(self, control):
+        """
+        Shares a waits.RunControl, e.g. the one of a session pool.
+        """
+        self._control = control
+        self.waits.control = control
+
     @property
     def csv_numbers(self):
         return self._csv_numbers
@@ -299,3 +1007,42 @@ class Bot:
     @options.setter
     def options(self, opt):
         self._options = opt
+
+    @property
+    def open_mode(self):
+        return self._open_mode
+
+    @open_mode.setter
+    def open_mode(self, mode):
+        if mode not in OPEN_MODES:
+            raise ValueError(f"Unknown open mode '{mode}', expected one of {OPEN_MODES}")
+        self._open_mode = mode
+
+    @property
+    def wait_stats(self):
+        """
+        Per-step wait timings, see waits.StepStats.snapshot().
+        """
+        return self.waits.stats.snapshot()
+
+    @property
+    def shard(self):
+        return self._shard
+
+    @shard.setter
+    def shard(self, shard):
+        index, count = shard
+        if not 0 <= index < count:
+            raise ValueError(f"Invalid shard {shard}")
+        self._shard = (index, count)
+
+    @property
+    def rate_limit(self):
+        """
+        Maximum messages per minute for this session.
+        """
+        return self.pacing.limits["per_minute"]
+
+    @rate_limit.setter
+    def rate_limit(self, per_minute):
+        self.pacing.configure(per_minute=per_minute or pacing.DEFAULTS["per_minute"])
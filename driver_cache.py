@@ -0,0 +1,140 @@
+"""
+WhatsApp Automator - Chromedriver resolution
+Finds a chromedriver matching the installed Chrome without going online:
+a configured path, the last resolved driver (remembered on disk), then any
+driver already on this machine (webdriver-manager's cache, the PATH).
+ChromeDriverManager, which always checks versions over the network, is only
+used when none of them fits.
+"""
+
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+
+# Set to a chromedriver executable to skip the lookup entirely
+CONFIG_ENV = "CHROMEDRIVER_PATH"
+# webdriver-manager downloads drivers below this directory
+WDM_DIR = os.path.join(os.path.expanduser("~"), ".wdm")
+CACHE_PATH = os.path.join(WDM_DIR, "whatsapp_automator_driver.json")
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+(?:\.\d+)?")
+DRIVER_NAME = "chromedriver.exe" if os.name == "nt" else "chromedriver"
+
+_lock = threading.Lock()
+# Driver resolved by this process, so only the first Bot pays for the lookup
+_resolved = None
+
+
+def _major(version):
+    match = VERSION_PATTERN.search(version or "")
+    return match.group(1) if match else None
+
+
+def chrome_version():
+    """
+    Version of the installed Chrome, read locally; None if it can't be found.
+    """
+    try:
+        from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        return None
+
+
+def driver_version(path):
+    """
+    Version reported by a chromedriver executable, None if it doesn't run.
+    """
+    try:
+        output = subprocess.run(
+            [path, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+
+def local_drivers():
+    """
+    Chromedriver executables already on this machine, newest first.
+    """
+    found = glob.glob(os.path.join(WDM_DIR, "drivers", "chromedriver", "**", DRIVER_NAME), recursive=True)
+    found.sort(key=os.path.getmtime, reverse=True)
+    on_path = shutil.which("chromedriver")
+    if on_path:
+        found.append(on_path)
+    return found
+
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(entry):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+    except OSError:
+        pass
+
+
+def resolve():
+    """
+    Returns the path of a chromedriver for the installed Chrome.
+    """
+    global _resolved
+    with _lock:
+        if _resolved and os.path.isfile(_resolved):
+            return _resolved
+        _resolved = _resolve()
+        return _resolved
+
+
+def invalidate():
+    """
+    Forgets the resolved driver, e.g. after Chrome refused it following an update.
+    """
+    global _resolved
+    with _lock:
+        _resolved = None
+        try:
+            os.remove(CACHE_PATH)
+        except OSError:
+            pass
+
+
+def _resolve():
+    configured = os.environ.get(CONFIG_ENV)
+    if configured and os.path.isfile(configured):
+        return configured
+
+    chrome = _major(chrome_version())
+    cached = _load_cache()
+    path = cached.get("path")
+    # Without a known Chrome version the last driver that worked is the best guess
+    if path and os.path.isfile(path) and (chrome is None or cached.get("chrome") == chrome):
+        return path
+
+    for candidate in local_drivers():
+        version = driver_version(candidate)
+        if version and (chrome is None or _major(version) == chrome):
+            _save_cache({"path": candidate, "chrome": chrome, "driver": version})
+            return candidate
+
+    # Nothing suitable on disk: the only step that needs the network
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    _save_cache({"path": path, "chrome": chrome, "driver": driver_version(path)})
+    return path
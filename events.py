@@ -0,0 +1,107 @@
+"""
+WhatsApp Automator - Event bus
+Pushes campaign progress to any number of listeners (the /api/events stream)
+without each of them polling the shared bot state.
+
+Two kinds of updates flow through the bus:
+- state changes: publishers only bump a version; the snapshot of the whole
+  state is built once per change and shared by every listener, and a listener
+  that falls behind just gets the latest one.
+- events (e.g. the outcome of a contact): kept in a bounded history that all
+  listeners read from with their own cursor. A listener too slow to keep up
+  skips what fell out of the history and is told how many events it missed.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Events kept for listeners that are behind
+HISTORY = 1000
+# Shortest time between two updates sent to one listener; state changes
+# within this window are coalesced into one snapshot
+MIN_INTERVAL = 0.25
+# Seconds without updates before a listener gets a keep-alive
+HEARTBEAT = 15
+
+
+class EventBus:
+    """
+    Thread-safe publish side for the bot threads, generator based subscribe
+    side for the listeners.
+    """
+
+    def __init__(self, snapshot, history=HISTORY):
+        """
+        :param snapshot: callable returning the current state as a dict.
+        """
+        self._snapshot = snapshot
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)   # (seq, name, data)
+        self._seq = 0
+        self._version = 0
+        self._cached = (-1, None)
+
+    def publish(self, name, data):
+        """
+        Appends an event for every listener.
+        """
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, name, data))
+            self._cond.notify_all()
+
+    def touch(self):
+        """
+        Signals that the state changed.
+        """
+        with self._cond:
+            self._version += 1
+            self._cond.notify_all()
+
+    def state(self):
+        """
+        Current state snapshot, rebuilt at most once per change.
+        """
+        with self._cond:
+            version, cached = self._cached
+            current = self._version
+        if version == current:
+            return cached
+        state = self._snapshot()
+        with self._cond:
+            if self._cached[0] < current:
+                self._cached = (current, state)
+        return state
+
+    def subscribe(self, min_interval=MIN_INTERVAL, heartbeat=HEARTBEAT):
+        """
+        Yields (name, data) updates, starting with the current state, until the
+        caller stops iterating. ("heartbeat", None) is yielded when idle.
+        """
+        with self._cond:
+            seq, version = self._seq, self._version
+        yield "status", self.state()
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._seq != seq or self._version != version, heartbeat
+                )
+                events = [event for event in self._events if event[0] > seq]
+                first = self._events[0][0] if self._events else self._seq + 1
+                missed = max(0, first - seq - 1)
+                changed = self._version != version
+                seq, version = self._seq, self._version
+
+            if not events and not changed:
+                yield "heartbeat", None
+                continue
+            if missed:
+                yield "missed", {"count": missed}
+            for _, name, data in events:
+                yield name, data
+            if changed:
+                yield "status", self.state()
+            # Everything that happens meanwhile goes out as one batch
+            time.sleep(min_interval)
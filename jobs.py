@@ -0,0 +1,220 @@
+"""
+WhatsApp Automator - Job queue
+Campaigns waiting to be sent, stored next to the campaign journal so the queue
+survives a restart of the server, and the scheduler thread that feeds them to
+the session pool one after the other.
+
+A job may carry a daily send window ("09:00" to "18:00"); it is only started
+inside its window, and a campaign still running when its window closes is
+stopped after the current contact and resumed from its journal cursor when
+the window opens again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from journal import JOURNAL_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    options      TEXT NOT NULL,     -- /api/start parameters
+    priority     INTEGER NOT NULL,  -- higher first
+    window_start TEXT,              -- "HH:MM" local time, both or neither
+    window_end   TEXT,
+    not_before   REAL,              -- earliest start, epoch seconds
+    campaign_id  TEXT,              -- set once the job started
+    status       TEXT NOT NULL,     -- queued | running | completed | failed | cancelled
+    error        TEXT,
+    created      REAL NOT NULL,
+    updated      REAL NOT NULL
+);
+"""
+
+# Seconds between two checks of the queue when nothing wakes the scheduler
+CHECK_INTERVAL = 30
+
+
+def parse_window(start, end):
+    """
+    Validates a send window, returns (start, end) as "HH:MM" or (None, None).
+    :raises ValueError: if only one end is given or a time is malformed.
+    """
+    if not start and not end:
+        return None, None
+    if not start or not end:
+        raise ValueError("window_start and window_end must be given together")
+    return (
+        datetime.strptime(start, "%H:%M").strftime("%H:%M"),
+        datetime.strptime(end, "%H:%M").strftime("%H:%M"),
+    )
+
+
+def in_window(job, now=None):
+    """
+    True if the job may send at `now` (a datetime, local time).
+    A window whose end is before its start runs over midnight.
+    """
+    start, end = job["window_start"], job["window_end"]
+    if not start:
+        return True
+    clock = (now or datetime.now()).strftime("%H:%M")
+    if start <= end:
+        return start <= clock < end
+    return clock >= start or clock < end
+
+
+class JobQueue:
+    """
+    Thread-safe access to the persistent job queue.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        # Jobs that were running when the server went down are picked up again
+        self._db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+        self._columns = [column[0] for column in self._db.execute("SELECT * FROM jobs LIMIT 0").description]
+
+    def add(self, options, priority=0, window_start=None, window_end=None, not_before=None):
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO jobs (options, priority, window_start, window_end, not_before, "
+                "status, created, updated) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (json.dumps(options), priority, window_start, window_end, not_before, now, now),
+            )
+        return cursor.lastrowid
+
+    def jobs(self, limit=50):
+        """
+        Queued and running jobs in the order they will run, then the most recent others.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs ORDER BY status NOT IN ('queued', 'running'), "
+                "status != 'running', priority DESC, created, updated DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._job_dict(row) for row in rows]
+
+    def job(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job_dict(row) if row else None
+
+    def next_due(self, now=None):
+        """
+        The queued job to start now: highest priority, then oldest, among those
+        whose start time has come and whose send window is open.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' AND (not_before IS NULL OR not_before <= ?) "
+                "ORDER BY priority DESC, created", (now.timestamp(),)
+            ).fetchall()
+        for row in rows:
+            job = self._job_dict(row)
+            if in_window(job, now):
+                return job
+        return None
+
+    def set_status(self, job_id, status, campaign_id=None, error=None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, campaign_id = COALESCE(?, campaign_id), error = ?, "
+                "updated = ? WHERE id = ?",
+                (status, campaign_id, error, time.time(), job_id),
+            )
+
+    def set_campaign(self, job_id, campaign_id):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET campaign_id = ?, updated = ? WHERE id = ?",
+                (campaign_id, time.time(), job_id),
+            )
+
+    def running(self):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE status = 'running'").fetchone()
+        return self._job_dict(row) if row else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _job_dict(self, row):
+        job = dict(zip(self._columns, row))
+        job["options"] = json.loads(job["options"])
+        return job
+
+
+class Scheduler(threading.Thread):
+    """
+    Starts the next due job whenever the bot is idle, and stops a running job
+    whose send window closed.
+    """
+
+    def __init__(self, queue, start_job, is_busy, pause, interval=CHECK_INTERVAL):
+        """
+        :param start_job: callable(job) starting its campaign, returns the
+            campaign id; raises ValueError if the job can't be started.
+        :param is_busy: callable, True while a campaign runs.
+        :param pause: callable stopping the running campaign after the current
+            contact, keeping the browsers open.
+        """
+        super().__init__(daemon=True)
+        self.queue = queue
+        self._start_job = start_job
+        self._is_busy = is_busy
+        self._pause = pause
+        self._interval = interval
+        self._wake = threading.Event()
+
+    def wake(self):
+        """
+        Checks the queue right away, e.g. after a job was added or finished.
+        """
+        self._wake.set()
+
+    def run(self):
+        while True:
+            try:
+                self.tick()
+            except Exception as exc:
+                print(f"Scheduler error: {exc}")
+            self._wake.wait(self._interval)
+            self._wake.clear()
+
+    def tick(self, now=None):
+        now = now or datetime.now()
+        running = self.queue.running()
+        if running and not in_window(running, now):
+            self._pause()
+            self.queue.set_status(running["id"], "queued")
+            return
+        if running or self._is_busy():
+            return
+
+        job = self.queue.next_due(now)
+        if job is None:
+            return
+        # Marked running first, so a campaign that ends right away still finds its job
+        self.queue.set_status(job["id"], "running")
+        try:
+            campaign_id = self._start_job(job)
+        except ValueError as exc:
+            self.queue.set_status(job["id"], "failed", error=str(exc))
+            self.wake()
+            return
+        if campaign_id is None:
+            self.queue.set_status(job["id"], "queued")
+        else:
+            self.queue.set_campaign(job["id"], campaign_id)
@@ -0,0 +1,194 @@
+"""
+WhatsApp Automator - Campaign journal
+Durable record of every contact outcome, keyed by campaign and contact, plus a
+per-shard resume cursor (row number and byte offset in the contact file), so a
+stopped or crashed campaign continues exactly where it left off.
+
+The journal is a SQLite database in WAL mode with synchronous=NORMAL: every
+outcome is committed on its own and survives a crash of the bot, while fsyncs
+only happen when SQLite checkpoints the WAL, i.e. once per batch of pages.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+JOURNAL_PATH = os.path.join("logs", "journal.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id            TEXT PRIMARY KEY,
+    filepath      TEXT NOT NULL,
+    session_count INTEGER NOT NULL,
+    options       TEXT NOT NULL,
+    status        TEXT NOT NULL,     -- running | paused | stopped | failed | completed
+    created       REAL NOT NULL,
+    updated       REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    campaign_id TEXT NOT NULL,
+    shard       INTEGER NOT NULL,
+    position    INTEGER NOT NULL,    -- last finished row, the header is row 0
+    offset      INTEGER NOT NULL,    -- byte offset of the row after it
+    PRIMARY KEY (campaign_id, shard)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    campaign_id TEXT NOT NULL,
+    contact     TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    outcome     TEXT NOT NULL,     -- sent | not_sent | unconfirmed | retry (waiting for a retry)
+    recorded    REAL NOT NULL,
+    PRIMARY KEY (campaign_id, contact)
+) WITHOUT ROWID;
+"""
+
+# Resume point of a shard that has not sent anything yet
+START = (-1, 0)
+# Outcomes that end a contact; "retry" waits for another send
+FINAL_OUTCOMES = ("sent", "not_sent", "unconfirmed")
+
+
+class CampaignJournal:
+    """
+    Thread-safe access to the journal database; one instance can be shared by
+    all sessions of the process.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def create(self, campaign_id, filepath, session_count=1, options=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO campaigns VALUES (?, ?, ?, ?, 'running', ?, ?)",
+                (campaign_id, filepath, session_count, json.dumps(options or {}), now, now),
+            )
+
+    def campaign(self, campaign_id):
+        """
+        Returns the campaign as a dict, or None if it is unknown.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, filepath, session_count, options, status, created, updated "
+                "FROM campaigns WHERE id = ?", (campaign_id,)
+            ).fetchone()
+        return self._campaign_dict(row) if row else None
+
+    def campaigns(self, limit=20):
+        """
+        Most recent campaigns with their number of finished contacts.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, filepath, session_count, options, status, created, updated, "
+                "(SELECT COUNT(*) FROM results r WHERE r.campaign_id = c.id) "
+                "FROM campaigns c ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(self._campaign_dict(row[:7]), done=row[7]) for row in rows]
+
+    def set_status(self, campaign_id, status):
+        with self._lock:
+            self._db.execute(
+                "UPDATE campaigns SET status = ?, updated = ? WHERE id = ?",
+                (status, time.time(), campaign_id),
+            )
+
+    def cursor(self, campaign_id, shard=0):
+        """
+        Resume point (position, offset) of a shard, START if it never sent.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT position, offset FROM cursors WHERE campaign_id = ? AND shard = ?",
+                (campaign_id, shard),
+            ).fetchone()
+        return tuple(row) if row else START
+
+    def record(self, campaign_id, shard, contact, position, offset, outcome):
+        """
+        Stores the outcome of a contact and advances the shard's cursor past it
+        in the same transaction.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (campaign_id, contact, position, outcome, now),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)",
+                (campaign_id, shard, position, offset),
+            )
+            self._db.execute("UPDATE campaigns SET updated = ? WHERE id = ?", (now, campaign_id))
+            self._db.execute("COMMIT")
+
+    def resolve(self, campaign_id, contact, position, outcome):
+        """
+        Stores the outcome of a contact retried after the cursor moved on,
+        leaving the cursor where it is.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (campaign_id, contact, position, outcome, time.time()),
+            )
+
+    def deferred(self, campaign_id):
+        """
+        Row positions of the contacts still waiting for a retry, see retries.py.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT position FROM results WHERE campaign_id = ? AND outcome = 'retry' ORDER BY position",
+                (campaign_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def advance(self, campaign_id, shard, position, offset):
+        """
+        Moves the shard's cursor past a row that has no outcome, e.g. a skipped one.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)",
+                (campaign_id, shard, position, offset),
+            )
+
+    def done_count(self, campaign_id):
+        """
+        Contacts of the campaign with a final outcome; those waiting for a
+        retry are sent again on resume, so they don't count.
+        """
+        with self._lock:
+            placeholders = ", ".join("?" * len(FINAL_OUTCOMES))
+            return self._db.execute(
+                f"SELECT COUNT(*) FROM results WHERE campaign_id = ? AND outcome IN ({placeholders})",
+                (campaign_id, *FINAL_OUTCOMES),
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _campaign_dict(row):
+        campaign_id, filepath, session_count, options, status, created, updated = row
+        return {
+            "id": campaign_id,
+            "filepath": filepath,
+            "session_count": session_count,
+            "options": json.loads(options),
+            "status": status,
+            "created": created,
+            "updated": updated,
+        }
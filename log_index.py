@@ -0,0 +1,143 @@
+"""
+WhatsApp Automator - Log index
+Keeps the number of entries of every result log in logs/ without rereading
+the logs: each file is only read past the byte offset indexed last time, so
+a refresh during a running campaign costs as much as what was appended since.
+Numbers themselves are served a page at a time, straight from the file.
+"""
+
+import os
+import threading
+
+# Result logs by file name suffix. Numbers in a not_found log are in the
+# run's not_sent log as well.
+LOG_TYPES = {
+    "_sent.txt": "sent",
+    "_notsent.txt": "not_sent",
+    "_notfound.txt": "not_found",
+    "_unconfirmed.txt": "unconfirmed",
+}
+# Entries per page when the client doesn't ask for a size, and the most it may ask for
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+# Bytes a search may scan for one page before returning what it found so far
+SCAN_LIMIT = 4 * 1024 * 1024
+READ_CHUNK = 1024 * 1024
+
+
+def log_type(filename):
+    for suffix, kind in LOG_TYPES.items():
+        if filename.endswith(suffix):
+            return kind
+    return None
+
+
+def log_run(filename):
+    """
+    The run a log belongs to: its file name without the type suffix.
+    """
+    for suffix in LOG_TYPES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+class LogIndex:
+    """
+    Thread-safe index of the result logs of one directory.
+    """
+
+    def __init__(self, logs_dir):
+        self.logs_dir = logs_dir
+        self._lock = threading.Lock()
+        self._files = {}           # file name -> [indexed bytes, entries, mtime]
+
+    def refresh(self):
+        """
+        Counts the entries appended to every log since the last refresh.
+        """
+        with self._lock:
+            seen = set()
+            for entry in os.scandir(self.logs_dir):
+                if log_type(entry.name) is None:
+                    continue
+                seen.add(entry.name)
+                stat = entry.stat()
+                indexed = self._files.get(entry.name)
+                if indexed is None or stat.st_size < indexed[0]:
+                    indexed = self._files[entry.name] = [0, 0, 0]
+                if stat.st_size > indexed[0]:
+                    indexed[0], added = self._count(entry.path, indexed[0])
+                    indexed[1] += added
+                indexed[2] = stat.st_mtime
+            for name in set(self._files) - seen:
+                del self._files[name]
+
+    @staticmethod
+    def _count(path, offset):
+        """
+        Counts the complete lines after `offset` and returns (end of the last one, count).
+        A line still being written is left for the next refresh.
+        """
+        count, end = 0, offset
+        with open(path, "rb") as file:
+            file.seek(offset)
+            position = offset
+            for chunk in iter(lambda: file.read(READ_CHUNK), b""):
+                lines = chunk.count(b"\n")
+                if lines:
+                    count += lines
+                    end = position + chunk.rindex(b"\n") + 1
+                position += len(chunk)
+        return end, count
+
+    def logs(self, limit=20):
+        """
+        Newest logs first with their entry counts.
+        """
+        with self._lock:
+            files = sorted(self._files.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {"filename": name, "type": log_type(name), "run": log_run(name), "count": count}
+            for name, (_, count, _) in files[:limit]
+        ]
+
+    def runs(self):
+        """
+        Entry counts per run and log type, newest run first.
+        """
+        with self._lock:
+            files = sorted(self._files.items(), key=lambda item: item[1][2], reverse=True)
+        runs = {}
+        for name, (_, count, _) in files:
+            counts = runs.setdefault(log_run(name), dict.fromkeys(LOG_TYPES.values(), 0))
+            counts[log_type(name)] += count
+        return [dict(counts, run=run) for run, counts in runs.items()]
+
+    def page(self, filename, cursor=0, limit=PAGE_SIZE, query=None):
+        """
+        Returns up to `limit` numbers of a log starting at the byte offset
+        `cursor`, only those containing `query` if given, with the cursor of
+        the next page (None after the last one).
+        :raises KeyError: if the log is not in the index.
+        """
+        with self._lock:
+            end, count, _ = self._files[filename]
+        numbers = []
+        with open(os.path.join(self.logs_dir, filename), "rb") as file:
+            file.seek(cursor)
+            position = cursor
+            while position < end and len(numbers) < limit:
+                if query and position - cursor >= SCAN_LIMIT:
+                    break
+                line = file.readline()
+                position += len(line)
+                number = line.decode("utf-8", "replace").strip()
+                if number and (not query or query in number):
+                    numbers.append(number)
+        return {
+            "filename": filename,
+            "count": count,
+            "numbers": numbers,
+            "next": position if position < end else None,
+        }
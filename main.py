@@ -1,6 +1,8 @@
 from driver import Bot, Fore, Style
 import sys
 import os
+import shutil
+import media
 
 class Menu:
     def __init__(self):
@@ -34,14 +36,34 @@ class Menu:
 
     def send_with_media(self):
         print(Fore.GREEN + "SEND MESSAGES WITH MEDIA" + Style.RESET_ALL)
-        input(Fore.YELLOW + "Please COPY the media you want to send with CTRL+C, then press ENTER." + Style.RESET_ALL)
         csv = self.settings()
+        print("- Select the media file to attach (from data/media), or enter a path to copy there:")
+        attachment = self.load_media()
         print("Ready to start sending messages with media.")
         self.bot = Bot()
         self.bot.csv_numbers = os.path.join("data", csv)
         self.bot._options = True
+        self.bot.media = attachment
         self.bot.login()
 
+    def load_media(self):
+        files = dict(enumerate(media.list_files(), start=1))
+        for idx, file in files.items():
+            print(idx, ") ", file)
+
+        while True:
+            selection = input("> ").strip()
+            if selection.isdigit() and int(selection) in files:
+                return files[int(selection)]
+            if media.resolve(selection):
+                return selection
+            if os.path.isfile(selection):
+                # Campaigns only attach files from data/media/
+                os.makedirs(media.MEDIA_DIR, exist_ok=True)
+                shutil.copy2(selection, media.MEDIA_DIR)
+                return os.path.basename(selection)
+            print(Fore.RED, "File not found.", Style.RESET_ALL)
+
     def load_file(self, filetype):
         selection = 0
         idx = 1
@@ -0,0 +1,88 @@
+"""
+WhatsApp Automator - Media attachments
+Media files live in data/media/. A campaign attaches either one file to every
+message or, when the contact file has a media column, the file named in each
+row. Files are handed to WhatsApp Web's file input by path, so attaching
+needs neither the clipboard nor a visible desktop and works headless.
+"""
+
+import os
+
+MEDIA_DIR = os.path.join("data", "media")
+
+# Contact file columns naming the file to attach to that row
+MEDIA_COLUMNS = ("media", "attachment")
+
+# Sent as photo or video with a preview; anything else goes out as a document
+PREVIEW_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".webp",
+    ".mp4", ".3gp", ".mov", ".m4v",
+)
+
+# WhatsApp Web refuses larger attachments
+MAX_SIZE = 2 * 1024 * 1024 * 1024
+
+
+def valid_name(name):
+    """
+    True for a bare file name. Names come from the API and the contact files,
+    so paths, which could point anywhere on the host, are refused.
+    """
+    return bool(name) and name not in (".", "..") and "/" not in name and "\\" not in name \
+        and os.path.basename(name) == name
+
+
+def resolve(name, media_dir=MEDIA_DIR):
+    """
+    Absolute path of the media file `name` in `media_dir`, None if there is no
+    such file or the name is not a bare file name.
+    """
+    if not valid_name(name):
+        return None
+    root = os.path.realpath(media_dir)
+    path = os.path.realpath(os.path.join(root, name))
+    # A link inside media_dir must not lead out of it either
+    if os.path.dirname(path) != root or not os.path.isfile(path):
+        return None
+    return path
+
+
+def check(name, media_dir=MEDIA_DIR):
+    """
+    Returns why a media file can't be attached, or None if it can.
+    """
+    if not valid_name(name):
+        return f"media file '{name}' must be a file name in data/media/, not a path"
+    path = resolve(name, media_dir)
+    if path is None:
+        return f"media file '{name}' not found"
+    if os.path.getsize(path) > MAX_SIZE:
+        return f"media file '{name}' is larger than 2 GB"
+    return None
+
+
+def media_column(header):
+    """
+    Name of the media column of a header row, None if it has none.
+    """
+    return next((column for column in header if column.strip().lower() in MEDIA_COLUMNS), None)
+
+
+def row_media(fields):
+    """
+    The media file named in a row, `fields` being its cells by column name.
+    """
+    for column, value in fields.items():
+        if value and column.lower() in MEDIA_COLUMNS:
+            return value
+    return None
+
+
+def is_preview(path):
+    return os.path.splitext(path)[1].lower() in PREVIEW_EXTENSIONS
+
+
+def list_files(media_dir=MEDIA_DIR):
+    if not os.path.isdir(media_dir):
+        return []
+    return sorted(name for name in os.listdir(media_dir) if os.path.isfile(os.path.join(media_dir, name)))
@@ -0,0 +1,152 @@
+"""
+WhatsApp Automator - Send pipeline metrics
+Latency histograms of every stage of sending a message (opening the chat,
+locating the message box, typing, clicking send, waiting for the bubble, the
+pacing wait) and send counts by outcome. Recording a sample is one bisect and
+a few additions under a lock, so the bot records every message.
+
+The process-wide REGISTRY backs /api/metrics in the Prometheus text format;
+each campaign also keeps its own Metrics, written to its log when it ends.
+"""
+
+import bisect
+import math
+import threading
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+PREFIX = "whatsapp"
+
+
+class Metrics:
+    """
+    Thread-safe histograms and counters. Samples recorded here are also
+    recorded in `parent`, if given.
+    """
+
+    def __init__(self, parent=None, buckets=BUCKETS):
+        self.parent = parent
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (stage, labels) -> [bucket counts, sum, count, max]
+        self._histograms = {}
+        # (name, labels) -> value
+        self._counters = {}
+
+    def observe(self, stage, seconds, **labels):
+        key = (stage, tuple(sorted(labels.items())))
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, 0.0]
+            histogram[0][slot] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            histogram[3] = max(histogram[3], seconds)
+        if self.parent is not None:
+            self.parent.observe(stage, seconds, **labels)
+
+    def count(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        if self.parent is not None:
+            self.parent.count(name, amount, **labels)
+
+    def summary(self):
+        """
+        Per stage, over all labels: {"count", "avg_ms", "p50_ms", "p95_ms", "max_ms"}.
+        The percentiles are interpolated within the histogram buckets.
+        """
+        with self._lock:
+            merged = {}
+            for (stage, _), (counts, total, count, longest) in self._histograms.items():
+                entry = merged.setdefault(stage, [[0] * len(counts), 0.0, 0, 0.0])
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+                entry[3] = max(entry[3], longest)
+        return {
+            stage: {
+                "count": count,
+                "avg_ms": round(total / count * 1000, 1),
+                "p50_ms": round(self._quantile(counts, count, 0.5, longest) * 1000, 1),
+                "p95_ms": round(self._quantile(counts, count, 0.95, longest) * 1000, 1),
+                "max_ms": round(longest * 1000, 1),
+            }
+            for stage, (counts, total, count, longest) in merged.items()
+        }
+
+    def counters(self):
+        with self._lock:
+            return {(name, labels): value for (name, labels), value in self._counters.items()}
+
+    def _quantile(self, counts, count, q, longest):
+        rank = q * count
+        seen = 0
+        for slot, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                low = self.buckets[slot - 1] if slot > 0 else 0.0
+                high = self.buckets[slot] if slot < len(self.buckets) else longest
+                return min(longest, low + (high - low) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return longest
+
+    def prometheus(self):
+        """
+        The histograms and counters in the Prometheus text exposition format.
+        """
+        with self._lock:
+            histograms = sorted((key, (list(v[0]), v[1], v[2])) for key, v in self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        name = f"{PREFIX}_send_stage_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each stage of sending a message.",
+            f"# TYPE {name} histogram",
+        ]
+        for (stage, labels), (counts, total, count) in histograms:
+            labels = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        described = set()
+        for (counter, labels), value in counters:
+            metric = f"{PREFIX}_{counter}_total"
+            if metric not in described:
+                described.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """
+        Lines of a human readable per-stage summary, for the campaign log.
+        """
+        lines = ["stage,count,avg_ms,p50_ms,p95_ms,max_ms"]
+        for stage, entry in self.summary().items():
+            lines.append(",".join(str(value) for value in [stage] + list(entry.values())))
+        for (counter, labels), value in sorted(self.counters().items()):
+            lines.append(f"{counter}{_labels(labels)},{value}")
+        return lines
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+# Metrics of every bot of this process, served by /api/metrics
+REGISTRY = Metrics()
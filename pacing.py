@@ -0,0 +1,200 @@
+"""
+WhatsApp Automator - Pacing
+Decides how long a session waits before its next message. Token buckets cap
+the messages per minute, hour and day (the minute bucket holds `burst`
+messages, so short bursts go out back to back), a short random gap keeps
+consecutive sends from looking scripted, and failures slow the session down:
+a cooldown after errors and a longer backoff when WhatsApp shows signs of
+throttling, both doubling while they repeat and reset by a successful send.
+
+The clock and the random source are injectable, so the pacing of a whole run
+can be replayed without waiting.
+"""
+
+import random
+import time
+
+# Outcomes of a send attempt, see Pacer.record
+SENT = "sent"
+NOT_FOUND = "not_found"      # the number is not on WhatsApp, says nothing about the account
+ERROR = "error"
+THROTTLED = "throttled"
+
+DEFAULTS = {
+    "per_minute": 20,
+    "per_hour": 600,
+    "per_day": 4000,
+    "burst": 3,
+    "min_gap": (1.0, 2.0),       # random seconds between two sends
+    "cooldown": 30,              # seconds after an error, doubled per consecutive error
+    "throttle_backoff": 120,     # seconds after a throttling sign, doubled likewise
+    "max_backoff": 900,
+}
+
+
+def check_limits(limits):
+    """
+    Validates pacing options as sent to the API and returns them as numbers.
+    :raises ValueError: if `limits` is not a dict, for unknown options or
+        values that are not positive.
+    """
+    if limits is None:
+        return {}
+    if not isinstance(limits, dict):
+        raise ValueError("pacing must be an object of pacing options")
+    checked = {}
+    for name, value in limits.items():
+        if name not in DEFAULTS:
+            raise ValueError(f"Unknown pacing option '{name}'")
+        if value is None:
+            continue
+        if name == "min_gap":
+            low, high = (float(v) for v in value)
+            if not 0 <= low <= high:
+                raise ValueError("min_gap must be [low, high] with 0 <= low <= high")
+            checked[name] = (low, high)
+            continue
+        value = float(value)
+        if value <= 0:
+            raise ValueError(f"Pacing option '{name}' must be positive")
+        checked[name] = value
+    return checked
+
+
+def session_limits(limits, rate_limit=None):
+    """
+    Pacing options of one session: `limits` with `rate_limit` (messages per
+    minute) as per_minute when it is given, so the per_minute of `limits`
+    is kept otherwise.
+    """
+    limits = dict(limits or {})
+    if rate_limit is not None:
+        limits["per_minute"] = rate_limit
+    return limits
+
+
+class TokenBucket:
+    """
+    Holds up to `capacity` tokens, refilled at `rate` tokens per second.
+    Taking more than available leaves a debt that is paid off before the
+    next token is available.
+    """
+
+    def __init__(self, rate, capacity, clock):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount=1):
+        """
+        Seconds until `amount` tokens are available.
+        """
+        self._refill()
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount=1):
+        self._refill()
+        self.tokens -= amount
+
+    def resize(self, rate, capacity):
+        self._refill()
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+
+
+class Pacer:
+    """
+    Pacing of one session. Its buckets outlive a campaign as long as the bot
+    does, so the hourly and daily budgets hold across back-to-back campaigns
+    of the same account.
+    """
+
+    def __init__(self, clock=time.monotonic, rng=None, **limits):
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self.limits = dict(DEFAULTS)
+        self._buckets = {}
+        self._last = None            # time of the last send
+        self._gap = 0.0
+        self._blocked_until = 0.0
+        self._errors = 0
+        self._throttles = 0
+        self.configure(**limits)
+
+    def configure(self, **limits):
+        """
+        Changes limits, keeping the tokens already used up.
+        """
+        self.limits.update(check_limits(limits))
+        burst = max(1.0, self.limits["burst"])
+        for name, seconds, capacity in (
+            ("minute", 60, burst),
+            ("hour", 3600, self.limits["per_hour"]),
+            ("day", 86400, self.limits["per_day"]),
+        ):
+            rate = self.limits[f"per_{name}"] / seconds
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                self._buckets[name] = TokenBucket(rate, capacity, self._clock)
+            else:
+                bucket.resize(rate, capacity)
+
+    def reset_limits(self, **limits):
+        """
+        Like configure, but options not given go back to their defaults.
+        """
+        self.limits = dict(DEFAULTS)
+        self.configure(**limits)
+
+    def delay(self):
+        """
+        Seconds to wait before the next message may be sent.
+        """
+        now = self._clock()
+        waits = [bucket.wait_time() for bucket in self._buckets.values()]
+        waits.append(self._blocked_until - now)
+        if self._last is not None:
+            waits.append(self._last + self._gap - now)
+        return max(0.0, *waits)
+
+    def record(self, outcome):
+        """
+        Books a send attempt with its outcome (SENT, NOT_FOUND, ERROR or THROTTLED).
+        """
+        now = self._clock()
+        for bucket in self._buckets.values():
+            bucket.take()
+        self._last = now
+        self._gap = self._rng.uniform(*self.limits["min_gap"])
+
+        if outcome == SENT:
+            self._errors = self._throttles = 0
+        elif outcome == ERROR:
+            self._errors += 1
+            self._block(now, self.limits["cooldown"], self._errors)
+        elif outcome == THROTTLED:
+            self._throttles += 1
+            self._block(now, self.limits["throttle_backoff"], self._throttles)
+
+    def _block(self, now, base, repeats):
+        backoff = min(self.limits["max_backoff"], base * 2 ** (repeats - 1))
+        self._blocked_until = max(self._blocked_until, now + backoff)
+
+    def snapshot(self):
+        """
+        Tokens left per bucket and the remaining cooldown, for the status view.
+        """
+        for bucket in self._buckets.values():
+            bucket.wait_time()
+        return {
+            "tokens": {name: round(bucket.tokens, 2) for name, bucket in self._buckets.items()},
+            "cooldown": round(max(0.0, self._blocked_until - self._clock()), 1),
+        }
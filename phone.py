@@ -0,0 +1,234 @@
+"""
+WhatsApp Automator - Phone numbers
+Canonicalizes the numbers of the contact files to E.164 (+<country code><number>)
+so the same phone written in different ways is recognized as one contact, and
+keeps the index of numbers that are known not to be on WhatsApp.
+
+The `phonenumbers` package is used when it is installed; otherwise a small
+built-in table of country codes and trunk prefixes covers the common cases.
+"""
+
+import json
+import os
+import time
+
+try:
+    import phonenumbers
+except ImportError:
+    phonenumbers = None
+
+# Region assumed for numbers written without a country code
+DEFAULT_REGION = "EG"
+# Seconds a number reported not on WhatsApp is skipped by later campaigns
+KNOWN_INVALID_TTL = 90 * 24 * 3600
+
+# region -> (country calling code, national trunk prefix, (shortest, longest)
+# national number without the trunk prefix)
+REGIONS = {
+    "AE": ("971", "0", (8, 9)),
+    "DE": ("49", "0", (6, 11)),
+    "EG": ("20", "0", (9, 10)),
+    "ES": ("34", "", (9, 9)),
+    "FR": ("33", "0", (9, 9)),
+    "GB": ("44", "0", (9, 10)),
+    "IN": ("91", "0", (10, 10)),
+    "IT": ("39", "", (6, 11)),
+    "JO": ("962", "0", (8, 9)),
+    "KW": ("965", "", (8, 8)),
+    "MA": ("212", "0", (9, 9)),
+    "NG": ("234", "0", (8, 10)),
+    "PK": ("92", "0", (9, 10)),
+    "QA": ("974", "", (7, 8)),
+    "SA": ("966", "0", (8, 9)),
+    "TR": ("90", "0", (10, 10)),
+    "US": ("1", "", (10, 10)),
+}
+
+# E.164 allows at most 15 digits; anything under 8 is not a reachable phone
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+SEPARATORS = "+-(). "
+
+
+def check_region(region):
+    """
+    Returns the upper-cased region code.
+    :raises ValueError: if the region is not supported.
+    """
+    region = (region or DEFAULT_REGION).upper()
+    if region not in REGIONS and not (phonenumbers and phonenumbers.country_code_for_region(region)):
+        raise ValueError(f"Unknown region '{region}'")
+    return region
+
+
+def normalize(number, region=DEFAULT_REGION):
+    """
+    Returns the number in E.164 format, or None if it is not a valid phone number.
+    Numbers without a country code are read as numbers of `region`.
+    """
+    text = str(number).strip()
+    if not text or not all(ch.isdigit() or ch in SEPARATORS for ch in text):
+        return None
+    if phonenumbers:
+        return _normalize_with_library(text, region)
+
+    digits = "".join(ch for ch in text if ch.isdigit())
+    code, trunk, (shortest, longest) = REGIONS[region]
+    if text.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif trunk and digits.startswith(trunk):
+        digits = code + digits[len(trunk):]
+    elif not (
+        # Written with the country code but without "+" only if the rest has the
+        # length of a national number and the whole doesn't
+        digits.startswith(code)
+        and shortest <= len(digits) - len(code) <= longest
+        and not shortest <= len(digits) <= longest
+    ):
+        digits = code + digits
+    if not MIN_DIGITS <= len(digits) <= MAX_DIGITS:
+        return None
+    return "+" + digits
+
+
+def _normalize_with_library(text, region):
+    if text.startswith("00"):
+        text = "+" + text[2:]
+    try:
+        parsed = phonenumbers.parse(text, region)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(parsed):
+        return None
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+class KnownInvalidIndex:
+    """
+    Numbers WhatsApp reported as not on WhatsApp in past campaigns, read from
+    the `_notfound.txt` logs. Other failures (timeouts, send errors, sends that
+    could not be confirmed) are not evidence of a dead number and never get
+    here. A number that shows up in a later `_sent.txt` log is dropped again,
+    and entries expire after KNOWN_INVALID_TTL seconds, since numbers do join
+    WhatsApp later; forget() drops them on request.
+
+    The index is cached in logs/.known_invalid.<region>.json with how far each
+    log was read, so a refresh only reads what was appended since.
+    `generation` changes whenever the set of numbers does.
+    """
+
+    # Version of the cache; caches of an older one are rebuilt from the logs
+    VERSION = 2
+
+    def __init__(self, logs_dir="logs", path=None, region=DEFAULT_REGION, ttl=KNOWN_INVALID_TTL):
+        self.logs_dir = logs_dir
+        self.path = path or os.path.join(logs_dir, f".known_invalid.{region}.json")
+        self.region = region
+        self.ttl = ttl
+        self.numbers = {}          # number -> time it was last reported not on WhatsApp
+        self.generation = 0
+        self._read = {}            # log file name -> bytes already read
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return
+        if cached.get("region") != self.region:
+            return
+        # Keep counting generations, so indexes built against the old cache are rebuilt
+        self.generation = cached["generation"] + (cached.get("version") != self.VERSION)
+        if cached.get("version") == self.VERSION:
+            self.numbers = cached["numbers"]
+            self._read = cached["read"]
+
+    def refresh(self):
+        """
+        Reads new lines of the result logs, drops expired numbers and saves
+        the index if it changed.
+        """
+        changed = self._expire()
+        if os.path.isdir(self.logs_dir):
+            logs = [
+                entry for entry in os.scandir(self.logs_dir)
+                if entry.name.endswith(("_notfound.txt", "_sent.txt"))
+            ]
+            # Oldest first, and within one run failures before successes
+            logs.sort(key=lambda entry: (entry.stat().st_mtime, entry.name.endswith("_sent.txt")))
+            for entry in logs:
+                changed = self._read_log(entry) or changed
+
+        if changed:
+            self.generation += 1
+        self._save()
+        return self
+
+    def _read_log(self, entry):
+        read = self._read.get(entry.name, 0)
+        if entry.stat().st_size < read:
+            read = 0               # the log was replaced
+        if entry.stat().st_size == read:
+            return False
+        invalid = entry.name.endswith("_notfound.txt")
+        # The log's last write dates the numbers appended since the last read
+        seen = entry.stat().st_mtime
+        changed = False
+        with open(entry.path, "rb") as file:
+            file.seek(read)
+            for line in file:
+                number = normalize(line.decode("utf-8", "replace"), self.region)
+                if number is None:
+                    continue
+                if invalid and seen > time.time() - self.ttl:
+                    changed = changed or number not in self.numbers
+                    self.numbers[number] = seen
+                elif not invalid and number in self.numbers:
+                    del self.numbers[number]
+                    changed = True
+            self._read[entry.name] = file.tell()
+        return changed
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        expired = [number for number, seen in self.numbers.items() if seen <= cutoff]
+        for number in expired:
+            del self.numbers[number]
+        return bool(expired)
+
+    def forget(self, numbers=None):
+        """
+        Drops numbers from the index, all of them if none are given, so they are
+        sent again until they are reported not on WhatsApp again.
+        :return: how many were dropped.
+        """
+        if numbers is None:
+            dropped = list(self.numbers)
+        else:
+            dropped = {normalize(number, self.region) for number in numbers} & set(self.numbers)
+        for number in dropped:
+            del self.numbers[number]
+        if dropped:
+            self.generation += 1
+            self._save()
+        return len(dropped)
+
+    def _save(self):
+        cached = {
+            "version": self.VERSION,
+            "region": self.region,
+            "generation": self.generation,
+            "read": self._read,
+            "numbers": self.numbers,
+        }
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(cached, file)
+
+    def __contains__(self, number):
+        return number in self.numbers
+
+    def __len__(self):
+        return len(self.numbers)
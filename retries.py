@@ -0,0 +1,124 @@
+"""
+WhatsApp Automator - Failure classification and retry queue
+A failed send is either permanent (the number is not on WhatsApp or not a
+valid number, sending again won't change that) or transient (an element that
+rendered late, a stale element, a dropped connection to the browser).
+Transient failures are not logged as not sent right away: the contact goes
+to a RetryQueue and is sent again later, in batches between the other
+contacts and at the end of the campaign, with shorter timeouts and a capped
+number of attempts.
+
+The clock is injectable like the one of pacing.Pacer.
+"""
+
+import time
+from collections import namedtuple
+
+from selenium.common import (
+    ElementClickInterceptedException, ElementNotInteractableException, InvalidSessionIdException,
+    NoSuchElementException, NoSuchWindowException, StaleElementReferenceException, TimeoutException,
+    WebDriverException,
+)
+
+PERMANENT = "permanent"
+TRANSIENT = "transient"
+# The send broke after it may have clicked send: neither retried nor logged as not sent
+UNCONFIRMED = "unconfirmed"
+
+# Exceptions of a page that was not ready yet
+TRANSIENT_ERRORS = (
+    TimeoutException, StaleElementReferenceException, NoSuchElementException,
+    ElementClickInterceptedException, ElementNotInteractableException,
+)
+# The browser is gone: no retry will reach it
+FATAL_ERRORS = (InvalidSessionIdException, NoSuchWindowException)
+
+# Attempts of a contact in all, the first send included
+MAX_ATTEMPTS = 3
+# Seconds before a deferred contact is retried, doubled per further attempt
+RETRY_DELAY = 30
+# Due contacts retried at once between two contacts of the main pass
+BATCH_SIZE = 5
+
+# contact: contacts.Contact; attempts: sends so far; due: clock time of the next one
+Retry = namedtuple("Retry", "contact attempts due")
+
+
+def classify(exc):
+    """
+    PERMANENT or TRANSIENT for an exception raised while sending.
+    """
+    if isinstance(exc, FATAL_ERRORS):
+        return PERMANENT
+    if isinstance(exc, (TRANSIENT_ERRORS, WebDriverException, ConnectionError, TimeoutError)):
+        # Other WebDriver errors are mostly the driver connection or a page
+        # in the middle of a re-render
+        return TRANSIENT
+    if _is_urllib3_error(exc):
+        return TRANSIENT
+    # Invalid numbers (ValueError from phone.normalize) and anything unexpected
+    return PERMANENT
+
+
+def _is_urllib3_error(exc):
+    try:
+        from urllib3.exceptions import HTTPError
+    except ImportError:
+        return False
+    return isinstance(exc, HTTPError)
+
+
+class RetryQueue:
+    """
+    Contacts whose send failed for a transient reason, each due after a delay.
+    """
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, delay=RETRY_DELAY, clock=time.monotonic):
+        self.max_attempts = max_attempts
+        self.delay = delay
+        self.clock = clock
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def defer(self, contact, attempts, delay=None):
+        """
+        Queues `contact` after its `attempts`-th failed send.
+        :param delay: seconds until it is due; grows with the attempts if not given.
+        :return: False if it already had all its attempts.
+        """
+        if attempts >= self.max_attempts:
+            return False
+        if delay is None:
+            delay = self.delay * 2 ** (attempts - 1)
+        self._entries.append(Retry(contact, attempts, self.clock() + delay))
+        return True
+
+    def due(self):
+        """
+        Number of contacts whose delay is over.
+        """
+        now = self.clock()
+        return sum(entry.due <= now for entry in self._entries)
+
+    def take(self, limit):
+        """
+        Removes and returns up to `limit` due entries, longest due first.
+        """
+        now = self.clock()
+        ready = sorted((e for e in self._entries if e.due <= now), key=lambda e: e.due)[:limit]
+        for entry in ready:
+            self._entries.remove(entry)
+        return ready
+
+    def wait(self):
+        """
+        Seconds until the next entry is due, 0 if one already is.
+        """
+        if not self._entries:
+            return 0.0
+        return max(0.0, min(e.due for e in self._entries) - self.clock())
+
+    def snapshot(self):
+        return {"queued": len(self._entries), "due": self.due()}
@@ -28,7 +28,7 @@ if errorlevel 1 (
 
 :: ── Install Python dependencies ──────────────────────────────────────
 echo [INFO] Checking Python dependencies...
-pip install flask flask-cors colorama selenium webdriver-manager packaging setuptools -q
+pip install flask flask-cors colorama selenium webdriver-manager packaging setuptools openpyxl psutil -q
 
 :: ── Create required directories ──────────────────────────────────────
 if not exist "data" mkdir data
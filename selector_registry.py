@@ -0,0 +1,178 @@
+"""
+WhatsApp Automator - Selector registry
+Holds an ordered list of candidate locators for every element the bot uses.
+Each element is resolved once per session and the winning locator is cached;
+the other candidates are only tried again when the cached one stops matching.
+"""
+
+from colorama import Fore, Style
+from selenium.common import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+# Stable attribute-based locators come first, the original class-chain
+# selectors are kept last as a fallback for older WhatsApp Web builds.
+SELECTORS = {
+    "login_search": [
+        (By.XPATH, "//div[@contenteditable='true' and @data-tab='3']"),
+    ],
+    "chat_list": [
+        (By.CSS_SELECTOR, "#pane-side"),
+    ],
+    "new_chat_button": [
+        (By.CSS_SELECTOR, "header span[data-icon='new-chat-outline']"),
+        (By.CSS_SELECTOR, "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div._aigw._as6h.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x12xzxwr.x1plvlek.xryxfnj.x570efc.x18dvir5.xxljpkc.xwfak60.x18pi947 > header > header > div > span > div > div:nth-child(1) > span > button > div > div > div:nth-child(1) > span"),
+    ],
+    "search_box": [
+        (By.CSS_SELECTOR, "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x11uqc5h.x9f619.x78zum5.x1okw0bk.xl2dz39.xexx8yu.x18d9i69.x73uwhe.x1qhh985.x1sy0etr.xa3a66u.x1gnnqk1.x1phvje8.xcldk2z.x7a106z.x4tpdpg > div.x1n2onr6.x9f619.x98rzlu.x6ikm8r.x10wlt62 > div > div > div > p"),
+    ],
+    "contact_result": [
+        (By.CSS_SELECTOR, "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x6ikm8r.x1odjw0f.x1hc1fzr.x1anedsm.x1280gxy > div:nth-child(2) > div > div > div:nth-child(2) > div > div"),
+    ],
+    "unsaved_result": [
+        (By.CSS_SELECTOR, "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x1n2onr6.xupqr0c.x78zum5.x1r8uery.x1iyjqo2.xdt5ytf.x6ikm8r.x1odjw0f.x1hc1fzr.x1anedsm.x1280gxy > div._ak72.false.false.false._ak73._asiw._ap1-._ap1_"),
+    ],
+    "clean_button": [
+        (By.CSS_SELECTOR, "span button span[data-icon='x-alt']"),
+        (By.CSS_SELECTOR, "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > div.x1n2onr6.x11uqc5h.x9f619.x78zum5.x1okw0bk.xl2dz39.xexx8yu.x18d9i69.x73uwhe.x1qhh985.x1sy0etr.xa3a66u.x1gnnqk1.x1phvje8.xcldk2z.x7a106z.x4tpdpg > div.x1n2onr6.x9f619.x98rzlu.x6ikm8r.x10wlt62 > span > button > span"),
+    ],
+    "return_button": [
+        (By.CSS_SELECTOR, "header span[data-icon='back']"),
+        (By.CSS_SELECTOR, "#app > div > div > div.x78zum5.xdt5ytf.x5yr21d > div > div.x10l6tqk.x13vifvy.x1o0tod.x78zum5.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x47corl > div._aigw._as6h.false.xevlxbw.x9f619.x1n2onr6.x5yr21d.x17dzmu4.x1i1dayz.x2ipvbc.xjdofhw.x78zum5.xdt5ytf.x570efc.x18dvir5.xxljpkc.xwfak60.x6ikm8r.x10wlt62.x1oy9qf3.xpilrb4.x1t7ytsu.x1vb5itz > div > span > div > span > div > header > div > div.x1okw0bk > div > span > button > div > div > div:nth-child(1) > span"),
+    ],
+    "message_box": [
+        (By.CSS_SELECTOR, "#main footer div[contenteditable='true'][data-tab='10'] p"),
+        (By.CSS_SELECTOR, "#main footer .lexical-rich-text-input div[contenteditable='true'] p"),
+        (By.CSS_SELECTOR, "#main > footer > div.x1n2onr6.xhtitgo.x9f619.x78zum5.x1q0g3np.xuk3077.xjbqb8w.x1wiwyrm.xvc5jky.x11t971q.xquzyny.xnpuxes.copyable-area > div > span > div > div._ak1r > div > div.x1n2onr6.xh8yej3.xjdcl3y.lexical-rich-text-input > div.x1hx0egp.x6ikm8r.x1odjw0f.x1k6rcq7.x6prxxf > p"),
+    ],
+    "attach_button": [
+        (By.CSS_SELECTOR, "#main footer span[data-icon='plus-rounded']"),
+        (By.CSS_SELECTOR, "#main footer span[data-icon='plus']"),
+        (By.CSS_SELECTOR, "#main footer span[data-icon='attach-menu-plus']"),
+        (By.CSS_SELECTOR, "#main footer button[title='Attach']"),
+    ],
+    # File inputs of the attach menu, present (hidden) once the menu was opened
+    "media_input": [
+        (By.CSS_SELECTOR, "input[type='file'][accept*='image']"),
+    ],
+    "document_input": [
+        (By.CSS_SELECTOR, "input[type='file'][accept='*']"),
+        (By.CSS_SELECTOR, "input[type='file']:not([accept*='image'])"),
+    ],
+    # Caption box and send button of the preview shown for a staged attachment
+    "media_caption": [
+        (By.CSS_SELECTOR, "div[contenteditable='true'][aria-label='Add a caption'] p"),
+        (By.CSS_SELECTOR, "div[contenteditable='true'][data-tab='undefined'] p"),
+    ],
+    "media_send_button": [
+        (By.CSS_SELECTOR, "div[role='button'][aria-label='Send'] span[data-icon='send']"),
+        (By.CSS_SELECTOR, "div[role='button'][aria-label='Send']"),
+        (By.CSS_SELECTOR, "span[data-icon='wds-ic-send-filled']"),
+        (By.CSS_SELECTOR, "span[data-icon='send']"),
+    ],
+    "send_button": [
+        (By.CSS_SELECTOR, "#main footer span[data-icon='send']"),
+        (By.CSS_SELECTOR, "#main footer span[data-icon='wds-ic-send-filled']"),
+        (By.CSS_SELECTOR, "#main footer button[aria-label='Send']"),
+        (By.CSS_SELECTOR, "#main > footer > div.x1n2onr6.xhtitgo.x9f619.x78zum5.x1q0g3np.xuk3077.xjbqb8w.x1wiwyrm.xquzyny.xvc5jky.x11t971q.xnpuxes.copyable-area > div > span > div > div._ak1r > div > div.x9f619.x78zum5.x6s0dn4.xl56j7k.xpvyfi4.x2lah0s.x1c4vz4f.x1fns5xo.x1ba4aug.x1c9tyrk.xeusxvb.x1pahc9y.x1ertn4p.x1pse0pq.xpcyujq.xfn3atn.x1ypdohk.x1m2oepg > div > span > button > div > div > div:nth-child(1) > span"),
+    ],
+    # Modal shown by WhatsApp when the number in a send URL is not on WhatsApp.
+    # The "Starting chat" modal has no button, so only the error modal matches.
+    "invalid_number_popup": [
+        (By.CSS_SELECTOR, "div[data-animate-modal-popup='true'] button"),
+    ],
+    # Status icon of the last outgoing message: clock (pending), single or double tick
+    "last_bubble_status": [
+        (By.XPATH, "(//div[@id='main']//div[contains(@class, 'message-out')])[last()]"
+                   "//span[@data-icon='msg-time' or @data-icon='msg-check' or @data-icon='msg-dblcheck']"),
+    ],
+    "pending_message": [
+        (By.CSS_SELECTOR, "#main span[data-icon='msg-time']"),
+    ],
+}
+
+# Elements present on the main screen right after login, resolved up front
+STARTUP_ELEMENTS = ("login_search", "chat_list", "new_chat_button")
+
+
+class SelectorRegistry:
+    """
+    Resolves logical element names to elements through their candidate locators.
+    """
+
+    def __init__(self, driver, waits, selectors=SELECTORS):
+        self.driver = driver
+        self.waits = waits
+        self._selectors = selectors
+        self._resolved = {}
+
+    def resolve_all(self, names=STARTUP_ELEMENTS):
+        """
+        One-time pass that caches the matching locator of every element already
+        on screen. Elements that are not rendered yet are resolved on first use.
+        """
+        for name in names:
+            for locator in self._selectors[name]:
+                if self.driver.find_elements(*locator):
+                    self._remember(name, locator)
+                    break
+
+    def candidates(self, name):
+        """
+        Candidate locators of an element, the cached winner first.
+        """
+        resolved = self._resolved.get(name)
+        if resolved is None:
+            return self._selectors[name]
+        return [resolved] + [loc for loc in self._selectors[name] if loc != resolved]
+
+    def find(self, name, timeout, condition=EC.element_to_be_clickable):
+        """
+        Waits for the element and returns it.
+        :raises TimeoutException: if no candidate matched within `timeout` seconds.
+        """
+        return self.find_any((name,), timeout, condition)[1]
+
+    def find_any(self, names, timeout, condition=EC.element_to_be_clickable):
+        """
+        Waits until one of the named elements matches.
+        :return: (name, element) of the first element found.
+        """
+        return self.waits.until("/".join(names), self._first_match(names, condition), timeout)
+
+    def find_now(self, name):
+        """
+        Returns the currently matching elements without waiting.
+        """
+        for locator in self.candidates(name):
+            elements = self.driver.find_elements(*locator)
+            if elements:
+                self._remember(name, locator)
+                return elements
+        return []
+
+    def _first_match(self, names, condition):
+        def check(driver):
+            for name in names:
+                for locator in self.candidates(name):
+                    try:
+                        element = condition(locator)(driver)
+                    except (NoSuchElementException, StaleElementReferenceException):
+                        element = False
+                    if element:
+                        self._remember(name, locator)
+                        return name, element
+            return False
+        return check
+
+    def _remember(self, name, locator):
+        previous = self._resolved.get(name)
+        if previous == locator:
+            return
+        if previous is not None:
+            print(Fore.YELLOW, f"Selector for '{name}' changed, now using: {locator[1][:60]}", Style.RESET_ALL)
+        self._resolved[name] = locator
+
+    @property
+    def resolved(self):
+        return dict(self._resolved)
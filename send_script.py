@@ -0,0 +1,271 @@
+"""
+WhatsApp Automator - In-page send script
+Runs the whole send of one contact inside the page: open the chat through the
+new chat search (or wait for the chat opened by the send URL), insert the
+message, click send and wait for the bubble. Each WebDriver command is an HTTP
+round-trip, so this replaces a dozen of them per contact with a few.
+
+The send runs on in the page between calls: SEND_SCRIPT starts it and
+WAIT_SCRIPT picks it up again, each returning after at most SLICE_MS with the
+result or "running". The bot checks its RunControl between two calls, holds
+the script's waits while paused and cancels the script when stopped.
+
+The elements are found through the same candidate locators as the
+step-by-step path (see selector_registry.py), cached winners first. The script
+returns a structured result; on "failed" it has not clicked send and has
+emptied the boxes it typed into, so the step-by-step path can take over.
+"""
+
+# Elements the script looks for
+ELEMENTS = (
+    "new_chat_button", "search_box", "contact_result", "unsaved_result", "clean_button",
+    "return_button", "message_box", "send_button", "last_bubble_status", "invalid_number_popup",
+)
+
+# Milliseconds between two checks of a condition, as waits.POLL_INTERVAL
+POLL_MS = 50
+# Milliseconds the editor gets to show an inserted text
+TYPE_MS = 1000
+# Milliseconds one script call waits for the send before handing back to the bot
+SLICE_MS = 150
+
+# Replies to the script call with the send's result, or "running" after `ms`
+SETTLE = """
+function settle(job, ms, done) {
+    var settled = false;
+    function reply(result) { if (!settled) { settled = true; done(result); } }
+    setTimeout(function () { reply({status: 'running'}); }, ms);
+    job.finished.then(reply);
+}
+"""
+
+# arguments[0]: see arguments() below. Results:
+#   {status: "sent", message_id, icon, timings}   bubble seen
+#   {status: "unconfirmed", timings}              send clicked, no bubble in time
+#   {status: "not_found", timings}                number not on WhatsApp
+#   {status: "failed", stage, reason, timings}    gave up before clicking send,
+#                                                 reason "cancelled" once cancelled
+#   {status: "running"}                           not done yet, see WAIT_SCRIPT
+# timings: milliseconds per stage (open_chat, locate_box, type, click_send, confirm)
+SEND_SCRIPT = SETTLE + """
+var p = arguments[0], done = arguments[arguments.length - 1];
+// A send left behind by a broken call is cancelled and finishes first
+var previous = window.__whatsappSend;
+if (previous) { previous.cancelled = true; }
+var job = window.__whatsappSend = {paused: false, cancelled: false};
+var deadline = performance.now() + p.timeouts.total;
+var mark = performance.now(), timings = {}, stage = 'open_chat', clicked = false, typed = [];
+
+function lap(name) { var now = performance.now(); timings[name] = now - mark; mark = now; }
+
+function find(name, visible) {
+    var list = p.locators[name] || [];
+    for (var i = 0; i < list.length; i++) {
+        var node = null;
+        try {
+            node = list[i][0] === 'xpath'
+                ? document.evaluate(list[i][1], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                : document.querySelector(list[i][1]);
+        } catch (e) { node = null; }
+        if (node && (!visible || node.getClientRects().length)) { return node; }
+    }
+    return null;
+}
+
+function waitFor(test, ms) {
+    var until = Math.min(performance.now() + ms, deadline), last = performance.now();
+    return new Promise(function (resolve) {
+        (function poll() {
+            var now = performance.now();
+            if (job.cancelled) { return resolve(null); }
+            if (job.paused) {
+                // Time spent paused doesn't count, as in waits.Waiter
+                until += now - last;
+                deadline += now - last;
+                last = now;
+                return setTimeout(poll, p.poll);
+            }
+            last = now;
+            var value = test();
+            if (value || performance.now() >= until) { return resolve(value || null); }
+            setTimeout(poll, p.poll);
+        })();
+    });
+}
+
+function element(name) { return waitFor(function () { return find(name, true); }, p.timeouts.element); }
+
+function editor(node) { return node.closest('[contenteditable="true"]') || node; }
+
+function strip(text) { return (text || '').replace(/\\s+/g, ''); }
+
+function insert(node, text) {
+    editor(node).focus();
+    typed.push(node);
+    var data = new DataTransfer();
+    data.setData('text/plain', text);
+    node.dispatchEvent(new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true}));
+}
+
+function empty(node) {
+    if (!node.isConnected) { return; }
+    editor(node).focus();
+    document.execCommand('selectAll', false, null);
+    document.execCommand('delete', false, null);
+}
+
+function bubbleId(status) {
+    var bubble = status && status.closest('[data-id]');
+    return bubble ? bubble.getAttribute('data-id') : null;
+}
+
+function fail(reason) {
+    typed.forEach(empty);
+    return {status: 'failed', stage: stage, reason: job.cancelled ? 'cancelled' : reason, timings: timings};
+}
+
+async function send() {
+    if (p.number) {
+        var previousBox = find('message_box', false);
+        var button = await element('new_chat_button');
+        if (!button) { return fail('new chat button not found'); }
+        button.click();
+        var search = await element('search_box');
+        if (!search) { return fail('search box not found'); }
+        search.click();
+        insert(search, '+' + p.number);
+        var result = await waitFor(function () {
+            return find('contact_result', true) || find('unsaved_result', true);
+        }, p.timeouts.search);
+        if (!result) {
+            if (job.cancelled) { return fail('cancelled'); }
+            empty(search);
+            var clean = find('clean_button', true);
+            if (clean) { clean.click(); }
+            var back = await element('return_button');
+            if (back) { back.click(); }
+            lap(stage);
+            return {status: 'not_found', timings: timings};
+        }
+        result.click();
+        lap(stage);
+
+        // The chat is swapped in once the previous chat's message box was
+        // replaced or taken off the page and a message box shows again
+        stage = 'locate_box';
+        var swapped = !previousBox || !previousBox.isConnected;
+        var box = await waitFor(function () {
+            swapped = swapped || !previousBox.isConnected;
+            var node = find('message_box', true);
+            return node && (swapped || node !== previousBox) ? node : null;
+        }, p.timeouts.element);
+        if (!box) { return fail('message box not found'); }
+        box.click();
+        empty(box);
+        lap(stage);
+    } else {
+        // Chat opened by the send URL: either its message box or the invalid number popup shows
+        var found = await waitFor(function () {
+            var popup = find('invalid_number_popup', true);
+            if (popup) { return {popup: popup}; }
+            var node = find('message_box', false);
+            return node ? {box: node} : null;
+        }, p.timeouts.element);
+        if (!found) { return fail('chat did not open'); }
+        if (found.popup) {
+            found.popup.click();
+            lap(stage);
+            return {status: 'not_found', timings: timings};
+        }
+        var box = found.box;
+        lap(stage);
+    }
+
+    if (p.message) {
+        stage = 'type';
+        insert(box, p.message);
+        var shown = await waitFor(function () {
+            return strip(editor(box).innerText) === strip(p.message);
+        }, p.timeouts.type);
+        if (!shown) { return fail('message box did not take the message'); }
+        lap(stage);
+    }
+
+    stage = 'click_send';
+    var previousBubble = bubbleId(find('last_bubble_status', false));
+    var send = await element('send_button');
+    if (!send) { return fail('send button not found'); }
+    send.click();
+    clicked = true;
+    lap(stage);
+
+    stage = 'confirm';
+    var status = await waitFor(function () {
+        var node = find('last_bubble_status', false);
+        return node && bubbleId(node) !== previousBubble ? node : null;
+    }, p.timeouts.bubble);
+    lap(stage);
+    if (!status) { return {status: 'unconfirmed', timings: timings}; }
+    return {status: 'sent', message_id: bubbleId(status), icon: status.getAttribute('data-icon'), timings: timings};
+}
+
+job.finished = (previous ? previous.finished : Promise.resolve()).then(send).catch(function (error) {
+    return clicked ? {status: 'unconfirmed', timings: timings} : fail(String(error));
+});
+settle(job, p.slice, done);
+"""
+
+# arguments[0]: {slice, paused, cancelled}; `paused` holds or releases the
+# send's waits when given, `cancelled` makes it give up. Returns as
+# SEND_SCRIPT, or {status: "lost"} if the page no longer has the send
+# (e.g. it was reloaded).
+WAIT_SCRIPT = SETTLE + """
+var control = arguments[0], done = arguments[arguments.length - 1];
+var job = window.__whatsappSend;
+if (!job) { return done({status: 'lost'}); }
+if (control.paused !== undefined) { job.paused = control.paused; }
+if (control.cancelled) { job.cancelled = true; job.paused = false; }
+settle(job, control.slice, done);
+"""
+
+
+def arguments(selectors, number, message, element_timeout, search_timeout, bubble_timeout):
+    """
+    The argument of SEND_SCRIPT.
+    :param selectors: the bot's SelectorRegistry.
+    :param number: number to search in E.164 without "+", or None when the
+        send URL already opened the chat.
+    :param message: text to insert, "" when the send URL prefilled it.
+    :param element_timeout: seconds, as the other timeouts.
+    """
+    return {
+        "number": number,
+        "message": message,
+        "locators": {name: [list(locator) for locator in selectors.candidates(name)] for name in ELEMENTS},
+        "timeouts": {
+            "element": element_timeout * 1000,
+            "search": search_timeout * 1000,
+            "bubble": bubble_timeout * 1000,
+            "type": TYPE_MS,
+            "total": script_timeout(element_timeout, bubble_timeout) * 1000,
+        },
+        "poll": POLL_MS,
+        "slice": SLICE_MS,
+    }
+
+
+def control(paused=None, cancelled=False, slice_ms=SLICE_MS):
+    """
+    The argument of WAIT_SCRIPT.
+    """
+    argument = {"slice": slice_ms, "cancelled": cancelled}
+    if paused is not None:
+        argument["paused"] = paused
+    return argument
+
+
+def script_timeout(element_timeout, bubble_timeout):
+    """
+    Seconds the whole send may take, not counting pauses, before it gives up on its own.
+    """
+    return 2 * element_timeout + bubble_timeout
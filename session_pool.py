@@ -0,0 +1,258 @@
+"""
+WhatsApp Automator - Session pool
+Runs one campaign on several Bot instances in parallel. Every session owns its
+own Chrome profile (and therefore its own linked WhatsApp account) and sends
+to an interleaved shard of the contact file.
+"""
+
+import os
+import threading
+import time
+
+from browsers import BrowserSessions, profile_dir
+from pacing import session_limits
+from waits import JitterPolicy, RunControl
+
+
+def shard_size(total, index, count):
+    """
+    Number of contacts out of `total` that fall in shard `index` of `count`.
+    """
+    return total // count + (1 if index < total % count else 0)
+
+
+class Session:
+    """
+    One Bot together with its profile and its share of the running campaign.
+    """
+
+    def __init__(self, index, count, total, rate_limit=None):
+        self.index = index
+        self.count = count
+        self.rate_limit = rate_limit
+        self.bot = None
+        self.thread = None
+        self.error = None
+        self.state = {
+            "id": index,
+            "profile": os.path.basename(profile_dir(index)),
+            "status": "running",     # running | paused | completed | error | stopped
+            "progress": 0,
+            "total": shard_size(total, index, count),
+            "current_number": "",
+            "message": "Starting bot…",
+            "updated": time.time(),
+            "timings": {},           # per-step wait stats, see waits.StepStats
+            "delivery": {},          # messages per delivery state, see delivery.py
+            "pacing": {},            # tokens left and cooldown, see pacing.Pacer
+            "retries": {},           # contacts queued and due for a retry, see retries.py
+            "resume_after": None,    # last finished row while paused, see journal.py
+        }
+
+
+class SessionPool:
+    """
+    Starts, tracks and stops the sessions of a campaign.
+    All session state is guarded by the lock shared with the API server.
+    Every change is signalled on `events` (an events.EventBus) if one is given.
+    Browsers stay open and logged in between campaigns: they are taken from
+    and given back to `browsers` (a browsers.BrowserSessions).
+    All bots of the campaign share one waits.RunControl, so a pause, resume
+    or stop reaches every wait and sleep of every session.
+    """
+
+    def __init__(self, lock, stop_event, events=None, browsers=None):
+        self._lock = lock
+        self._stop_event = stop_event
+        self.control = RunControl(stop_event)
+        self._events = events
+        self.browsers = browsers or BrowserSessions()
+        self._remaining = 0
+        self._on_finish = None
+        self.sessions = []
+
+    def start(self, filepath, count, total, campaign_id=None, journal=None, with_media=False,
+              open_mode="search", rate_limit=None, jitter="human", region=None,
+              known_invalid=None, pacing=None, template=None, media=None, on_finish=None):
+        """
+        Launches `count` sessions, each in its own thread, splitting the contacts
+        of `filepath` between them. `rate_limit` is in messages per minute, either
+        a single value or a list with one entry per session, on top of the
+        other `pacing` limits (see pacing.DEFAULTS). `template` is the text of
+        the message template, if any (see templates.py), and `media` the file
+        attached to every message when `with_media` is set (see media.py).
+        `on_finish(errors)` is called once, from the last session to finish, with
+        the exceptions raised by failed sessions.
+        All sessions record their results under `campaign_id` in the shared
+        `journal` and resume from its cursors. `region` and `known_invalid`
+        (a phone.KnownInvalidIndex) decide which numbers are skipped.
+        """
+        if not isinstance(rate_limit, (list, tuple)):
+            rate_limit = [rate_limit] * count
+        self.control.reset()
+        with self._lock:
+            self.sessions = [Session(i, count, total, rate_limit[i]) for i in range(count)]
+            self._remaining = count
+            self._on_finish = on_finish
+
+        for session in self.sessions:
+            session.thread = threading.Thread(
+                target=self._run_session,
+                args=(session, filepath, campaign_id, journal, with_media, open_mode, jitter,
+                      region, known_invalid, pacing, template, media),
+                daemon=True,
+            )
+            session.thread.start()
+
+    def _run_session(self, session, filepath, campaign_id, journal, with_media, open_mode, jitter,
+                     region, known_invalid, pacing, template, media):
+        try:
+            bot = self.browsers.acquire(session.index, self._stop_event)
+            if bot is None:
+                return
+            session.bot = bot
+            bot.keep_alive = True
+            bot.control = self.control
+            bot.csv_numbers = filepath
+            bot.campaign_id = campaign_id
+            bot.journal = journal
+            bot.open_mode = open_mode
+            bot.shard = (session.index, session.count)
+            bot.pacing.reset_limits(**session_limits(pacing, session.rate_limit))
+            bot.jitter = JitterPolicy.named(jitter)
+            if region:
+                bot.region = region
+            bot.known_invalid = known_invalid
+            bot.template = template
+            bot._options = with_media
+            bot.media = media
+
+            if not bot.logged_in:
+                self._update(session, message="Opening WhatsApp Web… please scan the QR code.")
+
+            # Wrap send_message_to_contact to track progress; a reused bot still
+            # holds the wrapper of its previous campaign, so wrap the class method
+            original_send = type(bot).send_message_to_contact.__get__(bot)
+
+            def _tracked_send(number, message, attachment=None):
+                # Raises waits.Cancelled once stopped, the bot ends the campaign
+                self.control.checkpoint()
+                self._update(session, current_number=number, message=f"Sending to {number}…")
+                result = original_send(number, message, attachment)
+                timings = bot.wait_stats
+                delivery = bot.delivery.counts()
+                pacing_state = bot.pacing.snapshot()
+                retry_state = bot.retries.snapshot()
+                with self._lock:
+                    # A retried contact was counted on its first attempt
+                    if not bot.retrying:
+                        session.state["progress"] += 1
+                    session.state["retries"] = retry_state
+                    session.state["timings"] = timings
+                    session.state["delivery"] = delivery
+                    session.state["pacing"] = pacing_state
+                    session.state["updated"] = time.time()
+                if self._events:
+                    self._events.publish("outcome", {
+                        "session": session.index,
+                        "number": number,
+                        "sent": not result,
+                        "retry": bot.retrying,
+                    })
+                    self._events.touch()
+                return result
+
+            bot.send_message_to_contact = _tracked_send
+            bot.login()
+            self._update(session, delivery=bot.delivery.counts())
+
+            if not self._stop_event.is_set():
+                self._update(session, status="completed", message="Finished.")
+
+        except Exception as exc:
+            # Only record the failure if it wasn't caused by a user stop
+            if not self._stop_event.is_set():
+                session.error = exc
+                self._update(session, status="error", message=f"❌ Error: {exc}")
+        finally:
+            # session.bot is None if stop() closed the browser
+            if session.bot is not None:
+                # A kept browser must not inherit this campaign's stop
+                session.bot.control = RunControl()
+            self.browsers.release(session.index, session.bot)
+            session.bot = None
+            self._session_done()
+
+    def _update(self, session, **fields):
+        with self._lock:
+            session.state.update(fields, updated=time.time())
+        if self._events:
+            self._events.touch()
+
+    def _session_done(self):
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+            on_finish = self._on_finish
+        if last and on_finish and not self._stop_event.is_set():
+            on_finish([s.error for s in self.sessions if s.error])
+
+    def pause(self):
+        """
+        Holds every session at its next wait or sleep, keeping the browsers
+        logged in. Records where each session resumes.
+        """
+        self.control.pause()
+        with self._lock:
+            sessions = [s for s in self.sessions if s.state["status"] == "running"]
+        for session in sessions:
+            bot = session.bot
+            resume_after = None
+            if bot is not None and bot.journal is not None and bot.campaign_id is not None:
+                resume_after = bot.journal.cursor(bot.campaign_id, session.index)[0]
+            self._update(session, status="paused", resume_after=resume_after, message="Paused.")
+
+    def resume(self):
+        with self._lock:
+            for session in self.sessions:
+                if session.state["status"] == "paused":
+                    session.state.update(status="running", message="Resuming…", updated=time.time())
+        self.control.resume()
+        if self._events:
+            self._events.touch()
+
+    def is_paused(self):
+        return self.control.paused and self.is_running()
+
+    def stop(self, close_browsers=False):
+        """
+        Signals every session to stop: each one leaves its current wait or
+        sleep within a fraction of a second and keeps its browser for the next
+        campaign. With `close_browsers` the browsers are closed right away.
+        """
+        self.control.cancel()
+        if close_browsers:
+            self.browsers.close_all()
+            for session in self.sessions:
+                if session.bot:
+                    session.bot.quit_driver_quietly()
+                session.bot = None
+        with self._lock:
+            for session in self.sessions:
+                if session.state["status"] in ("running", "paused"):
+                    session.state["status"] = "stopped"
+        if self._events:
+            self._events.touch()
+
+    def clear(self):
+        with self._lock:
+            self.sessions = []
+
+    def is_running(self):
+        return any(s.thread and s.thread.is_alive() for s in self.sessions)
+
+    def snapshot(self):
+        """
+        Copies the per-session state. The caller must hold the lock.
+        """
+        return [dict(s.state) for s in self.sessions]
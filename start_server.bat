@@ -26,7 +26,7 @@ if not exist "api_server.py" (
 
 :: Install dependencies if needed
 echo [INFO] Checking Python dependencies...
-pip install flask flask-cors colorama selenium webdriver-manager packaging setuptools -q
+pip install flask flask-cors colorama selenium webdriver-manager packaging setuptools openpyxl psutil -q
 
 :: Create data and logs directories if they don't exist
 if not exist "data" mkdir data
@@ -0,0 +1,112 @@
+"""
+WhatsApp Automator - Message templates
+A campaign template such as "Hi {name}, order {Order ID} has shipped" is
+filled from the columns of each contact row. The template is parsed once per
+campaign into literal text and column lookups, so rendering a row is a single
+join; checking it against the header of a contact file catches missing
+columns at upload time instead of in the middle of a campaign.
+
+The syntax is that of str.format, with column names in the braces: "{{" and
+"}}" stand for literal braces, and a conversion or format spec may follow the
+name ("{name!s:>10}"). Cells are text, so only string format specs (fill,
+alignment, width, precision) apply. Column names are matched without regard
+to case.
+"""
+
+import string
+
+_formatter = string.Formatter()
+
+
+class TemplateError(ValueError):
+    """
+    Raised for a template that can't be parsed or doesn't fit a contact file.
+    """
+
+
+class Template:
+    """
+    A compiled message template. Bind it to the header of a contact file
+    before rendering rows of that file.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        # (literal text, column name or None, conversion, format spec)
+        self._parts = []
+        try:
+            for literal, name, spec, conversion in _formatter.parse(text):
+                if name is not None:
+                    name = name.strip()
+                    if not name or name.isdigit():
+                        raise TemplateError("Template fields need a column name, e.g. {name}")
+                    if spec and "{" in spec:
+                        raise TemplateError(f"Nested fields are not supported in '{{{name}:{spec}}}'")
+                self._parts.append((literal, name, conversion, spec))
+        except ValueError as exc:
+            if isinstance(exc, TemplateError):
+                raise
+            raise TemplateError(f"Invalid template: {exc}")
+        self.variables = list(dict.fromkeys(name for _, name, _, _ in self._parts if name is not None))
+        # Template name -> column name in the header, set by bind
+        self._columns = {name: name for name in self.variables}
+        # Cells are always text, so a spec like {amount:.2f} fails on every row: catch it now
+        try:
+            self.render({})
+        except (TypeError, ValueError) as exc:
+            raise TemplateError(f"Invalid template: {exc} (column values are text, use a text format spec)")
+
+    def bind(self, header):
+        """
+        Resolves the template names to the columns of `header` and returns self.
+        :raises TemplateError: listing the names that match no column.
+        """
+        columns = {column.lower(): column for column in reversed(header) if column}
+        missing = []
+        for name in self.variables:
+            if name in header:
+                self._columns[name] = name
+            elif name.lower() in columns:
+                self._columns[name] = columns[name.lower()]
+            else:
+                missing.append(name)
+        if missing:
+            raise TemplateError(
+                f"Template uses {', '.join(missing)} but the file has no such column "
+                f"(columns: {', '.join(column for column in header if column) or 'none'})"
+            )
+        return self
+
+    def missing(self, fields):
+        """
+        Template names whose column is empty in `fields`, the cells of one row.
+        """
+        return [name for name in self.variables if not fields.get(self._columns[name])]
+
+    def render(self, fields):
+        """
+        The message for one row, `fields` being its cells by column name.
+        :raises ValueError: if a format spec doesn't apply to the cell.
+        """
+        out = []
+        for literal, name, conversion, spec in self._parts:
+            out.append(literal)
+            if name is None:
+                continue
+            value = fields.get(self._columns[name], "")
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            out.append(_formatter.format_field(value, spec) if spec else value)
+        return "".join(out)
+
+
+def compile_template(text, header=None):
+    """
+    Returns the compiled template for `text`, bound to `header` if given,
+    or None for an empty template (the message column is sent as is).
+    :raises TemplateError: if the template is invalid or doesn't fit the header.
+    """
+    if not text:
+        return None
+    template = Template(text)
+    return template.bind(header) if header is not None else template
@@ -0,0 +1,43 @@
+import contacts
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "contacts.csv"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def test_header_loses_the_byte_order_mark(tmp_path):
+    path = write_csv(tmp_path, "\ufeffphone,message\n01012345678,Hi\n")
+    assert contacts.read_header(path) == ["phone", "message"]
+
+
+def test_offsets_resume_after_the_row(tmp_path):
+    path = write_csv(tmp_path, "phone,message\n01000000001,One\n01000000002,\"Two,\nlines\"\n01000000003,Three\n")
+    rows = list(contacts.iter_contacts(path))
+    assert [contact.number for contact in rows] == ["01000000001", "01000000002", "01000000003"]
+    assert rows[1].message == "Two,\nlines"
+    resumed = list(contacts.iter_contacts(path, start=(rows[1].position, rows[1].offset)))
+    assert [(contact.position, contact.number) for contact in resumed] == [(3, "01000000003")]
+
+
+def test_columns_are_found_by_name(tmp_path):
+    path = write_csv(tmp_path, "name,message,mobile\nSara,Hi,01012345678\n")
+    contact = next(contacts.iter_contacts(path))
+    assert (contact.number, contact.message) == ("01012345678", "Hi")
+    assert contact.fields["name"] == "Sara"
+
+
+def test_legacy_rows_keep_commas_in_the_message(tmp_path):
+    path = write_csv(tmp_path, "phone\n\"01000000001,Hi, there\"\n01000000002,Hello, again\n")
+    messages = [contact.message for contact in contacts.iter_contacts(path)]
+    assert messages == ["Hi, there", "Hello, again"]
+
+
+def test_validate_reports_why_a_row_is_not_sent(tmp_path):
+    path = write_csv(tmp_path, "phone,message\n,Hi\n12ab,Hi\n01012345678,\n01012345678,Hi\n")
+    reasons = [contacts.validate(contact) for contact in contacts.iter_contacts(path)]
+    assert reasons[0] == "missing phone number"
+    assert reasons[1].startswith("malformed phone number")
+    assert reasons[2] == "missing message"
+    assert reasons[3] is None
@@ -0,0 +1,64 @@
+import pytest
+
+import journal
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = journal.CampaignJournal(str(tmp_path / "journal.db"))
+    log.create("c1", "contacts.csv", session_count=2, options={"region": "EG"})
+    yield log
+    log.close()
+
+
+def test_new_campaign_starts_at_the_header(log):
+    campaign = log.campaign("c1")
+    assert campaign["status"] == "running"
+    assert campaign["options"] == {"region": "EG"}
+    assert log.cursor("c1") == journal.START
+    assert log.campaign("unknown") is None
+
+
+def test_record_advances_the_shard_cursor(log):
+    log.record("c1", 0, "+201000000001", 1, 40, "sent")
+    log.record("c1", 1, "+201000000002", 2, 80, "not_sent")
+    assert log.cursor("c1", 0) == (1, 40)
+    assert log.cursor("c1", 1) == (2, 80)
+
+
+def test_done_count_skips_contacts_waiting_for_a_retry(log):
+    log.record("c1", 0, "+201000000001", 1, 40, "sent")
+    log.record("c1", 0, "+201000000002", 2, 80, "retry")
+    log.record("c1", 0, "+201000000003", 3, 120, "unconfirmed")
+    assert log.done_count("c1") == 2
+    assert log.deferred("c1") == [2]
+
+
+def test_resolve_keeps_the_cursor(log):
+    log.record("c1", 0, "+201000000001", 1, 40, "retry")
+    log.record("c1", 0, "+201000000002", 2, 80, "sent")
+    log.resolve("c1", "+201000000001", 1, "sent")
+    assert log.cursor("c1") == (2, 80)
+    assert log.deferred("c1") == []
+    assert log.done_count("c1") == 2
+
+
+def test_advance_moves_past_skipped_rows(log):
+    log.advance("c1", 0, 5, 200)
+    assert log.cursor("c1") == (5, 200)
+    assert log.done_count("c1") == 0
+
+
+def test_journal_survives_reopening(tmp_path):
+    path = str(tmp_path / "journal.db")
+    log = journal.CampaignJournal(path)
+    log.create("c1", "contacts.csv")
+    log.record("c1", 0, "+201000000001", 1, 40, "sent")
+    log.set_status("c1", "paused")
+    log.close()
+
+    log = journal.CampaignJournal(path)
+    assert log.campaign("c1")["status"] == "paused"
+    assert log.cursor("c1") == (1, 40)
+    assert log.campaigns()[0]["done"] == 1
+    log.close()
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from log_index import LogIndex, log_run, log_type
+
+
+def write(path, text, mode="w"):
+    with open(path, mode) as file:
+        file.write(text)
+
+
+@pytest.fixture
+def logs_dir(tmp_path):
+    write(tmp_path / "run1_sent.txt", "+201000000001\n+201000000002\n")
+    write(tmp_path / "run1_notsent.txt", "+201000000003\n+201000000004\n")
+    write(tmp_path / "run1_notfound.txt", "+201000000004\n")
+    write(tmp_path / "run1_unconfirmed.txt", "+201000000005\n")
+    write(tmp_path / "notes.txt", "not a log\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("filename, kind, run", [
+    ("run1_sent.txt", "sent", "run1"),
+    ("run1_notsent.txt", "not_sent", "run1"),
+    ("run1_notfound.txt", "not_found", "run1"),
+    ("run1_unconfirmed.txt", "unconfirmed", "run1"),
+    ("notes.txt", None, "notes.txt"),
+])
+def test_log_type_and_run(filename, kind, run):
+    assert log_type(filename) == kind
+    assert log_run(filename) == run
+
+
+def test_refresh_counts_every_log_type(logs_dir):
+    index = LogIndex(str(logs_dir))
+    index.refresh()
+    counts = {log["filename"]: log["count"] for log in index.logs()}
+    assert counts == {
+        "run1_sent.txt": 2,
+        "run1_notsent.txt": 2,
+        "run1_notfound.txt": 1,
+        "run1_unconfirmed.txt": 1,
+    }
+    assert index.runs() == [
+        {"run": "run1", "sent": 2, "not_sent": 2, "not_found": 1, "unconfirmed": 1},
+    ]
+
+
+def test_refresh_counts_only_complete_appended_lines(logs_dir):
+    index = LogIndex(str(logs_dir))
+    index.refresh()
+    write(logs_dir / "run1_sent.txt", "+201000000006\n+2010000", mode="a")
+    index.refresh()
+    assert index.page("run1_sent.txt")["count"] == 3
+    write(logs_dir / "run1_sent.txt", "00007\n", mode="a")
+    index.refresh()
+    assert index.page("run1_sent.txt")["count"] == 4
+
+
+def test_refresh_drops_deleted_logs(logs_dir):
+    index = LogIndex(str(logs_dir))
+    index.refresh()
+    os.remove(logs_dir / "run1_unconfirmed.txt")
+    index.refresh()
+    with pytest.raises(KeyError):
+        index.page("run1_unconfirmed.txt")
+
+
+def test_page_follows_the_cursor(logs_dir):
+    write(logs_dir / "run2_sent.txt", "".join(f"+20100000{i:04d}\n" for i in range(5)))
+    index = LogIndex(str(logs_dir))
+    index.refresh()
+    first = index.page("run2_sent.txt", limit=3)
+    assert first["numbers"] == ["+201000000000", "+201000000001", "+201000000002"]
+    second = index.page("run2_sent.txt", cursor=first["next"], limit=3)
+    assert second["numbers"] == ["+201000000003", "+201000000004"]
+    assert second["next"] is None
+
+
+def test_page_filters_by_query(logs_dir):
+    index = LogIndex(str(logs_dir))
+    index.refresh()
+    page = index.page("run1_notsent.txt", query="0004")
+    assert page["numbers"] == ["+201000000004"]
+    assert page["count"] == 2
@@ -0,0 +1,149 @@
+import random
+
+import pytest
+
+import pacing
+
+
+class FakeClock:
+    """
+    Clock that only moves when told to.
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_pacer(clock, **limits):
+    # No random gap unless a test asks for one
+    limits.setdefault("min_gap", (0, 0))
+    return pacing.Pacer(clock=clock, rng=random.Random(0), **limits)
+
+
+def test_bucket_refills_at_its_rate():
+    clock = FakeClock()
+    bucket = pacing.TokenBucket(rate=0.5, capacity=2, clock=clock)
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time() == pytest.approx(2.0)
+    clock.advance(1)
+    assert bucket.wait_time() == pytest.approx(1.0)
+    clock.advance(10)
+    # Never refilled past its capacity
+    assert bucket.wait_time() == 0
+    assert bucket.tokens == pytest.approx(2)
+
+
+def test_bucket_debt_is_paid_off_first():
+    clock = FakeClock()
+    bucket = pacing.TokenBucket(rate=1, capacity=1, clock=clock)
+    bucket.take(3)
+    assert bucket.wait_time() == pytest.approx(3.0)
+
+
+def test_burst_goes_out_back_to_back():
+    clock = FakeClock()
+    pacer = make_pacer(clock, per_minute=6, burst=3)
+    for _ in range(3):
+        assert pacer.delay() == 0
+        pacer.record(pacing.SENT)
+    # Then one message per 10 seconds
+    assert pacer.delay() == pytest.approx(10.0)
+    clock.advance(10)
+    assert pacer.delay() == 0
+
+
+def test_daily_cap_holds_until_tokens_refill():
+    clock = FakeClock()
+    pacer = make_pacer(clock, per_minute=1000, burst=1000, per_hour=1000, per_day=5)
+    for _ in range(5):
+        clock.advance(pacer.delay())
+        pacer.record(pacing.SENT)
+    # One token comes back every 86400 / 5 seconds
+    assert pacer.delay() == pytest.approx(86400 / 5)
+
+
+def test_min_gap_is_drawn_from_the_range():
+    clock = FakeClock()
+    pacer = make_pacer(clock, min_gap=(2, 4), burst=10)
+    pacer.record(pacing.SENT)
+    assert 2 <= pacer.delay() <= 4
+
+
+def test_error_cooldown_doubles_and_resets_on_success():
+    clock = FakeClock()
+    pacer = make_pacer(clock, burst=100, per_minute=1000, cooldown=10, max_backoff=25)
+    pacer.record(pacing.ERROR)
+    assert pacer.delay() == pytest.approx(10)
+    clock.advance(10)
+    pacer.record(pacing.ERROR)
+    assert pacer.delay() == pytest.approx(20)
+    clock.advance(20)
+    pacer.record(pacing.ERROR)
+    # Capped by max_backoff
+    assert pacer.delay() == pytest.approx(25)
+    clock.advance(25)
+    pacer.record(pacing.SENT)
+    clock.advance(1)
+    pacer.record(pacing.ERROR)
+    assert pacer.delay() == pytest.approx(10)
+
+
+def test_throttling_backs_off_and_not_found_does_not():
+    clock = FakeClock()
+    pacer = make_pacer(clock, burst=100, per_minute=1000, throttle_backoff=60)
+    pacer.record(pacing.NOT_FOUND)
+    assert pacer.delay() == 0
+    pacer.record(pacing.THROTTLED)
+    assert pacer.delay() == pytest.approx(60)
+    clock.advance(60)
+    pacer.record(pacing.THROTTLED)
+    assert pacer.delay() == pytest.approx(120)
+
+
+def test_configure_keeps_used_tokens():
+    clock = FakeClock()
+    pacer = make_pacer(clock, per_minute=6, burst=3)
+    for _ in range(3):
+        pacer.record(pacing.SENT)
+    pacer.configure(per_minute=12)
+    assert pacer.delay() == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize("limits", [
+    [1],
+    "fast",
+    {"per_day": 0},
+    {"burst": -1},
+    {"min_gap": (3, 1)},
+    {"unknown": 1},
+])
+def test_check_limits_rejects_bad_options(limits):
+    with pytest.raises(ValueError):
+        pacing.check_limits(limits)
+
+
+def test_check_limits_converts_values():
+    assert pacing.check_limits(None) == {}
+    assert pacing.check_limits({"per_minute": "10", "min_gap": [1, 2], "burst": None}) == {
+        "per_minute": 10.0, "min_gap": (1.0, 2.0),
+    }
+
+
+def test_session_keeps_per_minute_without_rate_limit():
+    clock = FakeClock()
+    pacer = make_pacer(clock)
+    pacer.reset_limits(**pacing.session_limits({"per_minute": 60}, None))
+    assert pacer.limits["per_minute"] == 60
+
+
+def test_session_rate_limit_overrides_per_minute():
+    limits = pacing.session_limits({"per_minute": 60, "burst": 2}, 10)
+    assert limits == {"per_minute": 10, "burst": 2}
+    assert pacing.session_limits(None) == {}
@@ -0,0 +1,36 @@
+import pytest
+
+import phone
+
+
+@pytest.fixture
+def builtin_table(monkeypatch):
+    # The fallback used when the phonenumbers package is not installed
+    monkeypatch.setattr(phone, "phonenumbers", None)
+
+
+@pytest.mark.parametrize("number, expected", [
+    ("01012345678", "+201012345678"),
+    ("+20 101 234 5678", "+201012345678"),
+    ("00201012345678", "+201012345678"),
+    ("201012345678", "+201012345678"),
+    # National numbers that happen to start with the country code
+    ("2012345678", "+202012345678"),
+    ("1012345678", "+201012345678"),
+])
+def test_normalize_without_library(builtin_table, number, expected):
+    assert phone.normalize(number) == expected
+
+
+@pytest.mark.parametrize("number", ["", "   ", "12ab34", "123", "+1234567890123456"])
+def test_normalize_rejects_non_numbers(builtin_table, number):
+    assert phone.normalize(number) is None
+
+
+def test_normalize_uses_the_region(builtin_table):
+    assert phone.normalize("07911123456", "GB") == "+447911123456"
+
+
+def test_check_region_rejects_unknown_regions():
+    with pytest.raises(ValueError):
+        phone.check_region("XX")
@@ -0,0 +1,44 @@
+import pytest
+
+from templates import Template, TemplateError, compile_template
+
+
+def test_render_fills_columns():
+    template = Template("Hi {name}, order {Order ID} has shipped")
+    assert template.variables == ["name", "Order ID"]
+    assert template.render({"name": "Sara", "Order ID": "42"}) == "Hi Sara, order 42 has shipped"
+
+
+def test_bind_matches_columns_without_case():
+    template = compile_template("Hi {NAME}", header=["phone", "Name"])
+    assert template.render({"Name": "Sara"}) == "Hi Sara"
+
+
+def test_bind_lists_missing_columns():
+    with pytest.raises(TemplateError, match="city"):
+        compile_template("Hi {name} from {city}", header=["phone", "name"])
+
+
+def test_double_braces_are_literal():
+    assert Template("{{ {name} }}").render({"name": "Sara"}) == "{ Sara }"
+
+
+def test_text_format_spec_applies():
+    assert Template("[{name:>6}]").render({"name": "Sara"}) == "[  Sara]"
+
+
+@pytest.mark.parametrize("text", ["{amount:.2f}", "{amount:d}", "{0}", "{}", "{name", "{a:{b}}"])
+def test_invalid_templates_are_rejected(text):
+    with pytest.raises(TemplateError):
+        Template(text)
+
+
+def test_missing_lists_empty_cells():
+    template = compile_template("Hi {name}, {city}", header=["phone", "name", "city"])
+    assert template.missing({"name": "Sara", "city": ""}) == ["city"]
+    assert template.missing({"name": "Sara", "city": "Cairo"}) == []
+
+
+def test_empty_template_is_none():
+    assert compile_template("") is None
+    assert compile_template(None) is None
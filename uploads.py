@@ -0,0 +1,313 @@
+"""
+WhatsApp Automator - Contact file store
+Uploaded contact files are streamed to disk in fixed-size chunks and hashed
+while they are written, so a large list takes constant memory. Each file is
+stored once under data/.blobs/ by its SHA-256 and the uploaded name in data/
+is a hard link to it (a copy where links aren't supported), so the rest of
+the app keeps reading data/<filename>. The index of a blob is kept next to it
+and handed to every new alias, so uploading known content again, under any
+name, skips parsing it.
+
+Large files can also be sent in chunks over several requests and resumed
+after a dropped connection: create an upload, append chunks at the offset the
+server reports, and the file is stored once the declared size is reached.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import contacts
+
+# Bytes read and written at once
+CHUNK_SIZE = 1024 * 1024
+# Unfinished chunked uploads are dropped after this many seconds without a chunk
+UPLOAD_TTL = 24 * 3600
+EXTENSIONS = (".csv", ".xlsx")
+
+
+class UploadError(Exception):
+    """
+    Raised for a request the store cannot take; `status` is the HTTP status to answer with.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def check_filename(filename):
+    """
+    Returns the file name without any directory part.
+    :raises UploadError: if it is empty or not a CSV or XLSX file.
+    """
+    filename = os.path.basename(filename or "")
+    if not filename:
+        raise UploadError("No file selected")
+    if not filename.lower().endswith(EXTENSIONS):
+        raise UploadError("Invalid file type. Only CSV and XLSX are allowed")
+    return filename
+
+
+class UploadStore:
+    """
+    Content-addressed contact files under `root`, and the chunked uploads in progress.
+    Thread-safe; one instance serves all requests.
+    """
+
+    def __init__(self, root="data"):
+        self.root = root
+        self.blob_dir = os.path.join(root, ".blobs")
+        self.part_dir = os.path.join(root, ".uploads")
+        self._lock = threading.Lock()
+        # upload id -> (hash of the bytes so far, number of bytes hashed)
+        self._hashers = {}
+        # upload ids a request is currently appending to
+        self._busy = set()
+
+    def blob_path(self, digest, filename):
+        return os.path.join(self.blob_dir, digest + os.path.splitext(filename)[1].lower())
+
+    def known(self, digest, filename):
+        """
+        True if content with this SHA-256 was stored before under the same extension.
+        """
+        return os.path.isfile(self.blob_path(digest, filename))
+
+    # ── Whole files ──
+
+    def save(self, stream, filename):
+        """
+        Stores a file read from `stream` (a multipart upload) under `filename`.
+        :return: (path in data/, SHA-256, True if the content was known).
+        """
+        filename = check_filename(filename)
+        os.makedirs(self.part_dir, exist_ok=True)
+        part = os.path.join(self.part_dir, uuid.uuid4().hex + ".part")
+        hasher = hashlib.sha256()
+        try:
+            with open(part, "wb") as file:
+                _copy(stream, file, hasher)
+            return self._commit(part, hasher.hexdigest(), filename)
+        finally:
+            _remove(part)
+
+    # ── Chunked uploads ──
+
+    def create(self, filename, size, sha256=None, options=None):
+        """
+        Starts a chunked upload of `size` bytes. If the client sends the SHA-256
+        of the file and that content is known, no bytes need to be sent at all.
+        :param options: kept with the upload and returned with its state, for
+            whatever has to be done with the file once it is stored.
+        :return: the upload state, see status(); "path" is set once it is stored.
+        """
+        filename = check_filename(filename)
+        if not isinstance(size, int) or size < 0:
+            raise UploadError("size must be the file size in bytes")
+        self.expire()
+        if sha256 and self.known(sha256.lower(), filename):
+            path, digest, _ = self._alias(sha256.lower(), filename)
+            return {"upload_id": None, "filename": filename, "size": size, "offset": size,
+                    "options": options or {}, "sha256": digest, "path": path, "known": True}
+
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self.part_dir, exist_ok=True)
+        with open(self._part(upload_id), "wb"):
+            pass
+        with open(self._meta(upload_id), "w", encoding="utf-8") as file:
+            json.dump({"filename": filename, "size": size, "options": options or {}}, file)
+        with self._lock:
+            self._hashers[upload_id] = (hashlib.sha256(), 0)
+        return self.status(upload_id)
+
+    def status(self, upload_id):
+        """
+        {"upload_id", "filename", "size", "offset", "options"}: the next chunk starts at offset.
+        :raises UploadError: 404 if the upload is unknown or expired.
+        """
+        meta = self._read_meta(upload_id)
+        return {"upload_id": upload_id, "filename": meta["filename"], "size": meta["size"],
+                "offset": os.path.getsize(self._part(upload_id)), "options": meta.get("options", {})}
+
+    def append(self, upload_id, offset, stream):
+        """
+        Writes the chunk read from `stream` at `offset`, which must be the
+        current end of the upload. Stores the file once the declared size is
+        reached, returning the upload state with "path", "sha256" and "known".
+        :raises UploadError: 409 on a wrong offset or a concurrent append to
+            the same upload, 400 if the chunk runs past the declared size.
+        """
+        meta = self._read_meta(upload_id)
+        with self._lock:
+            if upload_id in self._busy:
+                raise UploadError("Another chunk of this upload is being written", 409)
+            self._busy.add(upload_id)
+        try:
+            part = self._part(upload_id)
+            current = os.path.getsize(part)
+            if offset != current:
+                raise UploadError(f"Expected offset {current}", 409)
+            hasher = self._hasher(upload_id, part, current)
+            with open(part, "ab") as file:
+                written = _copy(stream, file, hasher, limit=meta["size"] - current)
+                if written < 0:
+                    # Past the declared size: drop the chunk, the client resends the right one
+                    file.truncate(current)
+            with self._lock:
+                if written < 0:
+                    self._hashers.pop(upload_id, None)
+                else:
+                    self._hashers[upload_id] = (hasher, current + written)
+            if written < 0:
+                raise UploadError(f"Chunk runs past the declared size of {meta['size']} bytes")
+
+            state = self.status(upload_id)
+            if state["offset"] == meta["size"]:
+                digest = hasher.hexdigest()
+                state["path"], state["sha256"], state["known"] = self._commit(part, digest, meta["filename"])
+                self.abort(upload_id)
+            return state
+        finally:
+            with self._lock:
+                self._busy.discard(upload_id)
+
+    def abort(self, upload_id):
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+        _remove(self._part(upload_id))
+        _remove(self._meta(upload_id))
+
+    def expire(self):
+        """
+        Drops chunked uploads that have not received a chunk for UPLOAD_TTL seconds.
+        """
+        try:
+            names = os.listdir(self.part_dir)
+        except OSError:
+            return
+        cutoff = time.time() - UPLOAD_TTL
+        for name in names:
+            upload_id, extension = os.path.splitext(name)
+            if extension != ".json":
+                continue
+            try:
+                # Each chunk touches the part file, not the meta file
+                if os.path.getmtime(os.path.join(self.part_dir, upload_id + ".part")) < cutoff:
+                    self.abort(upload_id)
+            except (OSError, UploadError):
+                pass
+
+    # ── Storage ──
+
+    def _commit(self, part, digest, filename):
+        """
+        Moves a finished upload into the blob store, unless its content is
+        already there, and points data/<filename> at it.
+        """
+        blob = self.blob_path(digest, filename)
+        if not os.path.isfile(blob):
+            os.makedirs(self.blob_dir, exist_ok=True)
+            os.replace(part, blob)
+            return self._alias(digest, filename)[0], digest, False
+        return self._alias(digest, filename)[0], digest, True
+
+    def _alias(self, digest, filename):
+        """
+        Links data/<filename> to the blob, replacing whatever had that name,
+        and gives it the blob's index so it isn't parsed again.
+        """
+        blob = self.blob_path(digest, filename)
+        path = os.path.join(self.root, filename)
+        if not (os.path.exists(path) and os.path.samefile(path, blob)):
+            temp = path + ".linking"
+            _remove(temp)
+            try:
+                os.link(blob, temp)
+            except OSError:
+                # The copy keeps the blob's mtime, so the blob's index still matches it
+                shutil.copy2(blob, temp)
+            os.replace(temp, path)
+        blob_index = contacts.index_path(blob)
+        if os.path.isfile(blob_index):
+            shutil.copyfile(blob_index, contacts.index_path(path))
+        return path, digest, True
+
+    def remember_index(self, path, digest):
+        """
+        Keeps the index just built for data/<filename> with its blob, for the next alias.
+        """
+        index = contacts.index_path(path)
+        if os.path.isfile(index):
+            shutil.copyfile(index, contacts.index_path(self.blob_path(digest, path)))
+
+    def forget(self, path, digest):
+        """
+        Removes a stored file that turned out not to be a readable contact file.
+        """
+        for name in (path, contacts.index_path(path)):
+            _remove(name)
+        blob = self.blob_path(digest, path)
+        _remove(blob)
+        _remove(contacts.index_path(blob))
+
+    def _hasher(self, upload_id, part, offset):
+        with self._lock:
+            hasher, hashed = self._hashers.get(upload_id, (None, -1))
+        if hashed == offset:
+            return hasher
+        # The server restarted since the last chunk: hash what is on disk again
+        hasher = hashlib.sha256()
+        with open(part, "rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher
+
+    def _part(self, upload_id):
+        return os.path.join(self.part_dir, _check_id(upload_id) + ".part")
+
+    def _meta(self, upload_id):
+        return os.path.join(self.part_dir, _check_id(upload_id) + ".json")
+
+    def _read_meta(self, upload_id):
+        try:
+            with open(self._meta(upload_id), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            os.stat(self._part(upload_id))
+        except (OSError, ValueError):
+            raise UploadError(f"Upload '{upload_id}' not found", 404)
+        return meta
+
+
+def _check_id(upload_id):
+    if not (isinstance(upload_id, str) and len(upload_id) == 32 and all(c in "0123456789abcdef" for c in upload_id)):
+        raise UploadError(f"Upload '{upload_id}' not found", 404)
+    return upload_id
+
+
+def _copy(stream, file, hasher, limit=None):
+    """
+    Copies `stream` to `file` chunk by chunk, hashing it on the way.
+    Returns the number of bytes written, or -1 if the stream had more than `limit`.
+    """
+    written = 0
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return written
+        if limit is not None and written + len(chunk) > limit:
+            return -1
+        hasher.update(chunk)
+        file.write(chunk)
+        written += len(chunk)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,204 @@
+"""
+Condition-based waits and pacing jitter for the WhatsApp bot.
+Waits poll the page for the element or state the next step needs instead of
+sleeping for a fixed time, and record how long every step took.
+Every wait and sleep also checks the campaign's RunControl, so a pause or a
+cancel takes effect within a fraction of a second, even in a long wait.
+"""
+
+import random
+import threading
+import time
+
+from selenium.common import NoSuchElementException, TimeoutException
+
+# Seconds between two checks of a wait condition
+POLL_INTERVAL = 0.05
+# Longest a sleep goes without checking for a pause or a cancel
+CONTROL_TICK = 0.1
+
+
+class Cancelled(Exception):
+    """
+    Raised from a wait or sleep once the campaign has been cancelled.
+    """
+
+
+class RunControl:
+    """
+    Pause, resume and cancel of a running campaign, shared by all its bots.
+    Cancelling sets `stop_event`, so whatever already watches that event
+    stops as well. Waits hold while paused and the paused time doesn't count
+    against their timeouts, so a pause never turns into a timeout.
+    """
+
+    def __init__(self, stop_event=None):
+        self.stop_event = stop_event or threading.Event()
+        # Set while not paused
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self):
+        return self.stop_event.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self.stop_event.set()
+        # Wakes the waits held by a pause
+        self._running.set()
+
+    def reset(self):
+        self.stop_event.clear()
+        self._running.set()
+
+    def checkpoint(self):
+        """
+        Holds while paused.
+        :return: the seconds spent paused.
+        :raises Cancelled: if the campaign is or gets cancelled.
+        """
+        if self.stop_event.is_set():
+            raise Cancelled()
+        if self._running.is_set():
+            return 0.0
+        started = time.monotonic()
+        self._running.wait()
+        if self.stop_event.is_set():
+            raise Cancelled()
+        return time.monotonic() - started
+
+    def sleep(self, seconds):
+        """
+        Sleeps `seconds`, not counting the time spent paused.
+        :return: the seconds spent paused.
+        :raises Cancelled: as soon as the campaign is cancelled.
+        """
+        deadline = time.monotonic() + seconds
+        paused = 0.0
+        while True:
+            held = self.checkpoint()
+            deadline += held
+            paused += held
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return paused
+            if self.stop_event.wait(min(remaining, CONTROL_TICK)):
+                raise Cancelled()
+
+
+class StepStats:
+    """
+    Collects per-step wait timings: count, average, max and timeouts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._steps = {}
+
+    def record(self, step, elapsed, timed_out=False):
+        with self._lock:
+            entry = self._steps.setdefault(step, [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+            entry[3] += timed_out
+
+    def snapshot(self):
+        """
+        Returns {step: {"count", "avg_ms", "max_ms", "timeouts"}}.
+        """
+        with self._lock:
+            return {
+                step: {
+                    "count": count,
+                    "avg_ms": round(total / count * 1000, 1),
+                    "max_ms": round(longest * 1000, 1),
+                    "timeouts": timeouts,
+                }
+                for step, (count, total, longest, timeouts) in self._steps.items()
+            }
+
+
+class Waiter:
+    """
+    Polls a driver for an expected condition at a tight interval and records
+    the time each named step had to wait.
+    """
+
+    def __init__(self, driver, poll_interval=POLL_INTERVAL, stats=None, control=None):
+        self.driver = driver
+        self.poll_interval = poll_interval
+        self.stats = stats or StepStats()
+        # Checked at every poll, see RunControl
+        self.control = control or RunControl()
+
+    def until(self, step, condition, timeout):
+        """
+        Waits until `condition` returns a truthy value and returns it, polling
+        like WebDriverWait. Time spent paused is not counted.
+        :raises TimeoutException: if the condition is not met within `timeout` seconds.
+        :raises Cancelled: if the campaign is cancelled meanwhile.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        paused = self.control.checkpoint()
+        deadline += paused
+        while True:
+            try:
+                result = condition(self.driver)
+            except NoSuchElementException:
+                result = None
+            if result:
+                self.stats.record(step, time.monotonic() - started - paused)
+                return result
+            if time.monotonic() >= deadline:
+                self.stats.record(step, time.monotonic() - started - paused, timed_out=True)
+                raise TimeoutException(f"{step} not met within {timeout} s")
+            held = self.control.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+            deadline += held
+            paused += held
+
+
+class JitterPolicy:
+    """
+    Human-like random pauses at named points of the send flow, kept apart from
+    the waits so they can be tuned or turned off without touching them.
+    """
+
+    # Pauses of the original bot, in seconds; the pause after a send is
+    # part of the pacing now, see pacing.py
+    HUMAN = {
+        "after_open": (0.4, 0.5),
+    }
+
+    def __init__(self, ranges=None):
+        self.ranges = dict(self.HUMAN if ranges is None else ranges)
+
+    @classmethod
+    def named(cls, name):
+        """
+        Returns the "human" (default) or "none" policy.
+        """
+        if name == "none":
+            return cls({})
+        if name in (None, "human"):
+            return cls()
+        raise ValueError(f"Unknown jitter policy '{name}', expected 'human' or 'none'")
+
+    def pause(self, point, sleep=time.sleep):
+        """
+        :param sleep: sleeps the given seconds, e.g. RunControl.sleep to stay interruptible.
+        """
+        low, high = self.ranges.get(point, (0, 0))
+        if high > 0:
+            sleep(random.uniform(low, high))
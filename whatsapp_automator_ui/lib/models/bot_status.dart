@@ -1,4 +1,4 @@
-enum BotRunStatus { idle, running, completed, error }
+enum BotRunStatus { idle, running, paused, completed, error }
 
 class BotStatus {
   final BotRunStatus status;
@@ -25,6 +25,9 @@ class BotStatus {
       case 'running':
         runStatus = BotRunStatus.running;
         break;
+      case 'paused':
+        runStatus = BotRunStatus.paused;
+        break;
       case 'completed':
         runStatus = BotRunStatus.completed;
         break;
@@ -48,6 +51,10 @@ class BotStatus {
   double get progressFraction => total > 0 ? progress / total : 0.0;
 
   bool get isRunning => status == BotRunStatus.running;
+  bool get isPaused => status == BotRunStatus.paused;
+
+  /// A campaign is in progress, sending or paused.
+  bool get isActive => isRunning || isPaused;
   bool get isIdle => status == BotRunStatus.idle;
   bool get isDone => status == BotRunStatus.completed;
   bool get hasError => status == BotRunStatus.error;
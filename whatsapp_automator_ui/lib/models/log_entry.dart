@@ -1,14 +1,12 @@
 class LogEntry {
   final String filename;
-  final String type; // 'sent' | 'not_sent'
+  final String type; // 'sent' | 'not_sent' | 'not_found' | 'unconfirmed'
   final int count;
-  final List<String> numbers;
 
   const LogEntry({
     required this.filename,
     required this.type,
     required this.count,
-    required this.numbers,
   });
 
   factory LogEntry.fromJson(Map<String, dynamic> json) {
@@ -16,18 +14,25 @@ class LogEntry {
       filename: json['filename']?.toString() ?? '',
       type: json['type']?.toString() ?? 'sent',
       count: (json['count'] as num?)?.toInt() ?? 0,
-      numbers: List<String>.from(json['numbers'] as List? ?? []),
     );
   }
 
   bool get isSent => type == 'sent';
 
+  /// Not on WhatsApp; these numbers are in the run's not sent log too.
+  bool get isNotFound => type == 'not_found';
+
+  /// The send broke after it may have gone out, so it was not retried.
+  bool get isUnconfirmed => type == 'unconfirmed';
+
   /// Extract a human-readable label from the filename.
   /// e.g. "12-02-2025_143000_sent.txt" → "12-02-2025 14:30:00"
   String get label {
     final withoutExt = filename
-        .replaceAll('_sent.txt', '')
-        .replaceAll('_notsent.txt', '');
+        .replaceAll('_notsent.txt', '')
+        .replaceAll('_notfound.txt', '')
+        .replaceAll('_unconfirmed.txt', '')
+        .replaceAll('_sent.txt', '');
     final parts = withoutExt.split('_');
     if (parts.length >= 2) {
       final timePart = parts[1];
@@ -39,3 +44,20 @@ class LogEntry {
     return withoutExt;
   }
 }
+
+/// One page of the numbers of a log, see `/api/logs/<filename>`.
+class LogPage {
+  final List<String> numbers;
+
+  /// Cursor of the next page, null after the last one.
+  final int? next;
+
+  const LogPage({required this.numbers, this.next});
+
+  factory LogPage.fromJson(Map<String, dynamic> json) {
+    return LogPage(
+      numbers: List<String>.from(json['numbers'] as List? ?? []),
+      next: (json['next'] as num?)?.toInt(),
+    );
+  }
+}
@@ -9,6 +9,7 @@ import '../services/api_service.dart';
 class BotProvider extends ChangeNotifier {
   ApiService _api;
   Timer? _pollTimer;
+  StreamSubscription<Map<String, dynamic>>? _events;
 
   // ─── State ───────────────────────────────────────────────────────────────
   bool _isConnected = false;
@@ -19,6 +20,11 @@ class BotProvider extends ChangeNotifier {
   List<String> _availableFiles = [];
   String? _selectedFile;
   bool _withMedia = false;
+  List<String> _mediaFiles = [];
+  // null: each row's media column names its file
+  String? _selectedMedia;
+  bool _isUploadingMedia = false;
+  bool _openByUrl = false;
   bool _isLoadingFiles = false;
   bool _isStarting = false;
   bool _isStopping = false;
@@ -38,6 +44,10 @@ class BotProvider extends ChangeNotifier {
   List<String> get availableFiles => _availableFiles;
   String? get selectedFile => _selectedFile;
   bool get withMedia => _withMedia;
+  List<String> get mediaFiles => _mediaFiles;
+  String? get selectedMedia => _selectedMedia;
+  bool get isUploadingMedia => _isUploadingMedia;
+  bool get openByUrl => _openByUrl;
   bool get isLoadingFiles => _isLoadingFiles;
   bool get isStarting => _isStarting;
   bool get isStopping => _isStopping;
@@ -116,14 +126,57 @@ class BotProvider extends ChangeNotifier {
   void setWithMedia(bool value) {
     _withMedia = value;
     notifyListeners();
+    if (value) loadMedia();
+  }
+
+  Future<void> loadMedia() async {
+    try {
+      _mediaFiles = await _api.getMedia();
+      if (!_mediaFiles.contains(_selectedMedia)) _selectedMedia = null;
+    } catch (e) {
+      _mediaFiles = [];
+      _setError('Failed to load media files: $e');
+    } finally {
+      notifyListeners();
+    }
+  }
+
+  void selectMedia(String? name) {
+    _selectedMedia = name;
+    notifyListeners();
+  }
+
+  Future<bool> uploadMedia(String filename, Uint8List bytes) async {
+    _isUploadingMedia = true;
+    notifyListeners();
+    try {
+      final uploaded = await _api.uploadMedia(filename, bytes);
+      await loadMedia();
+      _selectedMedia = uploaded;
+      _setSuccess('Media "$uploaded" uploaded successfully!');
+      return true;
+    } catch (e) {
+      _setError('Media upload failed: $e');
+      return false;
+    } finally {
+      _isUploadingMedia = false;
+      notifyListeners();
+    }
+  }
+
+  void setOpenByUrl(bool value) {
+    _openByUrl = value;
+    notifyListeners();
   }
 
   Future<bool> uploadFile(String filename, Uint8List bytes) async {
     try {
-      final uploaded = await _api.uploadFile(filename, bytes);
+      final summary = await _api.uploadFile(filename, bytes);
+      final uploaded = summary['filename'] as String;
       await loadFiles();
       _selectedFile = uploaded;
-      _setSuccess('File "$uploaded" uploaded successfully!');
+      _setSuccess('File "$uploaded" uploaded successfully!'
+          '${_skippedNote(summary)}');
       notifyListeners();
       return true;
     } catch (e) {
@@ -143,9 +196,15 @@ class BotProvider extends ChangeNotifier {
     _errorMessage = null;
     notifyListeners();
     try {
-      await _api.startBot(_selectedFile!, withMedia: _withMedia);
+      final summary = await _api.startBot(
+        _selectedFile!,
+        withMedia: _withMedia,
+        media: _selectedMedia,
+        openMode: _openByUrl ? 'url' : 'search',
+      );
       _startPolling();
-      _setSuccess('Bot started! Check WhatsApp Web to scan QR code.');
+      _setSuccess('Bot started! Check WhatsApp Web to scan QR code.'
+          '${_skippedNote(summary)}');
       return true;
     } catch (e) {
       _setError('Failed to start bot: $e');
@@ -156,6 +215,36 @@ class BotProvider extends ChangeNotifier {
     }
   }
 
+  /// " N of M contacts will be skipped." for invalid, repeated and known dead numbers.
+  String _skippedNote(Map<String, dynamic> summary) {
+    final rows = summary['rows'] as int? ?? 0;
+    final sendable = summary['sendable'] as int? ?? rows;
+    if (rows == sendable) return '';
+    return ' ${rows - sendable} of $rows contacts will be skipped.';
+  }
+
+  Future<void> pauseBot() async {
+    try {
+      await _api.pauseBot();
+      _setSuccess('Bot paused.');
+    } catch (e) {
+      _setError('Failed to pause bot: $e');
+    }
+    notifyListeners();
+  }
+
+  Future<void> resumeBot() async {
+    try {
+      await _api.resumeBot();
+      _setSuccess('Bot resumed.');
+      // The stream may have ended while paused
+      if (_events == null && _pollTimer == null) _startPolling();
+    } catch (e) {
+      _setError('Failed to resume bot: $e');
+    }
+    notifyListeners();
+  }
+
   Future<void> stopBot() async {
     _isStopping = true;
     notifyListeners();
@@ -199,9 +288,30 @@ class BotProvider extends ChangeNotifier {
     }
   }
 
+  Future<LogPage> loadLogPage(String filename,
+      {int cursor = 0, String query = ''}) async {
+    final raw = await _api.getLogPage(filename, cursor: cursor, query: query);
+    return LogPage.fromJson(raw);
+  }
+
   // ─── Polling ─────────────────────────────────────────────────────────────
 
+  /// Follows the server's event stream, and falls back to polling
+  /// `/api/status` every 2 seconds if the stream is unavailable.
   void _startPolling() {
+    _stopPolling();
+    _events = _api.statusEvents().listen(
+      _applyStatus,
+      onError: (_) => _startTimer(),
+      onDone: () {
+        if (_botStatus.isActive) _startTimer();
+      },
+      cancelOnError: true,
+    );
+  }
+
+  void _startTimer() {
+    _events = null;
     _pollTimer?.cancel();
     _pollTimer = Timer.periodic(
       const Duration(seconds: 2),
@@ -210,17 +320,23 @@ class BotProvider extends ChangeNotifier {
   }
 
   void _stopPolling() {
+    _events?.cancel();
+    _events = null;
     _pollTimer?.cancel();
     _pollTimer = null;
   }
 
+  void _applyStatus(Map<String, dynamic> data) {
+    _botStatus = BotStatus.fromJson(data);
+    _isConnected = true;
+    // A paused campaign goes on later, so keep following it
+    if (!_botStatus.isActive) _stopPolling();
+    notifyListeners();
+  }
+
   Future<void> _fetchStatus() async {
     try {
-      final data = await _api.getStatus();
-      _botStatus = BotStatus.fromJson(data);
-      _isConnected = true;
-      if (!_botStatus.isRunning) _stopPolling();
-      notifyListeners();
+      _applyStatus(await _api.getStatus());
     } catch (_) {
       _isConnected = false;
       _stopPolling();
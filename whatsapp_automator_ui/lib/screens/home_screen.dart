@@ -218,7 +218,7 @@ class _DashboardPage extends StatelessWidget {
             _QuickActionCard(
               icon: Icons.attach_file_rounded,
               title: 'Send with Media',
-              subtitle: 'Attach copied media (CTRL+C) to each message',
+              subtitle: 'Attach a photo, video or document to each message',
               color: cs.secondaryContainer,
               iconColor: cs.onSecondaryContainer,
               onTap: () => _navigateTo(context, 1, withMedia: true),
@@ -319,6 +319,12 @@ class _StatusBanner extends StatelessWidget {
         icon = Icons.sync_rounded;
         title = 'Bot is running…';
         break;
+      case BotRunStatus.paused:
+        bg = Colors.amber.shade50;
+        fg = Colors.amber.shade900;
+        icon = Icons.pause_circle_rounded;
+        title = 'Bot is paused';
+        break;
       case BotRunStatus.completed:
         bg = Colors.green.shade50;
         fg = Colors.green.shade800;
@@ -359,7 +365,7 @@ class _StatusBanner extends StatelessWidget {
               Text(status.message,
                   style: TextStyle(color: fg.withOpacity(0.8))),
             ],
-            if (status.isRunning && status.total > 0) ...[
+            if (status.isActive && status.total > 0) ...[
               const SizedBox(height: 10),
               ClipRRect(
                 borderRadius: BorderRadius.circular(4),
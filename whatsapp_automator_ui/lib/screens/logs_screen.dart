@@ -99,38 +99,106 @@ class _EmptyLogsView extends StatelessWidget {
 
 // ─── Log entry card ───────────────────────────────────────────────────────────
 
-class _LogEntryCard extends StatelessWidget {
+class _LogEntryCard extends StatefulWidget {
   final LogEntry entry;
   final int index;
   const _LogEntryCard({required this.entry, required this.index});
 
+  @override
+  State<_LogEntryCard> createState() => _LogEntryCardState();
+}
+
+/// Numbers are fetched a page at a time once the card is expanded.
+class _LogEntryCardState extends State<_LogEntryCard> {
+  final List<String> _numbers = [];
+  final TextEditingController _search = TextEditingController();
+  int? _next = 0;
+  bool _loading = false;
+  String? _error;
+
+  Future<void> _loadMore({bool reset = false}) async {
+    if (_loading) return;
+    if (reset) {
+      _numbers.clear();
+      _next = 0;
+    }
+    if (_next == null) return;
+    setState(() {
+      _loading = true;
+      _error = null;
+    });
+    try {
+      final page = await context.read<BotProvider>().loadLogPage(
+            widget.entry.filename,
+            cursor: _next!,
+            query: _search.text.trim(),
+          );
+      _numbers.addAll(page.numbers);
+      _next = page.next;
+    } catch (e) {
+      _error = 'Failed to load numbers: $e';
+    } finally {
+      if (mounted) setState(() => _loading = false);
+    }
+  }
+
+  @override
+  void dispose() {
+    _search.dispose();
+    super.dispose();
+  }
+
   @override
   Widget build(BuildContext context) {
+    final entry = widget.entry;
     final cs = Theme.of(context).colorScheme;
     final isSent = entry.isSent;
 
-    final cardColor = isSent ? Colors.green.shade50 : cs.errorContainer;
-    final badgeColor = isSent ? Colors.green.shade600 : cs.error;
-    final iconData =
-        isSent ? Icons.check_circle_rounded : Icons.cancel_rounded;
+    Color cardColor = cs.errorContainer;
+    Color darkColor = cs.errorContainer;
+    Color badgeColor = cs.error;
+    Color titleColor = cs.error;
+    IconData iconData = Icons.cancel_rounded;
+    String title = 'Not Sent / Failed';
+    if (isSent) {
+      cardColor = Colors.green.shade50;
+      darkColor = Colors.green.shade900.withOpacity(0.3);
+      badgeColor = Colors.green.shade600;
+      titleColor = Colors.green.shade800;
+      iconData = Icons.check_circle_rounded;
+      title = 'Sent Successfully';
+    } else if (entry.isUnconfirmed) {
+      cardColor = Colors.amber.shade50;
+      darkColor = Colors.amber.shade900.withOpacity(0.3);
+      badgeColor = Colors.amber.shade800;
+      titleColor = Colors.amber.shade900;
+      iconData = Icons.help_rounded;
+      title = 'Unconfirmed (may have been sent)';
+    } else if (entry.isNotFound) {
+      cardColor = cs.surfaceContainerHighest;
+      darkColor = cs.surfaceContainerHighest;
+      badgeColor = cs.onSurfaceVariant;
+      titleColor = cs.onSurfaceVariant;
+      iconData = Icons.person_off_rounded;
+      title = 'Not on WhatsApp';
+    }
 
     return Card(
       color: Theme.of(context).brightness == Brightness.dark
-          ? (isSent
-              ? Colors.green.shade900.withOpacity(0.3)
-              : cs.errorContainer)
+          ? darkColor
           : cardColor,
       margin: const EdgeInsets.only(bottom: 10),
       child: ExpansionTile(
+        onExpansionChanged: (expanded) {
+          if (expanded && _numbers.isEmpty) _loadMore(reset: true);
+        },
         leading: CircleAvatar(
           backgroundColor: badgeColor.withOpacity(0.15),
           child: Icon(iconData, color: badgeColor, size: 22),
         ),
         title: Text(
-          isSent ? 'Sent Successfully' : 'Not Sent / Failed',
-          style: TextStyle(
-              fontWeight: FontWeight.bold,
-              color: isSent ? Colors.green.shade800 : cs.error),
+          title,
+          style: TextStyle(fontWeight: FontWeight.bold, color: titleColor),
         ),
         subtitle: Text(
           '${entry.count} number${entry.count != 1 ? 's' : ''}  •  ${entry.label}',
@@ -158,53 +226,82 @@ class _LogEntryCard extends StatelessWidget {
           ],
         ),
         children: [
-          if (entry.numbers.isEmpty)
-            Padding(
-              padding: const EdgeInsets.all(16),
-              child: Text('No numbers recorded.',
-                  style:
-                      TextStyle(color: cs.onSurface.withOpacity(0.5))),
-            )
-          else
-            Padding(
-              padding:
-                  const EdgeInsets.symmetric(horizontal: 12, vertical: 8),
-              child: Column(
-                crossAxisAlignment: CrossAxisAlignment.stretch,
-                children: [
-                  // Copy-all button
-                  Align(
-                    alignment: Alignment.centerRight,
-                    child: TextButton.icon(
+          Padding(
+            padding:
+                const EdgeInsets.symmetric(horizontal: 12, vertical: 8),
+            child: Column(
+              crossAxisAlignment: CrossAxisAlignment.stretch,
+              children: [
+                Row(
+                  children: [
+                    // Search is done by the server, over the whole log
+                    Expanded(
+                      child: TextField(
+                        controller: _search,
+                        decoration: const InputDecoration(
+                          isDense: true,
+                          prefixIcon: Icon(Icons.search, size: 18),
+                          hintText: 'Search numbers',
+                        ),
+                        onSubmitted: (_) => _loadMore(reset: true),
+                      ),
+                    ),
+                    // Copy-all button
+                    TextButton.icon(
                       icon: const Icon(Icons.copy, size: 16),
-                      label: const Text('Copy all', style: TextStyle(fontSize: 12)),
-                      onPressed: () {
-                        final text = entry.numbers.join('\n');
-                        Clipboard.setData(ClipboardData(text: text));
-                        ScaffoldMessenger.of(context).showSnackBar(
-                          const SnackBar(
-                            content: Text('Numbers copied to clipboard'),
-                            duration: Duration(seconds: 2),
-                          ),
-                        );
-                      },
+                      label: const Text('Copy shown', style: TextStyle(fontSize: 12)),
+                      onPressed: _numbers.isEmpty
+                          ? null
+                          : () {
+                              final text = _numbers.join('\n');
+                              Clipboard.setData(ClipboardData(text: text));
+                              ScaffoldMessenger.of(context).showSnackBar(
+                                const SnackBar(
+                                  content: Text('Numbers copied to clipboard'),
+                                  duration: Duration(seconds: 2),
+                                ),
+                              );
+                            },
                     ),
+                  ],
+                ),
+                if (_error != null)
+                  Padding(
+                    padding: const EdgeInsets.all(16),
+                    child: Text(_error!, style: TextStyle(color: cs.error)),
+                  )
+                else if (_numbers.isEmpty && !_loading)
+                  Padding(
+                    padding: const EdgeInsets.all(16),
+                    child: Text('No numbers recorded.',
+                        style:
+                            TextStyle(color: cs.onSurface.withOpacity(0.5))),
                   ),
-                  // Numbers list
-                  ...entry.numbers.asMap().entries.map(
-                        (e) => _NumberRow(
-                          index: e.key,
-                          number: e.value,
-                          isSent: isSent,
-                        ).animate().fadeIn(delay: (e.key * 30).ms),
+                // Numbers list
+                ..._numbers.asMap().entries.map(
+                      (e) => _NumberRow(
+                        index: e.key,
+                        number: e.value,
+                        isSent: isSent,
                       ),
-                  const SizedBox(height: 8),
-                ],
-              ),
+                    ),
+                if (_loading)
+                  const Padding(
+                    padding: EdgeInsets.all(12),
+                    child: Center(child: CircularProgressIndicator()),
+                  )
+                else if (_next != null)
+                  TextButton(
+                    onPressed: _loadMore,
+                    child: const Text('Load more'),
+                  ),
+                const SizedBox(height: 8),
+              ],
             ),
+          ),
         ],
       ),
-    ).animate().fadeIn(delay: (index * 60).ms).slideY(begin: 0.1);
+    ).animate().fadeIn(delay: (widget.index * 60).ms).slideY(begin: 0.1);
   }
 }
 
@@ -18,7 +18,10 @@ class _SendScreenState extends State<SendScreen> {
     super.initState();
     WidgetsBinding.instance.addPostFrameCallback((_) {
       final prov = context.read<BotProvider>();
-      if (prov.isConnected) prov.loadFiles();
+      if (prov.isConnected) {
+        prov.loadFiles();
+        if (prov.withMedia) prov.loadMedia();
+      }
     });
   }
 
@@ -60,7 +63,7 @@ class _SendScreenState extends State<SendScreen> {
                   ).animate().fadeIn(),
 
                 // ── Live progress card (shown while running) ─────────────
-                if (prov.botStatus.isRunning || prov.botStatus.isDone)
+                if (prov.botStatus.isActive || prov.botStatus.isDone)
                   _ProgressCard(status: prov.botStatus, prov: prov)
                       .animate()
                       .fadeIn()
@@ -219,7 +222,7 @@ class _FilePickerCard extends StatelessWidget {
                 items: prov.availableFiles
                     .map((f) => DropdownMenuItem(value: f, child: Text(f)))
                     .toList(),
-                onChanged: prov.botStatus.isRunning
+                onChanged: prov.botStatus.isActive
                     ? null
                     : (v) => prov.selectFile(v),
               ),
@@ -235,7 +238,7 @@ class _FilePickerCard extends StatelessWidget {
                 shape: RoundedRectangleBorder(
                     borderRadius: BorderRadius.circular(10)),
               ),
-              onPressed: prov.botStatus.isRunning ? null : () => _pickFile(context),
+              onPressed: prov.botStatus.isActive ? null : () => _pickFile(context),
             ),
           ],
         ),
@@ -279,32 +282,128 @@ class _OptionsCard extends StatelessWidget {
   @override
   Widget build(BuildContext context) {
     return Card(
-      child: SwitchListTile(
-        contentPadding:
-            const EdgeInsets.symmetric(horizontal: 16, vertical: 6),
-        secondary: Container(
-          padding: const EdgeInsets.all(8),
-          decoration: BoxDecoration(
-            color: Theme.of(context).colorScheme.secondaryContainer,
-            borderRadius: BorderRadius.circular(10),
+      child: Column(
+        children: [
+          SwitchListTile(
+            contentPadding:
+                const EdgeInsets.symmetric(horizontal: 16, vertical: 6),
+            secondary: Container(
+              padding: const EdgeInsets.all(8),
+              decoration: BoxDecoration(
+                color: Theme.of(context).colorScheme.secondaryContainer,
+                borderRadius: BorderRadius.circular(10),
+              ),
+              child: Icon(
+                Icons.attach_file_rounded,
+                color: Theme.of(context).colorScheme.onSecondaryContainer,
+              ),
+            ),
+            title: const Text('Send with media',
+                style: TextStyle(fontWeight: FontWeight.w600)),
+            subtitle: const Text(
+                'Attach a file to every message, or the file named in each row\'s media column'),
+            value: prov.withMedia,
+            onChanged:
+                prov.botStatus.isActive ? null : (v) => prov.setWithMedia(v),
           ),
-          child: Icon(
-            Icons.attach_file_rounded,
-            color: Theme.of(context).colorScheme.onSecondaryContainer,
+          if (prov.withMedia) _MediaPicker(prov: prov),
+          const Divider(height: 1),
+          SwitchListTile(
+            contentPadding:
+                const EdgeInsets.symmetric(horizontal: 16, vertical: 6),
+            secondary: Container(
+              padding: const EdgeInsets.all(8),
+              decoration: BoxDecoration(
+                color: Theme.of(context).colorScheme.secondaryContainer,
+                borderRadius: BorderRadius.circular(10),
+              ),
+              child: Icon(
+                Icons.link_rounded,
+                color: Theme.of(context).colorScheme.onSecondaryContainer,
+              ),
+            ),
+            title: const Text('Open chats by link',
+                style: TextStyle(fontWeight: FontWeight.w600)),
+            subtitle: const Text(
+                'Jump straight to each chat with the message prefilled instead of searching'),
+            value: prov.openByUrl,
+            onChanged:
+                prov.botStatus.isActive ? null : (v) => prov.setOpenByUrl(v),
           ),
-        ),
-        title: const Text('Send with media',
-            style: TextStyle(fontWeight: FontWeight.w600)),
-        subtitle: const Text(
-            'Copy the media file first (CTRL+C), then enable this option'),
-        value: prov.withMedia,
-        onChanged:
-            prov.botStatus.isRunning ? null : (v) => prov.setWithMedia(v),
+        ],
       ),
     );
   }
 }
 
+// ─── Media picker ─────────────────────────────────────────────────────────────
+
+class _MediaPicker extends StatelessWidget {
+  final BotProvider prov;
+  const _MediaPicker({required this.prov});
+
+  @override
+  Widget build(BuildContext context) {
+    final disabled = prov.botStatus.isActive || prov.isUploadingMedia;
+
+    return Padding(
+      padding: const EdgeInsets.fromLTRB(16, 0, 16, 14),
+      child: Column(
+        crossAxisAlignment: CrossAxisAlignment.stretch,
+        children: [
+          DropdownButtonFormField<String?>(
+            decoration: InputDecoration(
+              labelText: 'Media file',
+              border: OutlineInputBorder(
+                  borderRadius: BorderRadius.circular(10)),
+              prefixIcon: const Icon(Icons.perm_media_outlined),
+            ),
+            // ignore: deprecated_member_use
+            value: prov.selectedMedia,
+            items: [
+              const DropdownMenuItem<String?>(
+                  value: null, child: Text('From the media column')),
+              ...prov.mediaFiles.map(
+                  (f) => DropdownMenuItem<String?>(value: f, child: Text(f))),
+            ],
+            onChanged: disabled ? null : (v) => prov.selectMedia(v),
+          ),
+          const SizedBox(height: 10),
+          OutlinedButton.icon(
+            icon: prov.isUploadingMedia
+                ? const SizedBox(
+                    width: 18,
+                    height: 18,
+                    child: CircularProgressIndicator(strokeWidth: 2))
+                : const Icon(Icons.upload_rounded),
+            label: Text(prov.isUploadingMedia
+                ? 'Uploading…'
+                : 'Upload media from device'),
+            style: OutlinedButton.styleFrom(
+              minimumSize: const Size.fromHeight(44),
+              shape: RoundedRectangleBorder(
+                  borderRadius: BorderRadius.circular(10)),
+            ),
+            onPressed: disabled ? null : () => _pickMedia(context),
+          ),
+        ],
+      ),
+    );
+  }
+
+  Future<void> _pickMedia(BuildContext context) async {
+    final result = await FilePicker.platform.pickFiles(withData: true);
+    if (result == null || result.files.isEmpty) return;
+
+    final file = result.files.first;
+    if (file.bytes == null) return;
+
+    if (context.mounted) {
+      await context.read<BotProvider>().uploadMedia(file.name, file.bytes!);
+    }
+  }
+}
+
 // ─── CSV format helper ────────────────────────────────────────────────────────
 
 class _CsvFormatCard extends StatelessWidget {
@@ -366,18 +465,23 @@ class _ProgressCard extends StatelessWidget {
   Widget build(BuildContext context) {
     final cs = Theme.of(context).colorScheme;
     final isRunning = status.isRunning;
+    final isPaused = status.isPaused;
     final isDone = status.isDone;
 
     Color bg = isRunning
         ? Colors.blue.shade50
-        : isDone
-            ? Colors.green.shade50
-            : cs.errorContainer;
+        : isPaused
+            ? Colors.amber.shade50
+            : isDone
+                ? Colors.green.shade50
+                : cs.errorContainer;
     Color fg = isRunning
         ? Colors.blue.shade800
-        : isDone
-            ? Colors.green.shade800
-            : cs.onErrorContainer;
+        : isPaused
+            ? Colors.amber.shade900
+            : isDone
+                ? Colors.green.shade800
+                : cs.onErrorContainer;
 
     return Padding(
       padding: const EdgeInsets.only(bottom: 16),
@@ -399,25 +503,29 @@ class _ProgressCard extends StatelessWidget {
                     ),
                   if (!isRunning)
                     Icon(
-                        isDone
-                            ? Icons.check_circle_rounded
-                            : Icons.error_rounded,
+                        isPaused
+                            ? Icons.pause_circle_rounded
+                            : isDone
+                                ? Icons.check_circle_rounded
+                                : Icons.error_rounded,
                         color: fg),
                   const SizedBox(width: 8),
                   Expanded(
                     child: Text(
                       isRunning
                           ? 'Sending messages…'
-                          : isDone
-                              ? 'Completed!'
-                              : 'Stopped / Error',
+                          : isPaused
+                              ? 'Paused'
+                              : isDone
+                                  ? 'Completed!'
+                                  : 'Stopped / Error',
                       style: TextStyle(
                           color: fg,
                           fontWeight: FontWeight.bold,
                           fontSize: 15),
                     ),
                   ),
-                  if (!isRunning)
+                  if (!status.isActive)
                     TextButton(
                       onPressed: prov.resetStatus,
                       child: Text('Reset', style: TextStyle(color: fg)),
@@ -485,22 +593,39 @@ class _ActionButtons extends StatelessWidget {
 
   @override
   Widget build(BuildContext context) {
-    final isRunning = prov.botStatus.isRunning;
+    final status = prov.botStatus;
     final cs = Theme.of(context).colorScheme;
 
-    if (isRunning) {
-      return FilledButton.icon(
-        icon: prov.isStopping
-            ? const SizedBox(
-                width: 18,
-                height: 18,
-                child: CircularProgressIndicator(
-                    strokeWidth: 2, color: Colors.white))
-            : const Icon(Icons.stop_circle_outlined),
-        label:
-            Text(prov.isStopping ? 'Stopping…' : 'Stop Bot'),
-        style: FilledButton.styleFrom(backgroundColor: cs.error),
-        onPressed: prov.isStopping ? null : prov.stopBot,
+    if (status.isActive) {
+      return Column(
+        crossAxisAlignment: CrossAxisAlignment.stretch,
+        children: [
+          OutlinedButton.icon(
+            icon: Icon(status.isPaused
+                ? Icons.play_arrow_rounded
+                : Icons.pause_rounded),
+            label: Text(status.isPaused ? 'Resume' : 'Pause'),
+            onPressed: prov.isStopping
+                ? null
+                : status.isPaused
+                    ? prov.resumeBot
+                    : prov.pauseBot,
+          ),
+          const SizedBox(height: 10),
+          FilledButton.icon(
+            icon: prov.isStopping
+                ? const SizedBox(
+                    width: 18,
+                    height: 18,
+                    child: CircularProgressIndicator(
+                        strokeWidth: 2, color: Colors.white))
+                : const Icon(Icons.stop_circle_outlined),
+            label:
+                Text(prov.isStopping ? 'Stopping…' : 'Stop Bot'),
+            style: FilledButton.styleFrom(backgroundColor: cs.error),
+            onPressed: prov.isStopping ? null : prov.stopBot,
+          ),
+        ],
       );
     }
 
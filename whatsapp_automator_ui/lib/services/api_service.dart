@@ -1,3 +1,4 @@
+import 'dart:async';
 import 'dart:convert';
 import 'dart:typed_data';
 import 'package:http/http.dart' as http;
@@ -32,7 +33,8 @@ class ApiService {
     return List<String>.from(data['files'] as List);
   }
 
-  Future<String> uploadFile(String filename, Uint8List bytes) async {
+  /// Returns the upload summary: filename, rows, sendable and skipped counts.
+  Future<Map<String, dynamic>> uploadFile(String filename, Uint8List bytes) async {
     final req = http.MultipartRequest('POST', _uri('/api/upload'));
     req.files.add(
       http.MultipartFile.fromBytes('file', bytes, filename: filename),
@@ -40,6 +42,28 @@ class ApiService {
     final streamed = await req.send();
     final res = await http.Response.fromStream(streamed);
     _check(res);
+    return json.decode(res.body) as Map<String, dynamic>;
+  }
+
+  // ─── Media ───────────────────────────────────────────────────────────────
+
+  /// Media files in the server's data/media/ folder.
+  Future<List<String>> getMedia() async {
+    final res = await http.get(_uri('/api/media'));
+    _check(res);
+    final data = json.decode(res.body) as Map<String, dynamic>;
+    return List<String>.from(data['files'] as List);
+  }
+
+  /// Stores a media file on the server; returns its name in data/media/.
+  Future<String> uploadMedia(String filename, Uint8List bytes) async {
+    final req = http.MultipartRequest('POST', _uri('/api/media'));
+    req.files.add(
+      http.MultipartFile.fromBytes('file', bytes, filename: filename),
+    );
+    final streamed = await req.send();
+    final res = await http.Response.fromStream(streamed);
+    _check(res);
     final data = json.decode(res.body) as Map<String, dynamic>;
     return data['filename'] as String;
   }
@@ -52,13 +76,61 @@ class ApiService {
     return json.decode(res.body) as Map<String, dynamic>;
   }
 
-  Future<void> startBot(String filename, {bool withMedia = false}) async {
+  /// Server-sent status snapshots from `/api/events`, pushed as soon as the
+  /// state changes. The stream ends or errors when the connection drops.
+  Stream<Map<String, dynamic>> statusEvents() async* {
+    final client = http.Client();
+    try {
+      final res = await client.send(http.Request('GET', _uri('/api/events')));
+      if (res.statusCode != 200) throw ApiException('HTTP ${res.statusCode}');
+      String event = '';
+      final data = StringBuffer();
+      await for (final line in res.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter())) {
+        if (line.startsWith('event:')) {
+          event = line.substring(6).trim();
+        } else if (line.startsWith('data:')) {
+          data.write(line.substring(5).trim());
+        } else if (line.isEmpty) {
+          if (event == 'status' && data.isNotEmpty) {
+            yield json.decode(data.toString()) as Map<String, dynamic>;
+          }
+          event = '';
+          data.clear();
+        }
+      }
+    } finally {
+      client.close();
+    }
+  }
+
+  /// [media] is attached to every message; without it, with [withMedia]
+  /// each row's media column names its file.
+  Future<Map<String, dynamic>> startBot(String filename,
+      {bool withMedia = false, String? media, String openMode = 'search'}) async {
     final res = await http.post(
       _uri('/api/start'),
       headers: {'Content-Type': 'application/json'},
-      body: json.encode({'filename': filename, 'with_media': withMedia}),
+      body: json.encode({
+        'filename': filename,
+        'with_media': withMedia,
+        if (withMedia && media != null) 'media': media,
+        'open_mode': openMode,
+      }),
     );
     _check(res);
+    return json.decode(res.body) as Map<String, dynamic>;
+  }
+
+  Future<void> pauseBot() async {
+    final res = await http.post(_uri('/api/pause'));
+    _check(res);
+  }
+
+  Future<void> resumeBot() async {
+    final res = await http.post(_uri('/api/resume'));
+    _check(res);
   }
 
   Future<void> stopBot() async {
@@ -80,6 +152,19 @@ class ApiService {
     return List<Map<String, dynamic>>.from(data['logs'] as List);
   }
 
+  /// One page of the numbers of a log, optionally only those containing [query].
+  Future<Map<String, dynamic>> getLogPage(String filename,
+      {int cursor = 0, int limit = 200, String query = ''}) async {
+    final res = await http.get(_uri('/api/logs/${Uri.encodeComponent(filename)}')
+        .replace(queryParameters: {
+      'cursor': '$cursor',
+      'limit': '$limit',
+      if (query.isNotEmpty) 'q': query,
+    }));
+    _check(res);
+    return json.decode(res.body) as Map<String, dynamic>;
+  }
+
   // ─── Helper ──────────────────────────────────────────────────────────────
 
   void _check(http.Response res) {